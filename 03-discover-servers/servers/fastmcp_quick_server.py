@@ -4,9 +4,16 @@ Minimal MCP server using official SDK (FastMCP) over stdio.
 Exposes:
 - tool: ping() -> str
 - tool: health() -> dict
+
+Run over streamable HTTP to share one server between many clients
+(the webapp's MCP_MODE=http, MCP_SERVER_URI=http://127.0.0.1:8001/mcp):
+
+    python fastmcp_quick_server.py --transport streamable-http --port 8001
 """
 from __future__ import annotations
 
+import argparse
+
 from mcp.server.fastmcp import FastMCP
 
 
@@ -26,5 +33,13 @@ def health() -> dict[str, str]:
 
 
 if __name__ == "__main__":
-    # Run over stdio so clients can spawn us easily
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(description="GC Demo MCP server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    # stdio (default) so clients can spawn us easily
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
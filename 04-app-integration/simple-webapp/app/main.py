@@ -1,9 +1,11 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from .routers.health import router as health_router
 from .routers.mcp import router as mcp_router
 from .routers.monitoring import router as monitoring_router
+from .services.warmup import shut_down, start_warm_up
 
 # Load .env file from app directory
 env_file = Path(__file__).parent.parent / ".env"
@@ -11,11 +13,23 @@ if env_file.exists():
     load_dotenv(env_file)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the shared session pool in the background (no-op in mock mode);
+    # GET /ready answers 503 until it is done
+    warmup = start_warm_up()
+    try:
+        yield
+    finally:
+        await shut_down(warmup)
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="MCP Web Application with Monitoring",
         version="1.0.0",
-        description="A production-ready web application demonstrating Model Context Protocol (MCP) integration with real-time monitoring"
+        description="A production-ready web application demonstrating Model Context Protocol (MCP) integration with real-time monitoring",
+        lifespan=lifespan,
     )
     app.include_router(health_router, prefix="")
     app.include_router(mcp_router)
@@ -1,6 +1,10 @@
 from datetime import datetime, timezone
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+from ..services.warmup import get_readiness
 
 router = APIRouter()
 
@@ -14,3 +18,18 @@ class HealthResponse(BaseModel):
 @router.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     return HealthResponse(status="ok", version="0.1.0", time=datetime.now(timezone.utc).isoformat())
+
+
+class ReadinessResponse(BaseModel):
+    status: str
+    detail: Optional[str] = None
+    attempts: int = 0
+    warmup_ms: Optional[int] = None
+    pool: Optional[Dict[str, Any]] = None
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def ready() -> JSONResponse:
+    """Readiness probe: 503 until the MCP servers are warm, and while stopping."""
+    readiness = get_readiness()
+    return JSONResponse(readiness.to_dict(), status_code=200 if readiness.ready else 503)
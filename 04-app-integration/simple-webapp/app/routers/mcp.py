@@ -1,21 +1,112 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import Any, Dict, List
+import asyncio
+import time
 
-from ..services.mcp_client import McpClient, McpClientError
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, WebSocket, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Literal, Optional
 
-router = APIRouter(prefix="/mcp", tags=["mcp"])
+from ..services import json_codec
+from ..services.admission import get_admission_controller
+from ..services.async_mcp_client import AsyncMcpClient
+from ..services.flow_control import UNAVAILABLE_CODES
+from ..services.jobs import MAX_POLL_SECONDS, Job, get_job_manager
+from ..services.mcp_client import McpClientError
+from ..services.session_pool import get_session_pool
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered by json_codec (orjson/msgspec when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
+
+
+# Tool text per NDJSON line on /actions/{tool}:stream: at most this many
+# bytes of the text as the server escaped it (characters, for plain ASCII)
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# Seconds without progress after which /actions/{tool}:events sends an SSE
+# comment, so clients and proxies can tell a slow tool from a hung request
+SSE_HEARTBEAT_SECONDS = 15.0
+
+# JSON-RPC error codes on /mcp/ws; tool failures use WS_TOOL_ERROR and carry
+# the usual error code string (tool_not_found, overloaded, ...) in error.data
+WS_PARSE_ERROR = -32700
+WS_INVALID_REQUEST = -32600
+WS_METHOD_NOT_FOUND = -32601
+WS_INVALID_PARAMS = -32602
+WS_INTERNAL_ERROR = -32603
+WS_TOOL_ERROR = -32000
+
+router = APIRouter(prefix="/mcp", tags=["mcp"], default_response_class=CodecJSONResponse)
 
 
 class ToolInfo(BaseModel):
+    # Other tools/list fields (title, annotations, outputSchema) pass through
+    model_config = ConfigDict(extra="allow")
+
     name: str
     description: str | None = None
+    inputSchema: Dict[str, Any] = Field(default_factory=dict)
 
 
 class ToolsListResponse(BaseModel):
     tools: List[ToolInfo]
 
 
+class ResourceInfo(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    uri: str
+    name: str | None = None
+    description: str | None = None
+    mimeType: str | None = None
+
+
+class ResourceTemplateInfo(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    uriTemplate: str
+    name: str | None = None
+    description: str | None = None
+    mimeType: str | None = None
+
+
+class ResourcesListResponse(BaseModel):
+    resources: List[ResourceInfo]
+    resourceTemplates: List[ResourceTemplateInfo]
+
+
+class ResourceReadResponse(BaseModel):
+    uri: str
+    contents: List[Dict[str, Any]]  # {uri, mimeType?, text | blob (base64)}
+    latency_ms: int
+
+
+class PromptInfo(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+    description: str | None = None
+    arguments: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class PromptsListResponse(BaseModel):
+    prompts: List[PromptInfo]
+
+
+class PromptRequest(BaseModel):
+    arguments: Dict[str, str] = Field(default_factory=dict)
+
+
+class PromptResponse(BaseModel):
+    name: str
+    description: str | None = None
+    messages: List[Dict[str, Any]]  # {role, content}
+    latency_ms: int
+
+
 class ActionRequest(BaseModel):
     params: Dict[str, Any] = Field(default_factory=dict)
 
@@ -27,6 +118,43 @@ class ActionResponse(BaseModel):
     success: bool = True
 
 
+class BatchItem(BaseModel):
+    tool: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BatchItemResult(BaseModel):
+    tool: str
+    success: bool
+    data: Dict[str, Any] | None = None
+    error: Dict[str, Any] | None = None
+    latency_ms: int
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+    latency_ms: int
+
+
+class JobRequest(BaseModel):
+    tool: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class JobResponse(BaseModel):
+    id: str
+    tool: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: str
+    started_at: str | None = None
+    finished_at: str | None = None
+    latency_ms: int | None = None
+    data: Dict[str, Any] | None = None
+    error: Dict[str, Any] | None = None
+
+
 class ErrorResponse(BaseModel):
     error: Dict[str, Any]
 
@@ -36,36 +164,467 @@ class HealthResponse(BaseModel):
     server_type: str | None = None
 
 
-def _client() -> McpClient:
-    return McpClient()  # fresh each request; light-weight (mock)
+def _client() -> AsyncMcpClient:
+    # Light-weight facade; in stdio mode calls borrow a warm session from the
+    # shared pool instead of spawning a server per request
+    return AsyncMcpClient(pool=get_session_pool())
+
+
+NOT_FOUND_CODES = {"tool_not_found", "job_not_found", "resource_not_found", "prompt_not_found"}
+
+
+def _http_error(e: McpClientError) -> HTTPException:
+    detail = {"code": e.code, "message": e.message, "detail": e.detail}
+    if e.code in UNAVAILABLE_CODES:
+        # Overloaded, queue full or circuit open: tell clients when to come back
+        return HTTPException(status_code=503, detail=detail,
+                             headers={"Retry-After": str(e.detail.get("retry_after", 1))})
+    code = 404 if e.code in NOT_FOUND_CODES else 400
+    return HTTPException(status_code=code, detail=detail)
+
+
+def _admission(default_priority: str) -> Callable[..., AsyncIterator[None]]:
+    """Dependency holding an admission slot for the whole request."""
+
+    async def admit(
+        x_mcp_priority: Optional[Literal["interactive", "batch"]] = Header(
+            None, description=f"Admission priority class (default {default_priority})"),
+    ) -> AsyncIterator[None]:
+        controller = get_admission_controller()
+        try:
+            await controller.acquire(x_mcp_priority or default_priority)
+        except McpClientError as e:
+            raise _http_error(e)
+        try:
+            yield
+        finally:
+            controller.release()
+
+    return admit
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+@router.get("/tools", response_model=ToolsListResponse, dependencies=[Depends(_admission("interactive"))],
+            responses={304: {"description": "Catalog unchanged since If-None-Match"},
+                       400: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def list_tools(if_none_match: Optional[str] = Header(None)) -> Response:
+    """Tool catalog with input schemas; revalidate with If-None-Match."""
+    client = _client()
+    try:
+        tools, etag = await client.tool_catalog()
+    except McpClientError as e:
+        raise _http_error(e)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return CodecJSONResponse({"tools": tools}, headers=headers)
+
+
+@router.get("/resources", response_model=ResourcesListResponse, dependencies=[Depends(_admission("interactive"))],
+            responses={400: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def list_resources() -> CodecJSONResponse:
+    """Resources and resource templates (cached until the server reports a change)."""
+    try:
+        return CodecJSONResponse(await _client().list_resources())
+    except McpClientError as e:
+        raise _http_error(e)
+
+
+@router.get("/resources/read", response_model=ResourceReadResponse, dependencies=[Depends(_admission("interactive"))],
+            responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def read_resource(uri: str = Query(..., description="Resource URI, listed or matching a template")
+                        ) -> CodecJSONResponse:
+    """Read a resource; listed resources are served from cache until the server notifies an update."""
+    try:
+        result, latency_ms = await _client().read_resource(uri)
+    except McpClientError as e:
+        raise _http_error(e)
+    return CodecJSONResponse({"uri": uri, "contents": result.get("contents", []), "latency_ms": latency_ms})
+
+
+@router.get("/prompts", response_model=PromptsListResponse, dependencies=[Depends(_admission("interactive"))],
+            responses={400: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def list_prompts() -> CodecJSONResponse:
+    try:
+        return CodecJSONResponse({"prompts": await _client().list_prompts()})
+    except McpClientError as e:
+        raise _http_error(e)
+
+
+@router.post("/prompts/{name}", response_model=PromptResponse, dependencies=[Depends(_admission("interactive"))],
+             responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def get_prompt(name: str, req: PromptRequest) -> CodecJSONResponse:
+    """Render a prompt with its arguments (prompts/get)."""
+    try:
+        result, latency_ms = await _client().get_prompt(name, req.arguments)
+    except McpClientError as e:
+        raise _http_error(e)
+    return CodecJSONResponse({"name": name, "description": result.get("description"),
+                              "messages": result.get("messages", []), "latency_ms": latency_ms})
+
+
+_DONE = object()
+_HEARTBEAT = object()
+
+
+async def _ndjson_lines(tool: str, first: Any, pieces: AsyncIterator[Any], start: float) -> AsyncIterator[bytes]:
+    """start, text chunks (then the other result fields), end; one JSON object per line.
+
+    A failure after the first line ends the stream with an ``error`` line.
+    """
+    chunks = 0
+    try:
+        yield json_codec.dumps({"type": "start", "tool": tool}) + b"\n"
+        piece = first
+        while piece is not _DONE:
+            if isinstance(piece, dict):  # decoded data (reply not streamable)
+                text = piece.get("text")
+                if isinstance(text, str):
+                    for offset in range(0, len(text), STREAM_CHUNK_CHARS):
+                        chunks += 1
+                        yield json_codec.dumps({"type": "text", "text": text[offset:offset + STREAM_CHUNK_CHARS]}) + b"\n"
+                rest = {k: v for k, v in piece.items() if k != "text" or not isinstance(v, str)}
+                if rest:
+                    yield json_codec.dumps({"type": "data", "data": rest}) + b"\n"
+            else:
+                chunks += 1
+                yield b'{"type":"text","text":"' + piece + b'"}\n'  # already escaped
+            piece = await anext(pieces, _DONE)
+    except McpClientError as e:
+        yield json_codec.dumps({"type": "error", "code": e.code, "message": e.message, "detail": e.detail}) + b"\n"
+        return
+    finally:
+        await pieces.aclose()  # client went away: the session drops the rest of the reply
+    latency_ms = int((time.perf_counter() - start) * 1000)
+    yield json_codec.dumps({"type": "end", "tool": tool, "latency_ms": latency_ms, "chunks": chunks}) + b"\n"
+
+
+@router.post("/actions/{tool}:stream", response_class=StreamingResponse,
+             responses={200: {"content": {"application/x-ndjson": {}},
+                              "description": "start line, text chunks, end line"},
+                        400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def call_tool_stream(
+    tool: str,
+    req: ActionRequest,
+    x_mcp_priority: Optional[Literal["interactive", "batch"]] = Header(
+        None, description="Admission priority class (default interactive)"),
+) -> StreamingResponse:
+    """Call a tool and stream its result as NDJSON while the server is still sending it.
+
+    On pooled sessions the reply is not assembled: its bytes go from the
+    session's reader through a bounded buffer into ``text`` lines
+    (result_stream.py), so memory does not grow with the result. The call
+    holds its admission slot until the reply has been sent. Errors before
+    the first line keep their usual status codes.
+    """
+    client = _client()
+    controller = get_admission_controller()
+    start = time.perf_counter()
+
+    async def admitted() -> AsyncIterator[Any]:
+        # Not a dependency: its teardown would run before the body is sent
+        async with controller.admit(x_mcp_priority or "interactive"):
+            stream = client.stream_tool(tool, req.params, STREAM_CHUNK_CHARS)
+            try:
+                async for piece in stream:
+                    yield piece
+            finally:
+                await stream.aclose()
+
+    pieces = admitted()
+    try:
+        first = await anext(pieces, _DONE)
+    except McpClientError as e:
+        raise _http_error(e)
+    except BaseException:
+        await pieces.aclose()
+        raise
+    return StreamingResponse(_ndjson_lines(tool, first, pieces, start), media_type="application/x-ndjson")
+
+
+async def _parts(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def _next_event(events: "asyncio.Queue[Any]") -> Any:
+    try:
+        return await asyncio.wait_for(events.get(), SSE_HEARTBEAT_SECONDS)
+    except asyncio.TimeoutError:
+        return _HEARTBEAT
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + json_codec.dumps(data) + b"\n\n"
+
+
+async def _sse_events(tool: str, call: "asyncio.Future[Any]", events: "asyncio.Queue[Any]",
+                      first: Any) -> AsyncIterator[bytes]:
+    """progress events (heartbeat comments while silent), then one result or error event."""
+    try:
+        item = first
+        while item is not _DONE:
+            if item is _HEARTBEAT:
+                yield b": keep-alive\n\n"
+            else:
+                yield _sse("progress", {k: v for k, v in item.items() if k != "progressToken"})
+            item = await _next_event(events)
+        try:
+            data, latency_ms = call.result()
+        except McpClientError as e:
+            yield _sse("error", {"code": e.code, "message": e.message, "detail": e.detail})
+        else:
+            yield _sse("result", {"tool": tool, "data": data, "latency_ms": latency_ms, "success": True})
+    finally:
+        call.cancel()  # client went away: the session sends notifications/cancelled
+
+
+@router.post("/actions/{tool}:events", response_class=StreamingResponse,
+             responses={200: {"content": {"text/event-stream": {}},
+                              "description": "progress events, then a result or error event"},
+                        400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def call_tool_events(
+    tool: str,
+    req: ActionRequest,
+    x_mcp_priority: Optional[Literal["interactive", "batch"]] = Header(
+        None, description="Admission priority class (default interactive)"),
+) -> StreamingResponse:
+    """Call a tool and stream its notifications/progress as Server-Sent Events.
+
+    The call holds its admission slot until it finishes, not just until the
+    first byte. Errors raised before the first event keep their usual status
+    codes; later ones arrive as an ``error`` event.
+    """
+    client = _client()
+    controller = get_admission_controller()
+    events: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    async def run() -> Any:
+        async with controller.admit(x_mcp_priority or "interactive"):
+            return await client.call_tool(tool, req.params, progress=events.put_nowait)
+
+    call = asyncio.ensure_future(run())
+    call.add_done_callback(lambda _: events.put_nowait(_DONE))
+    try:
+        first = await _next_event(events)
+    except BaseException:
+        call.cancel()
+        raise
+    if first is _DONE and call.exception() is not None:
+        error = call.exception()
+        raise _http_error(error) if isinstance(error, McpClientError) else error
+    return StreamingResponse(_sse_events(tool, call, events, first), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
-@router.get("/tools", response_model=ToolsListResponse)
-async def list_tools() -> ToolsListResponse:
+@router.post("/actions/{tool}", response_model=ActionResponse, dependencies=[Depends(_admission("interactive"))],
+             responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def call_tool(
+    tool: str,
+    req: ActionRequest,
+    passthrough: bool = Query(False, description="data is the whole MCP result (every content item), "
+                                                 "forwarded without being decoded"),
+) -> Response:
     client = _client()
     try:
-        tools = client.list_tools()
-        return ToolsListResponse(tools=[ToolInfo(**t) for t in tools])
+        data, latency_ms = await client.call_tool(tool, req.params, raw=passthrough)
+        if passthrough:
+            # The server's result bytes go out as they are, between a head and
+            # a tail, so the large part is neither decoded nor concatenated
+            head = b'{"tool":' + json_codec.dumps(tool) + b',"data":'
+            tail = b',"latency_ms":%d,"success":true}' % latency_ms
+            return StreamingResponse(_parts(head, data.data, tail), media_type="application/json",
+                                     headers={"Content-Length": str(len(head) + len(data.data) + len(tail))})
+        # Returned as-is: re-validating a large tool result through
+        # ActionResponse would copy it once more (the model still documents it)
+        return CodecJSONResponse({"tool": tool, "data": data, "latency_ms": latency_ms, "success": True})
     except McpClientError as e:
-        raise HTTPException(status_code=400, detail={"code": e.code, "message": e.message})
+        raise _http_error(e)
 
 
-@router.post("/actions/{tool}", response_model=ActionResponse, responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}})
-async def call_tool(tool: str, req: ActionRequest) -> ActionResponse:
+@router.post("/actions:batch", response_model=BatchResponse, dependencies=[Depends(_admission("batch"))],
+             responses={413: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def call_tools_batch(
+    items: List[BatchItem],
+    concurrency: Optional[int] = Query(None, ge=1, description="Items in flight at once (default MCP_BATCH_CONCURRENCY)"),
+) -> CodecJSONResponse:
+    """Call many tools in one request; each item succeeds or fails on its own."""
     client = _client()
+    max_items = client.config.batch_max_items
+    if len(items) > max_items:
+        raise HTTPException(status_code=413, detail={
+            "code": "batch_too_large", "message": f"At most {max_items} items per batch", "max_items": max_items,
+        })
+    start = time.perf_counter()
+    results = await client.call_tools_batch([item.model_dump() for item in items], concurrency=concurrency)
+    succeeded = sum(1 for r in results if r["success"])
+    return CodecJSONResponse({
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "latency_ms": int((time.perf_counter() - start) * 1000),
+    })
+
+
+def _job_response(job: Job, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    if job.result is None:
+        return CodecJSONResponse({**job.to_dict(), "data": None}, status_code=status_code, headers=headers)
+    # The result was encoded once when the job finished; polls only splice it in
+    body = json_codec.dumps(job.to_dict())[:-1] + b',"data":' + job.result + b"}"
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED,
+             responses={503: {"model": ErrorResponse}})
+async def submit_job(req: JobRequest) -> Response:
+    """Queue a tool call and return its job at once; poll GET /mcp/jobs/{id} for the result."""
     try:
-        data, latency_ms = client.call_tool(tool, req.params)
-        return ActionResponse(tool=tool, data=data, latency_ms=latency_ms)
+        job = get_job_manager().submit(req.tool, req.params)
     except McpClientError as e:
-        status = 404 if e.code == "tool_not_found" else 400
-        raise HTTPException(status_code=status, detail={"code": e.code, "message": e.message, "detail": e.detail})
+        raise _http_error(e)
+    return _job_response(job, status.HTTP_202_ACCEPTED, {"Location": f"{router.prefix}/jobs/{job.id}"})
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, responses={404: {"model": ErrorResponse}})
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_POLL_SECONDS,
+                        description="Seconds to wait for the job to finish before answering (long-poll)"),
+) -> Response:
+    """The job's status, and its data or error once finished."""
+    try:
+        job = await get_job_manager().wait(job_id, wait)
+    except McpClientError as e:
+        raise _http_error(e)
+    return _job_response(job)
+
+
+def _rpc_error(request_id: Any, code: int, message: str, data: Any = None) -> Dict[str, Any]:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+def _rpc_request(raw: Any) -> Dict[str, Any]:
+    """Decoded and checked /mcp/ws message; raises ValueError(rpc error) otherwise."""
+    try:
+        message = json_codec.loads(raw)
+    except ValueError:
+        raise ValueError(_rpc_error(None, WS_PARSE_ERROR, "Parse error"))
+    if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+        raise ValueError(_rpc_error(None, WS_INVALID_REQUEST, "Expected a JSON-RPC request object"))
+    request_id = message.get("id")
+    if message["method"].startswith("notifications/"):
+        return message
+    if isinstance(request_id, bool) or not isinstance(request_id, (str, int)):
+        raise ValueError(_rpc_error(None, WS_INVALID_REQUEST, "Requests need a string or integer id"))
+    params = message.get("params") or {}
+    if message["method"] == "tools/call" and not (
+            isinstance(params, dict) and isinstance(params.get("name"), str)
+            and isinstance(params.get("arguments", {}), dict)):
+        raise ValueError(_rpc_error(request_id, WS_INVALID_PARAMS, "tools/call needs params.name and params.arguments"))
+    if message["method"] not in ("tools/call", "tools/list"):
+        raise ValueError(_rpc_error(request_id, WS_METHOD_NOT_FOUND, f"Method '{message['method']}' not found"))
+    return message
+
+
+@router.websocket("/ws")
+async def tools_socket(
+    websocket: WebSocket,
+    x_mcp_priority: Optional[Literal["interactive", "batch"]] = Header(
+        None, description="Admission priority class of every call on the connection (default batch)"),
+) -> None:
+    """Many tool calls over one socket, as JSON-RPC 2.0 text messages.
+
+    ``tools/call`` (``params: {name, arguments}``) and ``tools/list`` requests
+    carry client-chosen ids; calls run concurrently against the pooled
+    sessions and each response goes out as soon as it is ready, in any order.
+    ``notifications/cancelled`` (``params.requestId``) cancels a call.
+
+    Each call takes an admission slot of its own. With MCP_WS_MAX_INFLIGHT
+    calls running the socket is not read, so a client sending faster than
+    its calls finish is slowed down by TCP flow control instead of queueing
+    without bound here.
+    """
+    await websocket.accept()
+    client = _client()
+    controller = get_admission_controller()
+    priority = x_mcp_priority or "batch"
+    slots = asyncio.Semaphore(max(1, client.config.ws_max_inflight))
+    send_lock = asyncio.Lock()
+    pending: Dict[Any, "asyncio.Task[None]"] = {}
+
+    async def send(message: Dict[str, Any]) -> None:
+        async with send_lock:  # one frame at a time from concurrent calls
+            await websocket.send_text(json_codec.dumps(message).decode())
+
+    async def run(request_id: Any, method: str, params: Dict[str, Any]) -> None:
+        try:
+            async with controller.admit(priority):
+                if method == "tools/list":
+                    tools, _ = await client.tool_catalog()
+                    result: Dict[str, Any] = {"tools": tools}
+                else:
+                    data, latency_ms = await client.call_tool(params["name"], params.get("arguments", {}))
+                    result = {"tool": params["name"], "data": data, "latency_ms": latency_ms}
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except McpClientError as e:
+            response = _rpc_error(request_id, WS_TOOL_ERROR, e.message, {"code": e.code, "detail": e.detail})
+        except Exception as e:  # noqa: BLE001 - one bad call must not end the connection
+            response = _rpc_error(request_id, WS_INTERNAL_ERROR, str(e))
+        try:
+            await send(response)
+        except Exception:  # noqa: BLE001 - the socket is gone; the receive loop sees the disconnect
+            pass
+
+    def finished(request_id: Any) -> None:
+        pending.pop(request_id, None)
+        slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                request = _rpc_request(message.get("text") or message.get("bytes") or b"")
+                if request.get("id") in pending:
+                    raise ValueError(_rpc_error(request["id"], WS_INVALID_REQUEST, "Id already in flight"))
+            except ValueError as e:
+                slots.release()
+                await send(e.args[0])
+                continue
+            if request["method"].startswith("notifications/"):
+                slots.release()
+                if request["method"] == "notifications/cancelled":
+                    task = pending.get((request.get("params") or {}).get("requestId"))
+                    if task is not None:
+                        task.cancel()  # the session sends notifications/cancelled upstream
+                continue
+            request_id = request["id"]
+            task = asyncio.ensure_future(run(request_id, request["method"], request.get("params") or {}))
+            pending[request_id] = task
+            task.add_done_callback(lambda _, rid=request_id: finished(rid))
+    finally:
+        for task in list(pending.values()):
+            task.cancel()
+        await asyncio.gather(*pending.values(), return_exceptions=True)
 
 
 @router.get("/health", response_model=HealthResponse)
 async def mcp_health() -> HealthResponse:
     client = _client()
     try:
-        data = client.health()
+        data = await client.health()
         return HealthResponse(**data)
     except McpClientError as e:
         raise HTTPException(status_code=503, detail={"code": e.code, "message": e.message})
@@ -13,11 +13,14 @@ Monitoring Router - 모니터링 API 엔드포인트
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
 
+from ..services.admission import get_admission_controller
+from ..services.jobs import get_job_manager
 from ..services.metrics_collector import get_metrics_collector
 from ..services.health_checker import get_health_checker
+from ..services.session_pool import peek_session_pool
 
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
@@ -49,6 +52,104 @@ class MetricsSummary(BaseModel):
     avg_latency_ms: float
 
 
+class ToolCacheMetrics(BaseModel):
+    """도구별 결과 캐시 카운터"""
+    name: str
+    hits: int
+    misses: int
+    evictions: int
+
+
+class CacheMetrics(BaseModel):
+    """결과 캐시 통계 (MCP_CACHE_TOOLS)"""
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+    tools: List[ToolCacheMetrics]
+
+
+class ToolCoalescingMetrics(BaseModel):
+    """도구별 coalescing 카운터"""
+    name: str
+    coalesced: int
+
+
+class CoalescingMetrics(BaseModel):
+    """동일 호출 coalescing 통계 (진행 중인 호출에 합류한 요청 수)"""
+    coalesced: int
+    tools: List[ToolCoalescingMetrics]
+
+
+class ToolHedgingMetrics(BaseModel):
+    """도구별 hedging 카운터"""
+    name: str
+    eligible: int
+    hedged: int
+    won: int
+
+
+class HedgingMetrics(BaseModel):
+    """hedging 통계 (MCP_HEDGE_PERCENTILE)"""
+    eligible: int
+    hedged: int
+    won: int
+    hedge_rate: float
+    win_rate: float
+    tools: List[ToolHedgingMetrics]
+
+
+class AdmissionClassMetrics(BaseModel):
+    """우선순위 클래스별 admission 통계 (대기 시간: 밀리초)"""
+    priority: str
+    admitted: int
+    rejected: int
+    timed_out: int
+    avg_wait_ms: float
+    p95_wait_ms: int
+    max_wait_ms: int
+
+
+class AdmissionMetrics(BaseModel):
+    """admission 통계 (MCP_ADMISSION_*) - 현재 대기열 깊이 포함"""
+    enabled: bool
+    in_flight: int
+    queue_depth: int
+    queued: Dict[str, int]
+    max_concurrent: int
+    max_queue: int
+    max_wait: float
+    admitted: int
+    rejected: int
+    timed_out: int
+    classes: List[AdmissionClassMetrics]
+
+
+class JobTimingMetrics(BaseModel):
+    """최근 job의 시간 분포 (밀리초)"""
+    avg: float
+    p95: int
+    max: int
+
+
+class JobMetrics(BaseModel):
+    """비동기 job 통계 (MCP_JOBS_*) - 현재 대기열 깊이와 보관 중인 결과 포함"""
+    workers: int
+    busy_workers: int
+    queue_depth: int
+    max_queue: int
+    jobs: Dict[str, int]  # 상태별 보관 중인 job 수 (queued, running, succeeded, failed)
+    stored_bytes: int
+    max_bytes: int
+    ttl: float
+    evicted: int
+    succeeded: int
+    failed: int
+    rejected: int
+    queue_ms: JobTimingMetrics  # 대기열 대기 시간
+    run_ms: JobTimingMetrics  # 도구 호출 실행 시간
+
+
 class ServerHealth(BaseModel):
     """서버 헬스 상태 (요약)"""
     name: str
@@ -64,6 +165,7 @@ class SystemStatusResponse(BaseModel):
     uptime_seconds: int
     servers: List[ServerHealth]
     metrics_summary: MetricsSummary
+    pool: Optional[Dict[str, Any]] = None  # 세션 풀 통계 (crashes, restarts, limiter, breaker 등; 게이트웨이는 서버별)
 
 
 class MetricsResponse(BaseModel):
@@ -71,6 +173,11 @@ class MetricsResponse(BaseModel):
     timestamp: str
     uptime_seconds: int
     tools: List[ToolMetrics]
+    cache: Optional[CacheMetrics] = None
+    coalescing: Optional[CoalescingMetrics] = None
+    hedging: Optional[HedgingMetrics] = None
+    admission: Optional[AdmissionMetrics] = None
+    jobs: Optional[JobMetrics] = None
 
 
 class HealthDetailResponse(BaseModel):
@@ -159,12 +266,22 @@ async def get_system_status() -> SystemStatusResponse:
     else:
         overall_status = "ok"
 
+    # 세션 풀 통계 (stdio/ws/http 모드에서만 존재, 게이트웨이는 servers 아래 서버별 풀)
+    pool = peek_session_pool()
+    pool_stats = pool.stats() if pool is not None else None
+    pools = (pool_stats.get("servers") or {"": pool_stats}).values() if pool_stats is not None else []
+
+    # 서킷 브레이커가 하나라도 열려 있으면 (fail-fast 중) degraded로 표시
+    if any(p["breaker"]["state"] != "closed" for p in pools) and overall_status in ("ok", "no_servers"):
+        overall_status = "degraded"
+
     return SystemStatusResponse(
         status=overall_status,
         timestamp=datetime.now(timezone.utc).isoformat(),
         uptime_seconds=collector.get_uptime_seconds(),
         servers=servers,
-        metrics_summary=metrics_summary
+        metrics_summary=metrics_summary,
+        pool=pool_stats
     )
 
 
@@ -172,7 +289,7 @@ async def get_system_status() -> SystemStatusResponse:
     "/metrics",
     response_model=MetricsResponse,
     summary="성능 메트릭 조회",
-    description="수집된 성능 메트릭 데이터를 조회합니다 (도구별 호출 횟수, 응답 시간 등)"
+    description="수집된 성능 메트릭 데이터를 조회합니다 (도구별 호출 횟수, 응답 시간, 캐시 hit/miss 등)"
 )
 async def get_metrics(tool: Optional[str] = None) -> MetricsResponse:
     """
@@ -210,7 +327,12 @@ async def get_metrics(tool: Optional[str] = None) -> MetricsResponse:
     return MetricsResponse(
         timestamp=datetime.now(timezone.utc).isoformat(),
         uptime_seconds=metrics_data["uptime_seconds"],
-        tools=[ToolMetrics(**t) for t in tools]
+        tools=[ToolMetrics(**t) for t in tools],
+        cache=CacheMetrics(**metrics_data["cache"]),
+        coalescing=CoalescingMetrics(**metrics_data["coalescing"]),
+        hedging=HedgingMetrics(**metrics_data["hedging"]),
+        admission=AdmissionMetrics(**get_admission_controller().stats(), **metrics_data["admission"]),
+        jobs=JobMetrics(**get_job_manager().stats(), **metrics_data["jobs"])
     )
 
 
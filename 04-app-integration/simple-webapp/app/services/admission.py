@@ -0,0 +1,168 @@
+"""
+Admission control in front of the /mcp endpoints.
+
+Under overload, requests otherwise pile up without limit inside uvicorn and
+the MCP client, and latency grows without bound. The controller admits at
+most MCP_ADMISSION_MAX_CONCURRENT requests at a time; the rest wait in a
+bounded queue:
+
+- priority classes (``X-MCP-Priority`` header): ``interactive`` waiters are
+  always admitted before ``batch`` ones, and batch requests may fill at most
+  half of the queue so interactive traffic still finds room
+- a full queue rejects at once with ``queue_full``; a request that waited
+  MCP_ADMISSION_MAX_WAIT seconds gives up with ``queue_timeout`` (both 503
+  with Retry-After)
+- admitted / rejected / timed-out counts and queue wait times per class are
+  recorded in MetricsCollector; the live queue depth comes from ``stats()``
+
+MCP_ADMISSION_MAX_CONCURRENT=0 disables admission control.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from .mcp_client import McpClientConfig, McpClientError
+from .metrics_collector import MetricsCollector, get_metrics_collector
+
+# Highest priority first
+PRIORITIES = ("interactive", "batch")
+
+# Share of the queue batch requests may occupy
+BATCH_QUEUE_SHARE = 0.5
+
+
+class AdmissionController:
+    """Concurrency gate with a bounded, prioritized wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int = 256, max_wait: float = 5.0,
+                 metrics: Optional[MetricsCollector] = None) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._metrics = metrics
+        self._active = 0
+        self._waiters: Dict[str, Deque["asyncio.Future[None]"]] = {p: deque() for p in PRIORITIES}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @asynccontextmanager
+    async def admit(self, priority: str = "interactive") -> AsyncIterator[None]:
+        """Hold an admission slot for the body of the ``async with``."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: str = "interactive") -> None:
+        """Take a slot, waiting in the queue if needed; every acquire needs a release()."""
+        if not self.enabled:
+            return
+        if priority not in self._waiters:
+            raise McpClientError("validation_error", f"Unknown priority: {priority}")
+        start = time.perf_counter()
+        if self._active < self.max_concurrent and not self.queue_depth:
+            self._active += 1
+            self._record(priority, "admitted", 0)
+            return
+
+        limit = self.max_queue if priority == PRIORITIES[0] else int(self.max_queue * BATCH_QUEUE_SHARE)
+        if self.queue_depth >= limit:
+            self._record(priority, "rejected")
+            raise McpClientError("queue_full", "Server busy: admission queue is full",
+                                 {"queue_depth": self.queue_depth, "retry_after": 1})
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(priority, waiter)
+            self._record(priority, "timed_out")
+            raise McpClientError("queue_timeout", f"Server busy: not admitted within {self.max_wait} seconds",
+                                 {"retry_after": max(1, round(self.max_wait))})
+        except asyncio.CancelledError:
+            self._forget(priority, waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we left
+            raise
+        self._record(priority, "admitted", int((time.perf_counter() - start) * 1000))
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        # Hand the slot straight to the next waiter, highest priority first
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._active -= 1
+
+    def _forget(self, priority: str, waiter: "asyncio.Future[None]") -> None:
+        try:
+            self._waiters[priority].remove(waiter)
+        except ValueError:
+            pass  # already popped by release()
+
+    def _record(self, priority: str, outcome: str, wait_ms: int = 0) -> None:
+        if self._metrics is not None:
+            self._metrics.record_admission(priority, outcome, wait_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": self._active,
+            "queue_depth": self.queue_depth,
+            "queued": {p: len(w) for p, w in self._waiters.items()},
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+        }
+
+
+# Global singleton (one gate per app process)
+_global_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _global_controller
+
+    if _global_controller is None:
+        with _controller_lock:
+            if _global_controller is None:
+                config = McpClientConfig.from_env()
+                _global_controller = AdmissionController(
+                    config.admission_max_concurrent,
+                    max_queue=config.admission_max_queue,
+                    max_wait=config.admission_max_wait,
+                    metrics=get_metrics_collector(),
+                )
+    return _global_controller
+
+
+def peek_admission_controller() -> Optional[AdmissionController]:
+    """Return the controller if one was created, without creating it."""
+    return _global_controller
+
+
+def reset_admission_controller() -> None:
+    """Drop the controller (app shutdown); the next request builds a fresh one from env."""
+    global _global_controller
+
+    with _controller_lock:
+        _global_controller = None
@@ -0,0 +1,104 @@
+"""
+Consistent-hash request affinity across the sessions (server replicas) of a pool.
+
+Spreading calls over replicas at random wastes whatever each process keeps
+warm: its share of the OS page cache, memoized file contents, open handles.
+With MCP_AFFINITY_KEYS (e.g. ``read_file:path,list_files:directory``) the
+SessionPool hashes that parameter of the call onto a ring of its sessions,
+so the same file keeps landing on the same replica.
+
+- HashRing: each replica owns ``vnodes`` points on a 64-bit ring; a key goes
+  to the first replica clockwise from its hash. Adding or removing a replica
+  only moves the keys on its own arcs.
+- Replicas are ring members by pool slot, not by session object: a session
+  respawned after a crash takes over the slot (and the keys) of the one it
+  replaces.
+- Bounded loads: a replica is skipped while it holds more than
+  MCP_AFFINITY_LOAD_FACTOR x the average in-flight calls, so a hot key
+  spills over to the next replicas on the ring instead of piling onto one.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import math
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set
+
+from .result_cache import FILE_PATH_PARAMS
+
+DEFAULT_VNODES = 64
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, vnodes: int = DEFAULT_VNODES) -> None:
+        self.vnodes = max(1, vnodes)
+        self._points: List[int] = []  # sorted
+        self._owners: Dict[int, str] = {}  # point -> member
+        self._members: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._members
+
+    def add(self, member: str) -> None:
+        if member in self._members:
+            return
+        self._members.add(member)
+        for i in range(self.vnodes):
+            point = _hash(f"{member}#{i}")
+            self._owners[point] = member
+            bisect.insort(self._points, point)
+
+    def remove(self, member: str) -> None:
+        if member not in self._members:
+            return
+        self._members.discard(member)
+        for i in range(self.vnodes):
+            point = _hash(f"{member}#{i}")
+            if self._owners.pop(point, None) is not None:
+                del self._points[bisect.bisect_left(self._points, point)]
+
+    def walk(self, key: str) -> Iterator[str]:
+        """Distinct members in ring order, starting at the owner of ``key``."""
+        if not self._points:
+            return
+        start = bisect.bisect(self._points, _hash(key))
+        seen = set()
+        for i in range(len(self._points)):
+            member = self._owners[self._points[(start + i) % len(self._points)]]
+            if member not in seen:
+                seen.add(member)
+                yield member
+                if len(seen) == len(self):
+                    return
+
+
+def parse_affinity_keys(items: List[str]) -> Dict[str, str]:
+    """``tool[:param]`` entries -> {tool: param}; file tools default to their path param."""
+    keys = {}
+    for item in items:
+        tool, _, param = item.partition(":")
+        tool, param = tool.strip(), param.strip() or FILE_PATH_PARAMS.get(tool.strip(), "")
+        if tool and param:
+            keys[tool] = param
+    return keys
+
+
+def affinity_key(keys: Mapping[str, str], tool: str, params: Mapping[str, Any]) -> Optional[str]:
+    """The value calls of ``tool`` are hashed by, or None (no affinity)."""
+    param = keys.get(tool)
+    value = params.get(param) if param else None
+    return None if value is None else str(value)
+
+
+def load_bound(load_factor: float, in_flight: int, members: int) -> int:
+    """Most calls one replica may hold before a key spills to the next one."""
+    return max(1, math.ceil(load_factor * (in_flight + 1) / max(1, members)))
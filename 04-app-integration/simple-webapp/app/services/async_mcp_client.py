@@ -0,0 +1,717 @@
+"""
+Native asyncio MCP client used by the FastAPI routers.
+
+``McpClient`` is synchronous: awaiting it from an ``async def`` endpoint
+blocks uvicorn's event loop for the whole subprocess round trip. This module
+mirrors its API (list_tools / call_tool / health) on top of
+``asyncio.create_subprocess_exec`` so concurrent HTTP requests overlap.
+
+- AsyncStdioSession: one server process; requests are pipelined and a reader
+  task resolves per-request futures by JSON-RPC id. A request that times out
+  or is cancelled sends notifications/cancelled and its late reply is dropped.
+- AsyncRpcSession: the transport-independent part (pending map, deadlines,
+  notification routing); ws_transport.AsyncWsSession and
+  http_transport.AsyncHttpSession build on it too. A request made with a
+  ``progress`` callback carries ``_meta.progressToken`` (its JSON-RPC id),
+  and notifications/progress naming that token go to the callback until the
+  request ends. ``call_tool(..., raw=True)`` returns the reply's ``result``
+  undecoded as ``passthrough.RawJson``, every content item included.
+  ``call_tool_stream`` hands the reply's bytes to a result_stream.FrameStream
+  instead; AsyncStdioSession does so from the first bytes of the frame on,
+  other transports once a message is complete.
+  Resources and prompts (resources/list, resources/templates/list,
+  resources/read, resources/subscribe, prompts/list, prompts/get) are
+  requested the same way; SessionPool caches them (resource_cache.py).
+- AsyncMcpClient: facade over the shared SessionPool (stdio/ws/http) or the mock
+  adapter, returning (data, latency_ms) like McpClient; MCP_CACHE_TOOLS results
+  come from the shared result_cache.ResultCache, and identical concurrent
+  calls are coalesced by singleflight.AsyncSingleFlight.
+
+Note (Windows): asyncio subprocesses need the default Proactor event loop.
+uvicorn switches to a selector loop when started with --reload, which makes
+stdio mode fail with a connection_error.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from . import json_codec
+from .framing import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_MESSAGE_BYTES, FrameTooLarge, LineFramer, head_id
+from .mcp_client import (
+    INITIALIZE_PARAMS,
+    RESOURCE_NOT_FOUND_RPC_CODE,
+    UNKNOWN_PROMPT_MESSAGE,
+    UNKNOWN_RESOURCE_MESSAGE,
+    McpClientConfig,
+    McpClientError,
+    _append_stderr,
+    _batch_concurrency,
+    _batch_result,
+    _catalog_etag,
+    _catalog_tools,
+    _fail_oversized,
+    _flight_key,
+    _MockAdapter,
+    _parse_batch_item,
+    _raise_for_rpc_error,
+    _tool_result_data,
+)
+from .passthrough import RawJson, split_response
+from .result_cache import ResultCache, get_result_cache
+from .result_stream import FrameStream
+from .singleflight import AsyncSingleFlight, get_async_single_flight
+
+PROGRESS_NOTIFICATION = "notifications/progress"
+
+# Bytes of a reply read before deciding whether it belongs to call_tool_stream
+_STREAM_HEAD_BYTES = 256
+
+# Receives the params of one notifications/progress: progressToken, progress,
+# and optionally total and message
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class AsyncRpcSession:
+    """JSON-RPC multiplexing shared by the asyncio transports.
+
+    Subclasses connect in ``open()``, implement ``_send`` and
+    ``_transport_alive``, feed every incoming message to ``_on_frame`` from
+    their reader task, and call ``_connection_lost`` when it ends.
+    """
+
+    server_type = "unknown"
+    max_message_bytes = DEFAULT_MAX_MESSAGE_BYTES
+
+    def __init__(self, timeout: float = 10) -> None:
+        self.timeout = timeout
+        self.server_info: Optional[Dict[str, Any]] = None
+        self._request_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._notification_handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._progress: Dict[Any, ProgressCallback] = {}  # progressToken -> subscriber
+        self._raw: Set[int] = set()  # ids whose result is passed through undecoded
+        self._reply_streams: Dict[int, FrameStream] = {}  # ids whose reply goes to a FrameStream
+        self._lost_handlers: List[Callable[[str], None]] = []
+        self._closed_reason: Optional[str] = None
+        self._tasks: List[asyncio.Task] = []
+        self.dropped_responses = 0
+
+    async def _initialize(self) -> None:
+        try:
+            self.server_info = await self.request("initialize", INITIALIZE_PARAMS)
+        except Exception as e:
+            await self.close()
+            raise McpClientError("initialization_error", f"Failed to initialize MCP session: {e}")
+
+    # transport hooks
+    async def _send(self, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _transport_alive(self) -> bool:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        raise NotImplementedError
+
+    # state
+    def is_alive(self) -> bool:
+        return self._closed_reason is None and self._transport_alive()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def add_notification_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback for server-initiated notifications."""
+        self._notification_handlers.append(handler)
+
+    def add_lost_handler(self, handler: Callable[[str], None]) -> None:
+        """Register a callback run once when the connection ends (crash, EOF, close)."""
+        self._lost_handlers.append(handler)
+
+    # JSON-RPC
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None,
+                      progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        """Send a request and await its result (raises McpClientError).
+
+        progress: called with the params of each notifications/progress the
+        server sends for this request.
+        raw: return the result as RawJson instead of decoding it.
+        """
+        if not self.is_alive():
+            raise McpClientError("connection_closed", f"{self.server_type} session is not connected")
+
+        self._request_id += 1
+        request_id = self._request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        params = params or {}
+        if progress is not None:
+            self._progress[request_id] = progress
+            params = {**params, "_meta": {**params.get("_meta", {}), "progressToken": request_id}}
+        if raw:
+            self._raw.add(request_id)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        limit = timeout or self.timeout
+        try:
+            try:
+                await self._send(request)
+            except McpClientError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                raise McpClientError("communication_error", f"Communication failed: {e}")
+
+            try:
+                response = await asyncio.wait_for(future, limit)
+            except asyncio.TimeoutError:
+                self._abandon(request_id, f"Client timed out after {limit} seconds")
+                raise McpClientError("timeout", f"Server did not respond within {limit} seconds")
+            except asyncio.CancelledError:
+                # Caller went away (client disconnect, lost hedge, ...)
+                self._abandon(request_id, "Client cancelled the request")
+                raise
+        finally:
+            self._pending.pop(request_id, None)
+            self._progress.pop(request_id, None)
+            self._raw.discard(request_id)
+
+        _raise_for_rpc_error(response)
+        result = response.get("result", {})
+        if raw and not isinstance(result, RawJson):
+            result = RawJson(json_codec.dumps(result))  # the frame needed a regular parse
+        return result
+
+    async def call_tool_stream(self, name: str, params: Dict[str, Any],
+                               timeout: Optional[float] = None) -> FrameStream:
+        """Call a tool and return as soon as its reply starts arriving.
+
+        The reply's bytes are then read from the returned FrameStream (see
+        result_stream.tool_text); ``timeout`` bounds the wait for the start.
+        """
+        if not self.is_alive():
+            raise McpClientError("connection_closed", f"{self.server_type} session is not connected")
+
+        self._request_id += 1
+        request_id = self._request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._reply_streams[request_id] = FrameStream()
+        request = {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                   "params": {"name": name, "arguments": params}}
+        limit = timeout or self.timeout
+        try:
+            try:
+                await self._send(request)
+            except McpClientError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                raise McpClientError("communication_error", f"Communication failed: {e}")
+
+            try:
+                return await asyncio.wait_for(future, limit)
+            except asyncio.TimeoutError:
+                self._abandon(request_id, f"Client timed out after {limit} seconds")
+                raise McpClientError("timeout", f"Server did not respond within {limit} seconds")
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    future.result().close()  # the reply started as the caller went away
+                self._abandon(request_id, "Client cancelled the request")
+                raise
+        finally:
+            self._pending.pop(request_id, None)
+            self._reply_streams.pop(request_id, None)
+
+    def _start_stream(self, head: bytes) -> Optional[FrameStream]:
+        """The stream waiting for the reply that starts with ``head``, handed to its caller."""
+        request_id = head_id(head)
+        stream = self._reply_streams.pop(request_id, None) if request_id is not None else None
+        if stream is None:
+            return None
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            self.dropped_responses += 1
+            stream.close()  # nobody reads it; the frame is skipped
+        else:
+            future.set_result(stream)
+        return stream
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a JSON-RPC notification (no response expected)."""
+        await self._send({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    def _abandon(self, request_id: int, reason: str) -> None:
+        """Forget a request and tell the server to stop working on it.
+
+        A response that still arrives later finds no waiter and is dropped by
+        the reader, so the session stays usable.
+        """
+        if self._pending.pop(request_id, None) is None or not self.is_alive():
+            return
+        asyncio.ensure_future(self._notify_quietly(
+            "notifications/cancelled", {"requestId": request_id, "reason": reason}
+        ))
+
+    async def _notify_quietly(self, method: str, params: Dict[str, Any]) -> None:
+        try:
+            await self.notify(method, params)
+        except Exception:
+            pass  # Best effort; the reader reports a broken connection
+
+    def _on_frame(self, frame: Any) -> None:
+        """Decode one incoming message and route it."""
+        if self._reply_streams:
+            data = frame.encode() if isinstance(frame, str) else frame
+            stream = self._start_stream(bytes(data[:_STREAM_HEAD_BYTES]))
+            if stream is not None:
+                stream.write_nowait(bytes(data))
+                stream.finish()
+                return
+        if self._raw:
+            message = split_response(frame, self._raw)
+            if message is not None:
+                self._dispatch(message)
+                return
+        try:
+            message = json_codec.loads(frame)
+        except ValueError as e:
+            # Without an id the bad frame cannot be attributed; fail everyone
+            self._fail_pending(McpClientError("protocol_error", f"Invalid JSON response: {e}"))
+            return
+        if isinstance(message, dict):
+            self._dispatch(message)
+
+    def _on_frame_too_large(self, error: FrameTooLarge) -> None:
+        _fail_oversized(error, self._dispatch_error, self._fail_pending)
+
+    def _dispatch_error(self, request_id: int, error: McpClientError) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is None:
+            self.dropped_responses += 1
+        elif not future.done():
+            future.set_exception(error)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        msg_id = message.get("id")
+        if msg_id is not None and "method" not in message:
+            future = self._pending.pop(msg_id, None)
+            if future is None:
+                self.dropped_responses += 1  # late reply to an abandoned request
+            elif not future.done():
+                future.set_result(message)
+            return
+        if "method" in message and msg_id is None:
+            if message["method"] == PROGRESS_NOTIFICATION:
+                self._dispatch_progress(message.get("params") or {})
+            for handler in list(self._notification_handlers):
+                try:
+                    handler(message)
+                except Exception:
+                    pass  # A broken handler must not kill the reader
+        # Server-to-client requests (sampling, roots, ...) are not supported
+
+    def _dispatch_progress(self, params: Dict[str, Any]) -> None:
+        subscriber = self._progress.get(params.get("progressToken"))
+        if subscriber is None:
+            return  # the request already ended, or the token is not ours
+        try:
+            subscriber(params)
+        except Exception:
+            pass  # A broken subscriber must not kill the reader
+
+    def _connection_lost(self, reason: str, detail: Optional[Dict[str, Any]] = None) -> None:
+        first = self._closed_reason is None
+        if first:
+            self._closed_reason = reason
+        self._reply_streams.clear()  # their callers are failed with the rest
+        self._fail_pending(McpClientError("connection_closed", reason, detail))
+        if first:
+            for handler in list(self._lost_handlers):
+                try:
+                    handler(reason)
+                except Exception:
+                    pass  # A broken handler must not kill the reader
+
+    def _fail_pending(self, error: McpClientError) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _cancel_tasks(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._closed_reason is None:
+            self._closed_reason = "Session closed"
+
+    # adapter interface
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Fetch the whole tools/list catalog, following nextCursor pages."""
+        tools, cursor = [], None
+        while True:
+            result = await self.request("tools/list", {"cursor": cursor} if cursor else None)
+            tools.extend(_catalog_tools(result))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return tools
+
+    async def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        result = await self.request("tools/call", {"name": name, "arguments": params},
+                                    timeout=timeout, progress=progress, raw=raw)
+        return result if raw else _tool_result_data(result)
+
+    async def _list_all(self, method: str, key: str) -> List[Dict[str, Any]]:
+        """Every ``key`` item of a paginated list method, following nextCursor."""
+        items: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            result = await self.request(method, {"cursor": cursor} if cursor else None)
+            items.extend(result.get(key, []))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return items
+
+    @property
+    def capabilities(self) -> Dict[str, Any]:
+        """The server's capabilities from its initialize result."""
+        return (self.server_info or {}).get("capabilities") or {}
+
+    async def list_resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        """resources/list and resources/templates/list, every page."""
+        resources = await self._list_all("resources/list", "resources")
+        try:
+            templates = await self._list_all("resources/templates/list", "resourceTemplates")
+        except McpClientError as e:
+            if e.code != "-32601":  # Method not found: a server without templates
+                raise
+            templates = []
+        return {"resources": resources, "resourceTemplates": templates}
+
+    async def read_resource(self, uri: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        try:
+            return await self.request("resources/read", {"uri": uri}, timeout=timeout)
+        except McpClientError as e:
+            if e.code == RESOURCE_NOT_FOUND_RPC_CODE or e.message.startswith(UNKNOWN_RESOURCE_MESSAGE):
+                raise McpClientError("resource_not_found", e.message, e.detail)
+            raise
+
+    async def subscribe_resource(self, uri: str) -> None:
+        """Ask for notifications/resources/updated about ``uri`` on this session."""
+        await self.request("resources/subscribe", {"uri": uri})
+
+    async def list_prompts(self) -> List[Dict[str, Any]]:
+        return await self._list_all("prompts/list", "prompts")
+
+    async def get_prompt(self, name: str, arguments: Dict[str, str],
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        try:
+            return await self.request("prompts/get", {"name": name, "arguments": arguments}, timeout=timeout)
+        except McpClientError as e:
+            if e.message.startswith(UNKNOWN_PROMPT_MESSAGE):
+                raise McpClientError("prompt_not_found", e.message, e.detail)
+            raise
+
+    async def health(self) -> Dict[str, Any]:
+        if not self.is_alive():
+            return {"status": "error", "server_type": self.server_type,
+                    "message": self._closed_reason or "Session not connected"}
+        return {"status": "ok", "server_type": self.server_type, "server_info": self.server_info}
+
+
+class AsyncStdioSession(AsyncRpcSession):
+    """One MCP server subprocess driven from the event loop."""
+
+    server_type = "stdio"
+
+    def __init__(self, exec_path: str, timeout: float = 10,
+                 max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES,
+                 args: Sequence[str] = (), env: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(timeout)
+        self.exec_path = exec_path
+        self.max_message_bytes = max_message_bytes
+        self.args = list(args)
+        self.env = env  # added to the inherited environment
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._stderr_tail: Deque[str] = deque(maxlen=20)
+
+    @classmethod
+    async def open(cls, exec_path: str, timeout: float = 10,
+                   max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES,
+                   args: Sequence[str] = (), env: Optional[Dict[str, str]] = None) -> "AsyncStdioSession":
+        """Spawn the server and run the initialize handshake."""
+        session = cls(exec_path, timeout, max_message_bytes, args, env)
+        await session._start_server()
+        await session._initialize()
+        return session
+
+    async def _start_server(self) -> None:
+        cmd_parts = self.exec_path.split() + self.args
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                *cmd_parts,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, **self.env} if self.env else None,
+                # Only bounds StreamReader's read-ahead; frames are assembled
+                # by LineFramer up to max_message_bytes
+                limit=DEFAULT_CHUNK_SIZE,
+            )
+        except FileNotFoundError as e:
+            raise McpClientError("connection_error", f"Server executable not found: {self.exec_path}", {"detail": str(e)})
+        except NotImplementedError as e:
+            raise McpClientError(
+                "connection_error",
+                "Event loop does not support subprocesses (on Windows run uvicorn without --reload)",
+                {"detail": repr(e)},
+            )
+        except Exception as e:
+            raise McpClientError("connection_error", f"Failed to start server: {e}", {"detail": str(e)})
+
+        self._tasks = [
+            asyncio.create_task(self._reader_loop()),
+            # Drain stderr so server logging can never fill the pipe and stall it
+            asyncio.create_task(self._stderr_loop()),
+        ]
+
+    def _transport_alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        # One write() per message keeps concurrent frames from interleaving
+        self._proc.stdin.write(json_codec.dumps(message) + b"\n")
+        await self._proc.stdin.drain()
+
+    async def _reader_loop(self) -> None:
+        reason = "EOF: Server closed connection"
+        framer = LineFramer(self.max_message_bytes)
+        streaming: Optional[FrameStream] = None  # gets the rest of the current frame
+        try:
+            while True:
+                chunk = await self._proc.stdout.read(framer.chunk_size)
+                if not chunk:
+                    break
+                while chunk:
+                    if streaming is not None:
+                        newline = chunk.find(b"\n")
+                        if newline < 0:
+                            await streaming.write(chunk)
+                            break
+                        await streaming.write(chunk[:newline])
+                        streaming.finish()
+                        streaming, chunk = None, chunk[newline + 1:]
+                        continue
+                    framer.append(chunk)
+                    framer.drain(self._on_frame, self._on_frame_too_large)
+                    chunk = b""
+                    # A call_tool_stream reply is handed over once its id is in
+                    if self._reply_streams and framer.buffered:
+                        streaming = self._start_stream(framer.peek(_STREAM_HEAD_BYTES))
+                        if streaming is not None:
+                            chunk = framer.take()
+        except asyncio.CancelledError:
+            reason = "Session closed"
+        except Exception as e:  # noqa: BLE001
+            reason = f"Communication failed: {e}"
+        if streaming is not None:
+            streaming.finish(McpClientError("connection_closed", reason))
+        self._connection_lost(reason, {"stderr": list(self._stderr_tail)})
+
+    async def _stderr_loop(self) -> None:
+        try:
+            while True:
+                chunk = await self._proc.stderr.read(DEFAULT_CHUNK_SIZE)
+                if not chunk:
+                    return
+                _append_stderr(self._stderr_tail, chunk)
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    async def close(self) -> None:
+        """Terminate the server process and stop the reader tasks."""
+        if self._proc is not None and self._proc.returncode is None:
+            try:
+                self._proc.terminate()
+                await asyncio.wait_for(self._proc.wait(), 2)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                self._proc.kill()
+                await self._proc.wait()
+        await self._cancel_tasks()
+
+
+class _AsyncAdapterShim:
+    """Expose a cheap synchronous adapter (mock) through the async interface."""
+
+    def __init__(self, adapter: Any) -> None:
+        self._adapter = adapter
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        return self._adapter.list_tools()
+
+    async def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        result = self._adapter.call_tool(name, params, timeout=timeout)  # answers at once, no progress
+        return RawJson(json_codec.dumps(result)) if raw else result
+
+    async def list_resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._adapter.list_resources()
+
+    async def read_resource(self, uri: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self._adapter.read_resource(uri)
+
+    async def list_prompts(self) -> List[Dict[str, Any]]:
+        return self._adapter.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: Dict[str, str],
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self._adapter.get_prompt(name, arguments)
+
+    async def health(self) -> Dict[str, Any]:
+        return self._adapter.health()
+
+
+class AsyncMcpClient:
+    """asyncio counterpart of McpClient.
+
+    pool: adapter to call through (normally the shared SessionPool). Without
+    one only mock mode works; a per-request server process or connection is
+    exactly what the pool avoids.
+    """
+
+    def __init__(self, config: Optional[McpClientConfig] = None, pool: Optional[Any] = None,
+                 cache: Optional[ResultCache] = None, flights: Optional[AsyncSingleFlight] = None) -> None:
+        self.config = config or McpClientConfig.from_env()
+        self._cache = cache or (get_result_cache() if self.config.cache_tools else None)
+        self._flights = flights or get_async_single_flight()
+
+        mode = self.config.mode
+        if pool is not None:
+            self._adapter = pool
+        elif mode == "mock":
+            self._adapter = _AsyncAdapterShim(_MockAdapter())
+        elif mode in ("stdio", "ws", "http"):
+            raise McpClientError("config_error", f"{mode} mode requires a session pool")
+        else:
+            raise McpClientError("config_error", f"Unsupported MCP_MODE: {mode}")
+
+    # public API
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        return await self._adapter.list_tools()
+
+    async def tool_catalog(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Return (tools, etag); the pool caches both until the catalog changes."""
+        catalog = getattr(self._adapter, "tool_catalog", None)
+        if catalog is not None:
+            return await catalog()
+        tools = await self._adapter.list_tools()
+        return tools, _catalog_etag(tools)
+
+    async def health(self) -> Dict[str, Any]:
+        return await self._adapter.health()
+
+    async def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None, raw: bool = False) -> Tuple[Any, int]:
+        """Call a tool and return (data, latency_ms).
+
+        progress: subscriber for the call's notifications/progress. Such a
+        call is not coalesced with identical ones, since only the leader of a
+        flight would hear from the server.
+        raw: data is the whole MCP result as RawJson (passthrough mode). The
+        result cache and coalescing hold decoded data, so raw calls skip both.
+        """
+        start = time.perf_counter()
+        ttl = None if raw else self.config.cache_tools.get(name)
+        key = self._cache.key(name, params) if ttl and self._cache is not None else None
+        data = self._cache.get(key) if key is not None else None
+        if data is None:
+            extra: Dict[str, Any] = {} if progress is None else {"progress": progress}
+            if raw:
+                extra["raw"] = True
+
+            async def call() -> Dict[str, Any]:
+                result = await self._adapter.call_tool(name, params, timeout=timeout or self.config.timeout_default,
+                                                       **extra)
+                if key is not None:
+                    self._cache.put(key, result, ttl)
+                return result
+
+            flight = None if progress is not None or raw else _flight_key(self.config, name, params)
+            data = await (call() if flight is None else self._flights.do(flight, call))
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        return data, latency_ms
+
+    async def stream_tool(self, name: str, params: Dict[str, Any], chunk_size: int,
+                          timeout: Optional[float] = None) -> AsyncIterator[Union[bytes, Dict[str, Any]]]:
+        """Call a tool and yield its result while it arrives (result_stream.tool_text).
+
+        Pieces are JSON-escaped bytes of the first text item, or one dict of
+        decoded data when the reply cannot be streamed (another layout, mock
+        mode). Like raw calls, streams skip the result cache and coalescing.
+        """
+        stream_tool = getattr(self._adapter, "stream_tool", None)
+        if stream_tool is None:
+            data, _ = await self.call_tool(name, params, timeout=timeout)
+            yield data
+            return
+        pieces = stream_tool(name, params, chunk_size, timeout=timeout or self.config.timeout_default)
+        try:
+            async for piece in pieces:
+                yield piece
+        finally:
+            await pieces.aclose()
+
+    async def list_resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{resources, resourceTemplates}; the pool caches both until the server reports a change."""
+        return await self._adapter.list_resources()
+
+    async def read_resource(self, uri: str, timeout: Optional[float] = None) -> Tuple[Dict[str, Any], int]:
+        """Read a resource and return (resources/read result, latency_ms).
+
+        The pool serves listed resources from its ResourceCache when it can.
+        """
+        start = time.perf_counter()
+        result = await self._adapter.read_resource(uri, timeout=timeout or self.config.timeout_default)
+        return result, int((time.perf_counter() - start) * 1000)
+
+    async def list_prompts(self) -> List[Dict[str, Any]]:
+        return await self._adapter.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: Dict[str, str],
+                         timeout: Optional[float] = None) -> Tuple[Dict[str, Any], int]:
+        """Render a prompt and return (prompts/get result, latency_ms)."""
+        start = time.perf_counter()
+        result = await self._adapter.get_prompt(name, arguments, timeout=timeout or self.config.timeout_default)
+        return result, int((time.perf_counter() - start) * 1000)
+
+    async def call_tools_batch(self, items: List[Dict[str, Any]], concurrency: Optional[int] = None,
+                               timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Call several tools concurrently; one result per item, in order.
+
+        Same contract as McpClient.call_tools_batch. With the shared pool the
+        items spread over its sessions, at most ``concurrency`` at a time.
+        """
+        limit = asyncio.Semaphore(_batch_concurrency(concurrency, self.config))
+
+        async def run(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with limit:
+                start = time.perf_counter()
+                tool, params, error = _parse_batch_item(item)
+                if error is None:
+                    try:
+                        data, _ = await self.call_tool(tool, params, timeout=timeout)
+                        return _batch_result(tool, start, data=data)
+                    except McpClientError as e:
+                        error = e
+                return _batch_result(tool, start, error=error)
+
+        return list(await asyncio.gather(*[run(item) for item in items]))
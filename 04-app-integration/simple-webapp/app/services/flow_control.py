@@ -0,0 +1,177 @@
+"""
+Overload protection for one MCP server: adaptive concurrency limit and
+circuit breaker, applied by SessionPool.call_tool.
+
+Without them a slow server just accumulates callers: each waits for a pooled
+session or a pipelined reply until its own timeout fires, long after the
+HTTP client gave up.
+
+- AdaptiveLimiter (AIMD): caps calls in flight. The limit grows by one per
+  call that finished within ``tolerance`` x the long-run average latency while
+  at least half the limit was in use, and shrinks by ``backoff`` on slower
+  calls, timeouts and transport failures. Calls over the limit fail at once
+  with ``overloaded``.
+- CircuitBreaker: over the last ``window`` calls, once ``failure_rate`` of
+  them failed at the transport level (timeouts, dead sessions; not tool
+  errors) it opens and every call fails with ``circuit_open`` for
+  ``open_seconds``. Then it half-opens: a single probe call is let through,
+  and its outcome closes the breaker or opens it again. failure_rate 0
+  disables it.
+
+The router maps both codes to 503 with ``Retry-After`` (detail.retry_after).
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .mcp_client import McpClientError
+
+# Failures that say the server (not the tool call) is in trouble
+FAILURE_CODES = {
+    "timeout",
+    "connection_closed",
+    "connection_error",
+    "communication_error",
+    "protocol_error",
+    "initialization_error",
+    "pool_exhausted",
+}
+
+# Error codes the router answers with 503 + Retry-After
+UNAVAILABLE_CODES = {"overloaded", "circuit_open", "queue_full", "queue_timeout"}
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by observed latency."""
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: Optional[int] = None,
+                 tolerance: float = 2.0, backoff: float = 0.9, smoothing: float = 0.05) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit or initial)
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._baseline: Optional[float] = None  # long-run average latency (seconds)
+        self.in_flight = 0
+        self.rejected = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, dropped: bool = False) -> None:
+        """Return a slot; dropped = the call timed out or its transport failed."""
+        used = self.in_flight
+        self.in_flight -= 1
+        baseline = self._baseline
+        if dropped or (baseline is not None and latency > self.tolerance * baseline):
+            self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        elif used * 2 >= self.limit:
+            self._limit = min(float(self.max_limit), self._limit + 1)
+        if not dropped:
+            self._baseline = latency if baseline is None else baseline + self.smoothing * (latency - baseline)
+
+    def overloaded_error(self, server_type: str) -> McpClientError:
+        return McpClientError(
+            "overloaded",
+            f"Too many concurrent calls to the {server_type} server (limit {self.limit})",
+            {"limit": self.limit, "retry_after": 1},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "rejected": self.rejected,
+            "latency_ms": None if self._baseline is None else round(self._baseline * 1000, 1),
+        }
+
+
+class CircuitBreaker:
+    """Closed -> open on a failure-rate spike -> half-open probe -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 10, window: Optional[int] = None,
+                 open_seconds: float = 10.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_rate = failure_rate
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=max(window or 2 * self.min_calls, self.min_calls))
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0  # times tripped
+
+    def before_call(self) -> None:
+        """Admit a call or raise circuit_open."""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.open_seconds - self._clock()
+            if remaining > 0:
+                raise self._open_error(remaining)
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                raise self._open_error(1)
+            self._probing = True
+
+    def record(self, failure: Optional[bool]) -> None:
+        """Outcome of an admitted call (None: cancelled or rejected, no verdict)."""
+        if self.state == self.HALF_OPEN:
+            if not self._probing:
+                return  # a call admitted before the breaker opened
+            self._probing = False
+            if failure:
+                self._trip()
+            elif failure is not None:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            return
+        if self.state == self.OPEN or failure is None:
+            return
+        self._outcomes.append(failure)
+        calls = len(self._outcomes)
+        if self.failure_rate > 0 and calls >= self.min_calls and sum(self._outcomes) >= self.failure_rate * calls:
+            self._trip()
+
+    def retry_after(self) -> Optional[int]:
+        if self.state != self.OPEN:
+            return None
+        return max(1, math.ceil(self._opened_at + self.open_seconds - self._clock()))
+
+    def _trip(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def _open_error(self, remaining: float) -> McpClientError:
+        retry_after = max(1, math.ceil(remaining))
+        return McpClientError("circuit_open", f"MCP server circuit is open; retry in {retry_after} seconds",
+                              {"retry_after": retry_after})
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "failure_rate": round(sum(self._outcomes) / calls, 4) if calls else 0.0,
+            "window_calls": calls,
+            "opened": self.opened,
+            "retry_after": self.retry_after(),
+        }
@@ -0,0 +1,171 @@
+"""
+Newline-delimited framing for the stdio transports.
+
+MCP over stdio sends one JSON-RPC message per line. Reading that with
+text-mode ``readline()`` decodes and copies a multi-megabyte ``read_file``
+result several times and has no upper bound on memory. ``LineFramer``
+instead:
+
+- reads large chunks straight into one reusable ``bytearray``
+  (``read_from(stream.readinto1)``, or ``append()`` for asyncio streams)
+- yields each complete frame as a ``memoryview`` into that buffer, so the
+  JSON codec parses the bytes in place and UTF-8 is decoded exactly once
+- rejects frames larger than ``max_message_bytes`` with ``FrameTooLarge``
+  as soon as the limit is crossed, then discards the rest of that line and
+  resynchronizes on the next newline
+- shrinks back to its initial size once a large frame has been consumed
+- lets the reader hand an incomplete frame on elsewhere (``peek()``,
+  ``take()``) once its head shows whose it is (``head_id()``); streamed
+  replies (result_stream.py) are never assembled here
+
+Peak memory per stream is therefore about ``max_message_bytes + chunk_size``.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterator, Optional
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+# Serializers (pydantic, json.dumps of a dict literal) put the envelope keys
+# first, so the id of an oversized response is normally in its first bytes
+_HEAD_BYTES = 256
+_ID_RE = re.compile(rb'^\s*\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*(-?\d+)\s*[,}]')
+
+
+def head_id(head: bytes) -> Optional[int]:
+    """JSON-RPC id of the message starting with ``head``, when it can be read from there."""
+    match = _ID_RE.match(head)
+    return int(match.group(1)) if match else None
+
+
+class FrameTooLarge(ValueError):
+    """A frame exceeded max_message_bytes; its remainder will be skipped."""
+
+    def __init__(self, limit: int, head: bytes) -> None:
+        super().__init__(f"Message exceeds {limit} bytes")
+        self.limit = limit
+        self.head = head
+
+    @property
+    def request_id(self) -> Optional[int]:
+        """JSON-RPC id of the rejected message, when it can be read from its head."""
+        return head_id(self.head)
+
+
+class LineFramer:
+    """Split a byte stream into newline-delimited frames with bounded memory.
+
+    Frames yielded by ``frames()`` are views into the internal buffer and are
+    released before the next one is produced; decode them, don't keep them.
+    """
+
+    def __init__(self, max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if max_message_bytes < 1 or chunk_size < 1:
+            raise ValueError("max_message_bytes and chunk_size must be >= 1")
+        self.max_message_bytes = max_message_bytes
+        self.chunk_size = chunk_size
+        self._buf = bytearray(chunk_size)
+        self._start = 0  # first byte of the current (partial) frame
+        self._end = 0  # end of buffered data
+        self._scan = 0  # no newline in [_start, _scan)
+        self._skipping = False  # discarding the rest of an oversized frame
+
+    @property
+    def buffered(self) -> int:
+        """Bytes of an incomplete frame currently held."""
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    # input
+    def read_from(self, readinto: Callable[[memoryview], Optional[int]]) -> int:
+        """Read one chunk directly into the buffer; returns 0 at EOF."""
+        self._reserve(self.chunk_size)
+        with memoryview(self._buf) as view:
+            with view[self._end:self._end + self.chunk_size] as target:
+                n = readinto(target) or 0
+        self._end += n
+        return n
+
+    def append(self, data: bytes) -> None:
+        """Buffer bytes read elsewhere (e.g. from an asyncio StreamReader)."""
+        self._reserve(len(data))
+        self._buf[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    # output
+    def frames(self) -> Iterator[memoryview]:
+        """Yield every complete frame buffered so far.
+
+        Raises FrameTooLarge once the pending partial frame passes the limit.
+        """
+        buf = self._buf
+        while True:
+            newline = buf.find(b"\n", self._scan, self._end)
+            if newline < 0:
+                self._scan = self._end
+                if self._skipping:
+                    self._start = self._scan = self._end  # drop the discarded bytes
+                elif self._end - self._start > self.max_message_bytes:
+                    head = bytes(buf[self._start:self._start + _HEAD_BYTES])
+                    self._skipping = True
+                    self._start = self._scan = self._end
+                    raise FrameTooLarge(self.max_message_bytes, head)
+                return
+            start, self._start = self._start, newline + 1
+            self._scan = self._start
+            if self._skipping:
+                self._skipping = False
+                continue
+            if newline - start > self.max_message_bytes:
+                raise FrameTooLarge(self.max_message_bytes, bytes(buf[start:start + _HEAD_BYTES]))
+            if newline > start and buf[newline - 1] == 0x0D:
+                newline -= 1  # tolerate CRLF from Windows servers
+            if newline == start:
+                continue  # blank line
+            with memoryview(buf) as view:
+                with view[start:newline] as frame:
+                    yield frame
+
+    def peek(self, n: int = _HEAD_BYTES) -> bytes:
+        """Up to the first n bytes of the incomplete frame."""
+        return bytes(self._buf[self._start:min(self._start + n, self._end)])
+
+    def take(self) -> bytes:
+        """Remove and return the incomplete frame; its remainder is read elsewhere."""
+        data = bytes(self._buf[self._start:self._end])
+        self._start = self._scan = self._end
+        return data
+
+    def drain(self, on_frame: Callable[[memoryview], None],
+              on_too_large: Callable[[FrameTooLarge], None]) -> None:
+        """Pass every complete frame to on_frame, oversized ones to on_too_large."""
+        while True:
+            try:
+                for frame in self.frames():
+                    on_frame(frame)
+                return
+            except FrameTooLarge as e:
+                on_too_large(e)
+
+    # buffer management
+    def _reserve(self, n: int) -> None:
+        """Make room for n more bytes after _end."""
+        if len(self._buf) - self._end >= n:
+            return
+        pending = self._end - self._start
+        if pending == 0 and len(self._buf) > self.chunk_size and n <= self.chunk_size:
+            # A large frame was consumed; give its memory back
+            self._buf = bytearray(self.chunk_size)
+        elif self._start > 0:
+            # Move the partial frame to the front instead of growing
+            self._buf[:pending] = self._buf[self._start:self._end]
+        self._scan -= self._start
+        self._start, self._end = 0, pending
+        if len(self._buf) - self._end < n:
+            self._buf.extend(bytes(self._end + n - len(self._buf)))
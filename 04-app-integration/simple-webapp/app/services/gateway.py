@@ -0,0 +1,335 @@
+"""
+Multi-server gateway driven by server_profiles.json (MCP_SERVER_PROFILES).
+
+Instead of the single MCP_MODE server, the webapp serves every enabled
+profile of ``03-discover-servers/configs/server_profiles.json``:
+
+- each profile (stdio / ws / http) gets its own SessionPool, so the limiter,
+  circuit breaker, hedging and supervision stay per server
+- start() opens all pools and refresh_tools() fetches every tools/list
+  concurrently; a server that is down is left out of the index and retried
+  at most every RETRY_MISSING_SECONDS
+- the tool index maps each exposed name to (server, tool) in a dict, so
+  routing /mcp/actions/{tool} is a single lookup. A name offered by several
+  servers is only exposed namespaced as ``<server>.<tool>``; every tool also
+  answers to that qualified form.
+- the index is rebuilt when a pool's catalog changes (tools/list_changed, a
+  lost session) or when an unknown name is called
+- resources and prompts are merged from the pools' cached lists. A read goes
+  to the server listing the URI, else to the one whose URI template matches
+  it longest; prompts are named like tools (``<server>.<prompt>`` if shared)
+
+Gateway implements the pool interface the app relies on (start,
+refresh_tools, tool_catalog, call_tool, stream_tool, list_resources, read_resource,
+list_prompts, get_prompt, health, stats, close), so
+``get_session_pool()`` hands it to AsyncMcpClient and the warm-up unchanged.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .async_mcp_client import ProgressCallback
+from .mcp_client import McpClientConfig, McpClientError, _catalog_etag
+from .session_pool import POOLED_MODES, SessionPool, session_factory
+
+# <server><SEPARATOR><tool> names a tool on one server
+SEPARATOR = "."
+
+# Servers missing from the index (down at the last rebuild) are retried this often
+RETRY_MISSING_SECONDS = 5.0
+
+
+@dataclass
+class ServerProfile:
+    """One entry of server_profiles.json."""
+
+    name: str
+    type: str  # stdio | ws | http
+    exec_path: Optional[str] = None
+    args: List[str] = field(default_factory=list)
+    env: Dict[str, str] = field(default_factory=dict)
+    uri: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    enabled: bool = True
+
+    def client_config(self, base: McpClientConfig) -> McpClientConfig:
+        """The shared settings (timeouts, pool sizes, ...) pointed at this server."""
+        return replace(base, mode=self.type, exec_path=self.exec_path, server_uri=self.uri, server_profiles=None)
+
+    def session_factory(self, base: McpClientConfig) -> Callable[[], Awaitable[Any]]:
+        return session_factory(self.client_config(base), args=self.args, env=self.env, headers=self.headers)
+
+
+def load_profiles(path: str) -> List[ServerProfile]:
+    """Read the enabled profiles from a server_profiles.json file."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise McpClientError("config_error", f"Cannot read server profiles {path}: {e}")
+
+    profiles: List[ServerProfile] = []
+    for entry in data.get("profiles", []):
+        if not entry.get("enabled", True):
+            continue
+        name = entry.get("name")
+        if not name or SEPARATOR in name or any(p.name == name for p in profiles):
+            raise McpClientError("config_error", f"Profile names must be unique and not contain '{SEPARATOR}': {name!r}")
+        if entry.get("type") not in POOLED_MODES:
+            raise McpClientError("config_error", f"Profile {name}: unsupported type {entry.get('type')!r}")
+        profiles.append(ServerProfile(
+            name=name,
+            type=entry["type"],
+            exec_path=entry.get("exec_path"),
+            args=list(entry.get("args") or []),
+            env=dict(entry.get("env") or {}),
+            uri=entry.get("uri"),
+            headers=dict(entry.get("headers") or {}),
+        ))
+    return profiles
+
+
+async def probe_profiles(profiles: Sequence[ServerProfile], config: McpClientConfig
+                         ) -> List[Tuple[Optional[Dict[str, Any]], int]]:
+    """Open a fresh session to every profile concurrently and read its health.
+
+    Returns (health, response_ms) per profile; health is None when the server
+    could not be reached. Used by HealthChecker, independent of the pools.
+    """
+    async def probe(profile: ServerProfile) -> Tuple[Optional[Dict[str, Any]], int]:
+        start = time.perf_counter()
+        try:
+            session = await asyncio.wait_for(profile.session_factory(config)(), config.timeout_default)
+            try:
+                health: Optional[Dict[str, Any]] = await session.health()
+            finally:
+                await session.close()
+        except (McpClientError, OSError, asyncio.TimeoutError):
+            health = None
+        return health, int((time.perf_counter() - start) * 1000)
+
+    return list(await asyncio.gather(*[probe(p) for p in profiles]))
+
+
+class Gateway:
+    """Routes tool calls across the SessionPools of several MCP servers."""
+
+    server_type = "gateway"
+
+    def __init__(self, pools: Dict[str, SessionPool], backoff_initial: float = 0.5,
+                 backoff_max: float = 30.0) -> None:
+        if not pools:
+            raise McpClientError("config_error", "No enabled server profiles")
+        self.pools = pools
+        # Read by the warm-up retry loop
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._index: Dict[str, Tuple[str, str]] = {}  # exposed name -> (server, tool)
+        self._conflicts: Dict[str, List[str]] = {}  # shared tool name -> qualified names
+        self._catalog: Optional[Tuple[List[Dict[str, Any]], str]] = None
+        self._generations: Dict[str, int] = {}  # indexed server -> pool catalog generation
+        self._retry_missing_at = 0.0
+        self._index_lock: Optional[asyncio.Lock] = None
+        self._rebuilds = 0
+
+    @classmethod
+    def from_config(cls, config: McpClientConfig) -> "Gateway":
+        pools = {
+            profile.name: SessionPool.from_config(profile.client_config(config), profile.session_factory(config))
+            for profile in load_profiles(config.server_profiles or "")
+        }
+        return cls(pools, config.reconnect_backoff_initial, config.reconnect_backoff_max)
+
+    # lifecycle
+    async def start(self) -> None:
+        """Start every pool concurrently; fails only if no server came up."""
+        results = await asyncio.gather(*[pool.start() for pool in self.pools.values()], return_exceptions=True)
+        _first_error_if_all_failed(results)
+
+    async def close(self, grace: float = 0) -> None:
+        await asyncio.gather(*[pool.close(grace=grace) for pool in self.pools.values()])
+
+    # tool index
+    async def refresh_tools(self) -> List[Dict[str, Any]]:
+        """Refetch every server's tools/list and rebuild the index."""
+        await self._rebuild(refresh=True)
+        return list(self._catalog[0])
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        tools, _ = await self.tool_catalog()
+        return list(tools)
+
+    async def tool_catalog(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Merged catalog (tools carry their ``server``) and its ETag."""
+        if self._catalog is None or self._stale():
+            await self._rebuild()
+        return self._catalog
+
+    async def route(self, name: str) -> Tuple[str, str]:
+        """Return (server, tool) for an exposed tool name."""
+        target = self._index.get(name)
+        if target is None:
+            # New tool (list_changed) or a server that came back
+            await self._rebuild()
+            target = self._index.get(name)
+        if target is None:
+            candidates = self._conflicts.get(name)
+            if candidates:
+                raise McpClientError("tool_not_found",
+                                     f"Tool '{name}' is offered by several servers; call one of: {', '.join(candidates)}",
+                                     {"candidates": candidates})
+            raise McpClientError("tool_not_found", f"Unknown tool: {name}")
+        return target
+
+    def _stale(self) -> bool:
+        for server, pool in self.pools.items():
+            generation = self._generations.get(server)
+            if generation is None:
+                if time.monotonic() >= self._retry_missing_at:
+                    return True
+            elif generation != pool.catalog_generation:
+                return True
+        return False
+
+    async def _rebuild(self, refresh: bool = False) -> None:
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        async with self._index_lock:
+            if not refresh and self._catalog is not None and not self._stale():
+                return  # rebuilt while we waited for the lock
+            servers = list(self.pools)
+            # Taken before fetching: a list_changed during the fetch leaves the index stale
+            generations = {server: self.pools[server].catalog_generation for server in servers}
+            results = await asyncio.gather(
+                *[pool.refresh_tools() if refresh else pool.list_tools() for pool in self.pools.values()],
+                return_exceptions=True,
+            )
+            _first_error_if_all_failed(results)
+            catalogs = {server: tools for server, tools in zip(servers, results) if not isinstance(tools, BaseException)}
+            self._build_index(catalogs)
+            self._generations = {server: generations[server] for server in catalogs}
+            self._retry_missing_at = time.monotonic() + RETRY_MISSING_SECONDS
+            self._rebuilds += 1
+
+    def _build_index(self, catalogs: Dict[str, List[Dict[str, Any]]]) -> None:
+        owners: Dict[str, List[str]] = {}
+        for server, tools in catalogs.items():
+            for tool in tools:
+                owners.setdefault(tool["name"], []).append(server)
+
+        index: Dict[str, Tuple[str, str]] = {}
+        merged: List[Dict[str, Any]] = []
+        for server, tools in catalogs.items():
+            for tool in tools:
+                name = tool["name"]
+                qualified = f"{server}{SEPARATOR}{name}"
+                index[qualified] = (server, name)
+                shared = len(owners[name]) > 1
+                merged.append({**tool, "name": qualified if shared else name, "server": server})
+        for name, servers in owners.items():
+            if len(servers) == 1:
+                index.setdefault(name, (servers[0], name))
+
+        self._index = index
+        self._conflicts = {name: [f"{s}{SEPARATOR}{name}" for s in servers]
+                           for name, servers in owners.items() if len(servers) > 1}
+        self._catalog = (merged, _catalog_etag(merged))
+
+    # adapter interface
+    async def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        server, tool = await self.route(name)
+        return await self.pools[server].call_tool(tool, params, timeout=timeout, progress=progress, raw=raw)
+
+    async def stream_tool(self, name: str, params: Dict[str, Any], chunk_size: int,
+                          timeout: Optional[float] = None) -> AsyncIterator[Union[bytes, Dict[str, Any]]]:
+        server, tool = await self.route(name)
+        pieces = self.pools[server].stream_tool(tool, params, chunk_size, timeout=timeout)
+        try:
+            async for piece in pieces:
+                yield piece
+        finally:
+            await pieces.aclose()
+
+    async def list_resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        listings = await self._listings("list_resources")
+        return {
+            key: [{**item, "server": server} for server, listing in listings.items() for item in listing[key]]
+            for key in ("resources", "resourceTemplates")
+        }
+
+    async def read_resource(self, uri: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        best, best_prefix = None, -1
+        for server, listing in (await self._listings("list_resources")).items():
+            if any(resource.get("uri") == uri for resource in listing["resources"]):
+                best = server
+                break
+            for template in listing["resourceTemplates"]:
+                prefix = template.get("uriTemplate", "").split("{", 1)[0]
+                if uri.startswith(prefix) and len(prefix) > best_prefix:
+                    best, best_prefix = server, len(prefix)
+        if best is None:
+            raise McpClientError("resource_not_found", f"No server offers resource {uri}")
+        return await self.pools[best].read_resource(uri, timeout=timeout)
+
+    async def list_prompts(self) -> List[Dict[str, Any]]:
+        listings = await self._listings("list_prompts")
+        owners: Dict[str, int] = {}
+        for prompts in listings.values():
+            for prompt in prompts:
+                owners[prompt["name"]] = owners.get(prompt["name"], 0) + 1
+        return [{**prompt, "name": f"{server}{SEPARATOR}{prompt['name']}" if owners[prompt["name"]] > 1
+                 else prompt["name"], "server": server}
+                for server, prompts in listings.items() for prompt in prompts]
+
+    async def get_prompt(self, name: str, arguments: Dict[str, str],
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        server, _, prompt = name.partition(SEPARATOR)
+        if server not in self.pools or not prompt:
+            listings = await self._listings("list_prompts")
+            owners = [s for s, prompts in listings.items() if any(p.get("name") == name for p in prompts)]
+            if len(owners) != 1:
+                candidates = [f"{s}{SEPARATOR}{name}" for s in owners]
+                raise McpClientError("prompt_not_found",
+                                     f"Prompt '{name}' is offered by several servers; use one of: {', '.join(candidates)}"
+                                     if candidates else f"Unknown prompt: {name}",
+                                     {"candidates": candidates} if candidates else None)
+            server, prompt = owners[0], name
+        return await self.pools[server].get_prompt(prompt, arguments, timeout=timeout)
+
+    async def _listings(self, method: str) -> Dict[str, Any]:
+        """Each reachable server's (cached) list_resources / list_prompts result."""
+        servers = list(self.pools)
+        results = await asyncio.gather(*[getattr(pool, method)() for pool in self.pools.values()],
+                                       return_exceptions=True)
+        _first_error_if_all_failed(results)
+        return {server: result for server, result in zip(servers, results) if not isinstance(result, BaseException)}
+
+    async def health(self) -> Dict[str, Any]:
+        servers = list(self.pools)
+        results = await asyncio.gather(*[pool.health() for pool in self.pools.values()])
+        healthy = sum(1 for health in results if health.get("status") == "ok")
+        status = "ok" if healthy == len(results) else ("degraded" if healthy else "error")
+        return {"status": status, "server_type": self.server_type, "servers": dict(zip(servers, results))}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "servers": {server: pool.stats() for server, pool in self.pools.items()},
+            "indexed_servers": sorted(self._generations),
+            "tools_indexed": len(self._index),
+            "conflicts": sorted(self._conflicts),
+            "index_rebuilds": self._rebuilds,
+        }
+
+
+def _first_error_if_all_failed(results: List[Any]) -> None:
+    errors = [r for r in results if isinstance(r, BaseException)]
+    for error in errors:
+        if not isinstance(error, McpClientError):
+            raise error  # cancellation or a bug, not a server being down
+    if errors and len(errors) == len(results):
+        raise errors[0]
@@ -5,6 +5,7 @@ Health Checker - MCP 서버 헬스 상태 모니터링
 - 백그라운드 스레드로 실행
 - 타임아웃 감지
 - 장애 상태 판단 및 기록
+- MCP_SERVER_PROFILES 설정 시 모든 활성 프로필 추적
 
 작성일: 2025-12-14
 작성자: Claude Sonnet 4.5 (Anthropic)
@@ -12,6 +13,7 @@ Health Checker - MCP 서버 헬스 상태 모니터링
 
 from __future__ import annotations
 
+import asyncio
 import threading
 import time
 from datetime import datetime, timezone
@@ -116,11 +118,16 @@ class HealthChecker:
         """
         MCP 서버의 헬스를 체크합니다 (내부 메서드).
 
-        현재는 stdio mode의 file_server만 체크합니다.
+        MCP_SERVER_PROFILES가 설정되어 있으면 활성화된 모든 프로필을,
+        아니면 stdio mode의 단일 서버만 체크합니다.
         """
         # MCP 클라이언트 생성 (환경 변수 기반)
         try:
             config = McpClientConfig.from_env()
+            if config.server_profiles:
+                self._check_profiles(config)
+                return
+
             server_name = self._get_server_name(config)
 
             # stdio 모드가 아니면 체크하지 않음
@@ -158,6 +165,31 @@ class HealthChecker:
             # 설정 오류 등으로 체크 불가능한 경우 무시
             pass
 
+    def _check_profiles(self, config: McpClientConfig) -> None:
+        """
+        server_profiles.json의 모든 활성 프로필을 동시에 체크합니다 (내부 메서드).
+
+        프로필마다 새 세션을 열어 헬스를 확인하고 닫습니다.
+        서버 이름은 프로필 이름입니다.
+
+        Args:
+            config: MCP 클라이언트 설정 (server_profiles 경로 포함)
+        """
+        # asyncio 스택은 게이트웨이 모드에서만 필요
+        from .gateway import load_profiles, probe_profiles
+
+        profiles = load_profiles(config.server_profiles)
+        results = asyncio.run(probe_profiles(profiles, config))
+
+        for profile, (health_result, response_time_ms) in zip(profiles, results):
+            self._record_health_check(
+                profile.name,
+                success=health_result is not None,
+                response_time_ms=response_time_ms,
+                server_type=profile.type,
+                server_info=health_result
+            )
+
     def _get_server_name(self, config: McpClientConfig) -> str:
         """
         설정으로부터 서버 이름을 추출합니다.
@@ -289,13 +321,16 @@ class HealthChecker:
             >>> for health in all_health:
             ...     print(f"{health['server_name']}: {health['status']}")
         """
+        # get_health_status()가 Lock을 잡으므로 이름 목록만 Lock 안에서 복사
         with self._lock:
-            result = []
-            for server_name in self._health_data:
-                health = self.get_health_status(server_name)
-                if health:
-                    result.append(health)
-            return result
+            server_names = list(self._health_data)
+
+        result = []
+        for server_name in server_names:
+            health = self.get_health_status(server_name)
+            if health:
+                result.append(health)
+        return result
 
     def is_monitoring(self) -> bool:
         """
@@ -0,0 +1,80 @@
+"""
+Hedged tool calls: race a slow call against a duplicate on another replica.
+
+With several pooled server processes, one paused or slow process sets the
+tail latency. For idempotent tools (MCP_IDEMPOTENT_TOOLS) SessionPool can
+hedge: if a call has not answered within MCP_HEDGE_PERCENTILE of the tool's
+recent latency (MetricsCollector history), the same call is sent to a
+different session, the first successful answer wins and the other request
+is cancelled (notifications/cancelled).
+
+HedgeBudget caps the extra load: every eligible call earns ``ratio`` of a
+hedge, so at most about ratio x calls are duplicated (plus a small burst).
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """Token bucket: each eligible call deposits ``ratio``, each hedge spends 1."""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0) -> None:
+        self.ratio = ratio
+        self.burst = max(1.0, burst)
+        self._tokens = 0.0
+
+    def deposit(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[T]],
+    hedge: Callable[[], Awaitable[T]],
+    delay: float,
+    budget: HedgeBudget,
+    record: Optional[Callable[[str], None]] = None,
+) -> T:
+    """Run primary(); after ``delay`` seconds without an answer, also hedge().
+
+    Returns the first successful result and cancels the other attempt. If
+    both fail, the primary's error is raised.
+    """
+    first = asyncio.ensure_future(primary())
+    second: Optional["asyncio.Future[T]"] = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not budget.try_spend():
+            return await first
+        if record is not None:
+            record("hedged")
+        second = asyncio.ensure_future(hedge())
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (first, second):
+                if task in done and task.exception() is None:
+                    if task is second and record is not None:
+                        record("won")
+                    return task.result()
+        return first.result()  # both failed: raises the primary's error
+    finally:
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
+                task.add_done_callback(_retrieve)
+
+
+def _retrieve(task: "asyncio.Future[object]") -> None:
+    # The loser's outcome is irrelevant; don't log it as never retrieved
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,224 @@
+"""
+Streamable HTTP transport for remote MCP servers (MCP_MODE=http).
+
+One FastMCP server started with ``transport="streamable-http"`` (for example
+``fastmcp_quick_server.py --transport streamable-http``) can serve every
+webapp worker; MCP_SERVER_URI points at its endpoint, e.g.
+``http://127.0.0.1:8001/mcp``.
+
+- AsyncHttpSession: one MCP session (``Mcp-Session-Id``) over an
+  ``httpx.AsyncClient`` keep-alive connection pool. Each request is its own
+  POST; the reply body is either plain JSON or an SSE stream.
+- SSE events are decoded as they arrive, so notifications the server sends
+  while a tool runs (log messages, progress) reach the notification handlers
+  before the final result.
+- Requests that time out or are cancelled close their stream and send
+  notifications/cancelled, like the stdio and ws sessions.
+- Reply bodies are read in chunks against MCP_MAX_MESSAGE_BYTES (a JSON body,
+  an SSE line or an event's data); a bigger one fails only its own request
+  with message_too_large, like the stdio and ws sessions.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from . import json_codec
+from .async_mcp_client import AsyncRpcSession
+from .framing import DEFAULT_MAX_MESSAGE_BYTES
+from .mcp_client import McpClientError
+
+_ACCEPT = "application/json, text/event-stream"
+
+
+class AsyncHttpSession(AsyncRpcSession):
+    """One MCP session against a streamable HTTP endpoint."""
+
+    server_type = "http"
+
+    def __init__(self, url: str, timeout: float = 10, headers: Optional[Dict[str, str]] = None,
+                 max_connections: int = 8, max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES) -> None:
+        super().__init__(timeout)
+        self.url = url
+        self.headers = headers or {}
+        self.max_connections = max_connections
+        self.max_message_bytes = max_message_bytes
+        self.session_id: Optional[str] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._streams: Dict[int, asyncio.Task] = {}  # request id -> POST reading its reply
+
+    @classmethod
+    async def open(cls, url: str, timeout: float = 10, headers: Optional[Dict[str, str]] = None,
+                   max_connections: int = 8,
+                   max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES) -> "AsyncHttpSession":
+        """Open the connection pool and run the initialize handshake."""
+        session = cls(url, timeout, headers, max_connections, max_message_bytes)
+        session._client = httpx.AsyncClient(
+            # Keep one warm connection per pipelined request
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            # SSE replies may stay quiet while a tool runs; request() enforces the deadline
+            timeout=httpx.Timeout(timeout, read=None),
+        )
+        await session._initialize()
+        try:
+            await session.notify("notifications/initialized")
+        except McpClientError:
+            await session.close()
+            raise
+        return session
+
+    def _transport_alive(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def _request_headers(self) -> Dict[str, str]:
+        headers = {"Accept": _ACCEPT, "Content-Type": "application/json", **self.headers}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        version = (self.server_info or {}).get("protocolVersion")
+        if version:
+            headers["Mcp-Protocol-Version"] = version
+        return headers
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if "id" not in message:
+            # Notifications are acknowledged with 202 and carry no body
+            try:
+                response = await self._client.post(self.url, content=json_codec.dumps(message),
+                                                    headers=self._request_headers())
+            except httpx.HTTPError as e:
+                raise McpClientError("communication_error", f"HTTP request failed: {e}", {"url": self.url})
+            self._raise_for_status(response)
+            return
+        # The reply arrives on the POST's own response; read it in the background
+        request_id = message["id"]
+        task = asyncio.create_task(self._post(request_id, message))
+        self._streams[request_id] = task
+        task.add_done_callback(lambda _: self._streams.pop(request_id, None))
+
+    async def _post(self, request_id: int, message: Dict[str, Any]) -> None:
+        try:
+            async with self._client.stream("POST", self.url, content=json_codec.dumps(message),
+                                           headers=self._request_headers()) as response:
+                self._raise_for_status(response)
+                session_id = response.headers.get("mcp-session-id")
+                if session_id:
+                    self.session_id = session_id
+                content_type = response.headers.get("content-type", "")
+                if content_type.startswith("text/event-stream"):
+                    async for data in _iter_sse_data(response, self.max_message_bytes, request_id):
+                        self._on_frame(data)
+                elif content_type.startswith("application/json"):
+                    self._on_frame(await _read_limited(response, self.max_message_bytes, request_id))
+                else:
+                    raise McpClientError("protocol_error", f"Unexpected content type: {content_type or 'none'}")
+            error = McpClientError("protocol_error", "Response stream ended without a result")
+        except asyncio.CancelledError:
+            return  # abandoned or closing; the caller has already been answered
+        except McpClientError as e:
+            error = e
+        except httpx.HTTPError as e:
+            error = McpClientError("communication_error", f"HTTP request failed: {e}", {"url": self.url})
+        future = self._pending.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        if response.status_code == 404 and self.session_id:
+            # The server dropped our session (restart or idle expiry)
+            reason = "HTTP session expired"
+            self._connection_lost(reason, {"url": self.url, "session_id": self.session_id})
+            raise McpClientError("connection_closed", reason, {"url": self.url})
+        if response.status_code >= 400:
+            raise McpClientError(
+                "communication_error",
+                f"HTTP {response.status_code} from MCP server",
+                {"url": self.url, "status": response.status_code},
+            )
+
+    def _abandon(self, request_id: int, reason: str) -> None:
+        super()._abandon(request_id, reason)
+        # Stop reading the reply and hand its connection back to the pool
+        task = self._streams.pop(request_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def close(self) -> None:
+        """End the server-side session and close the connection pool."""
+        self._tasks = list(self._streams.values())
+        await self._cancel_tasks()
+        self._fail_pending(McpClientError("connection_closed", "Session closed"))
+        if self._client is None or self._client.is_closed:
+            return
+        if self.session_id:
+            try:
+                await self._client.delete(self.url, headers=self._request_headers(), timeout=2)
+            except httpx.HTTPError:
+                pass  # Best effort; the server expires idle sessions itself
+        await self._client.aclose()
+
+
+def _too_large(limit: int, request_id: int) -> McpClientError:
+    return McpClientError(
+        "message_too_large",
+        f"Server message exceeds MCP_MAX_MESSAGE_BYTES ({limit} bytes)",
+        {"limit": limit, "request_id": request_id},
+    )
+
+
+async def _read_limited(response: httpx.Response, limit: int, request_id: int) -> bytes:
+    """The whole body, or message_too_large as soon as it outgrows ``limit`` bytes."""
+    length = response.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise _too_large(limit, request_id)
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > limit:
+            raise _too_large(limit, request_id)
+    return bytes(body)
+
+
+async def _iter_sse_data(response: httpx.Response, limit: int, request_id: int) -> AsyncIterator[bytes]:
+    """Yield the ``data`` payload of each server-sent event.
+
+    Lines are split here rather than by ``aiter_lines()``, which would buffer
+    a line of any length; a line or an event's data over ``limit`` bytes
+    raises message_too_large.
+    """
+    data: List[bytes] = []
+    size = 0
+    buf = bytearray()
+    chunks = response.aiter_bytes()
+    while True:
+        chunk = await anext(chunks, None)
+        scan = len(buf)  # the pending partial line has no newline
+        buf += chunk if chunk is not None else b"\n"  # the last line may be unterminated
+        start = 0
+        while True:
+            end = buf.find(b"\n", scan)
+            if end < 0:
+                break
+            line = bytes(buf[start:end]).rstrip(b"\r")
+            start = scan = end + 1
+            if not line:
+                if data:
+                    yield b"\n".join(data)
+                    data, size = [], 0
+                continue
+            field, _, value = line.partition(b":")
+            if field == b"data":
+                value = value[1:] if value.startswith(b" ") else value
+                size += len(value) + 1
+                if size > limit:
+                    raise _too_large(limit, request_id)
+                data.append(value)
+            # event/id/retry fields and ":" comments carry nothing we need
+        del buf[:start]
+        if len(buf) > limit:
+            raise _too_large(limit, request_id)
+        if chunk is None:
+            break
+    if data:
+        yield b"\n".join(data)
@@ -0,0 +1,276 @@
+"""
+Asynchronous jobs for long tool calls.
+
+A slow call (list_files over a large tree) otherwise holds an HTTP
+connection and a uvicorn worker for its whole run, and clients that give up
+retry it and double the load (07-release-share/EXAMPLES/
+example_3_error_handling.py). With the job API:
+
+- ``POST /mcp/jobs`` queues the call and answers 202 with a job id at once;
+  a full queue (MCP_JOBS_MAX_QUEUE) answers 503 ``queue_full``
+- MCP_JOBS_WORKERS worker tasks drain the queue through AsyncMcpClient, so
+  jobs share the pooled sessions, result cache and flow control with
+  regular requests
+- ``GET /mcp/jobs/{id}`` returns the job's status and, once finished, its
+  result or error; ``?wait=N`` long-polls up to N seconds for it to finish
+- finished jobs are kept MCP_JOBS_TTL seconds. Results are stored encoded
+  (served without re-encoding on every poll) and the oldest jobs are
+  evicted once results exceed MCP_JOBS_MAX_BYTES. An expired or evicted job
+  answers 404 ``job_not_found``
+
+Jobs live in process memory: they do not survive a restart and are not
+shared between uvicorn workers. Live queue depth comes from ``stats()``;
+outcomes and queue/run times are recorded in MetricsCollector.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from . import json_codec
+from .async_mcp_client import AsyncMcpClient
+from .mcp_client import McpClientConfig, McpClientError
+from .metrics_collector import MetricsCollector, get_metrics_collector
+from .session_pool import get_session_pool
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+# Longest GET /mcp/jobs/{id}?wait= a client may ask for
+MAX_POLL_SECONDS = 60.0
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    id: str
+    tool: str
+    params: Dict[str, Any]
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    latency_ms: Optional[int] = None  # run time of the tool call
+    result: Optional[bytes] = None  # encoded data, once succeeded
+    error: Optional[Dict[str, Any]] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Everything but the result (see ``result``)."""
+        return {
+            "id": self.id,
+            "tool": self.tool,
+            "status": self.status,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "latency_ms": self.latency_ms,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Bounded job queue, worker tasks and a TTL/size-bounded result store."""
+
+    def __init__(self, client_factory: Callable[[], Any], workers: int = 4, max_queue: int = 1000,
+                 ttl: float = 600.0, max_bytes: int = 64 * 1024 * 1024,
+                 metrics: Optional[MetricsCollector] = None) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._client_factory = client_factory
+        self._metrics = metrics
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=max(1, max_queue))
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()  # oldest first
+        self._bytes = 0
+        self._evicted = 0
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._closed = False
+
+    # public API
+    def submit(self, tool: str, params: Dict[str, Any]) -> Job:
+        """Queue a tool call; raises McpClientError queue_full when the queue is full."""
+        if self._closed:
+            raise McpClientError("queue_full", "Job queue is shutting down", {"retry_after": 1})
+        self._expire()
+        job = Job(uuid.uuid4().hex, tool, params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._record("rejected")
+            raise McpClientError("queue_full", f"Job queue is full ({self.max_queue} jobs)",
+                                 {"max_queue": self.max_queue, "retry_after": 1})
+        self._jobs[job.id] = job
+        self._start_workers()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """The job, or McpClientError job_not_found (unknown, expired or evicted)."""
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise McpClientError("job_not_found", f"Job '{job_id}' not found (unknown, expired or evicted)")
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Job:
+        """The job once finished, or as it is after ``timeout`` seconds."""
+        job = self.get(job_id)
+        if not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), min(timeout, MAX_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def close(self, grace: float = 0) -> None:
+        """Stop taking jobs; running ones get ``grace`` seconds to finish."""
+        self._closed = True
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+        if self._busy and grace > 0:
+            await asyncio.wait(set(self._busy), timeout=grace)
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": self.workers,
+            "busy_workers": len(self._busy),
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "jobs": counts,
+            "stored_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "evicted": self._evicted,
+        }
+
+    # workers
+    def _start_workers(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.ensure_future(self._worker()))
+
+    async def _worker(self) -> None:
+        task = asyncio.current_task()
+        while not self._closed:
+            job = await self._queue.get()
+            self._busy.add(task)
+            try:
+                await self._run(job)
+            finally:
+                self._busy.discard(task)
+
+    async def _run(self, job: Job) -> None:
+        job.status, job.started_at = "running", time.time()
+        start = time.perf_counter()
+        try:
+            data, _ = await self._client_factory().call_tool(job.tool, job.params)
+            job.result, job.status = json_codec.dumps(data), "succeeded"
+        except McpClientError as e:
+            job.error, job.status = {"code": e.code, "message": e.message, "detail": e.detail}, "failed"
+        except asyncio.CancelledError:
+            job.error, job.status = {"code": "cancelled", "message": "Server shut down before the job finished",
+                                     "detail": None}, "failed"
+            raise
+        except Exception as e:  # noqa: BLE001 - a bad job must not take its worker down
+            job.error, job.status = {"code": "internal_error", "message": str(e), "detail": None}, "failed"
+        finally:
+            job.latency_ms = int((time.perf_counter() - start) * 1000)
+            job.finished_at = time.time()
+            self._store(job)
+            job.done.set()
+            self._record(job.status, int((job.started_at - job.created_at) * 1000), job.latency_ms)
+
+    # result store
+    def _store(self, job: Job) -> None:
+        size = len(job.result or b"")
+        if size > self.max_bytes:
+            job.result, job.status = None, "failed"
+            job.error = {"code": "result_too_large",
+                         "message": f"Result of {size} bytes exceeds MCP_JOBS_MAX_BYTES ({self.max_bytes})",
+                         "detail": {"size": size, "max_bytes": self.max_bytes}}
+            size = 0
+        self._finished[job.id] = job
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._forget(next(iter(self._finished)))
+            self._evicted += 1
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if job.finished_at is not None and job.finished_at > cutoff:
+                return
+            self._forget(job.id)
+
+    def _forget(self, job_id: str) -> None:
+        job = self._finished.pop(job_id)
+        self._jobs.pop(job_id, None)
+        self._bytes -= len(job.result or b"")
+
+    def _record(self, outcome: str, queue_ms: int = 0, run_ms: int = 0) -> None:
+        if self._metrics is not None:
+            self._metrics.record_job(outcome, queue_ms, run_ms)
+
+
+# Global singleton (one job queue per app process)
+_global_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _global_manager
+
+    if _global_manager is None:
+        with _manager_lock:
+            if _global_manager is None:
+                config = McpClientConfig.from_env()
+                _global_manager = JobManager(
+                    lambda: AsyncMcpClient(pool=get_session_pool()),
+                    workers=config.jobs_workers,
+                    max_queue=config.jobs_max_queue,
+                    ttl=config.jobs_ttl,
+                    max_bytes=config.jobs_max_bytes,
+                    metrics=get_metrics_collector(),
+                )
+    return _global_manager
+
+
+def peek_job_manager() -> Optional[JobManager]:
+    """Return the manager if one was created, without creating it."""
+    return _global_manager
+
+
+async def close_job_manager(grace: float = 0) -> None:
+    """Close the manager (app shutdown); the next job builds a fresh one from env."""
+    global _global_manager
+
+    with _manager_lock:
+        manager, _global_manager = _global_manager, None
+    if manager is not None:
+        await manager.close(grace)
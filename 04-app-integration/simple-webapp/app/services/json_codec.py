@@ -0,0 +1,120 @@
+"""
+JSON codec for JSON-RPC framing and API responses.
+
+Encoding/decoding dominates CPU for large tool results (read_file), so the
+transports and routers go through this module instead of ``json`` directly.
+It uses the fastest backend that is installed:
+
+- orjson   (``pip install orjson``)
+- msgspec  (``pip install msgspec``)
+- json     (standard library fallback)
+
+Both directions work on bytes: ``dumps`` returns compact UTF-8 bytes and
+``loads`` accepts bytes, bytearray or memoryview (or str), so frames are
+never decoded to text first.
+Invalid input raises ValueError with every backend.
+
+Config via env (optional)
+- MCP_JSON_CODEC: auto | orjson | msgspec | json  (default: auto). A named
+  backend that is not installed falls back to ``json``.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[Union[bytes, str]], Any]
+
+
+def _orjson_codec() -> JsonCodec:
+    import orjson  # type: ignore
+
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=option)
+
+    # orjson.JSONDecodeError is a ValueError subclass already
+    return JsonCodec("orjson", dumps, orjson.loads)
+
+
+def _msgspec_codec() -> JsonCodec:
+    import msgspec  # type: ignore
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return JsonCodec("msgspec", encoder.encode, loads)
+
+
+def _stdlib_codec() -> JsonCodec:
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return encoder.encode(obj).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        # json.loads takes UTF-8 bytes directly but not memoryview frames;
+        # errors are ValueError subclasses
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    return JsonCodec("json", dumps, loads)
+
+
+_FACTORIES = {"orjson": _orjson_codec, "msgspec": _msgspec_codec, "json": _stdlib_codec}
+
+
+def load_codec(name: str = "auto") -> JsonCodec:
+    """Return the named backend, or the fastest installed one for "auto"."""
+    name = name.lower()
+    if name != "auto" and name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON codec: {name} (expected auto, {', '.join(BACKENDS)})")
+    for candidate in BACKENDS if name == "auto" else (name,):
+        try:
+            return _FACTORIES[candidate]()
+        except ImportError:
+            continue
+    return _stdlib_codec()
+
+
+_codec: Optional[JsonCodec] = None
+
+
+def get_codec() -> JsonCodec:
+    """Return the configured codec, chosen on first use.
+
+    Resolved lazily so MCP_JSON_CODEC from the app's .env (loaded after the
+    routers are imported) is honored.
+    """
+    global _codec
+
+    if _codec is None:
+        _codec = load_codec(os.getenv("MCP_JSON_CODEC", "auto"))
+    return _codec
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    return get_codec().dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes-like or str (raises ValueError on invalid input)."""
+    return get_codec().loads(data)
@@ -7,25 +7,92 @@ Goals
   so endpoints and tests work without external servers.
 
 Config via env (optional)
-- MCP_MODE: mock | stdio | ws  (default: mock)
+- MCP_MODE: mock | stdio | ws | http  (default: mock)
 - MCP_EXEC_PATH: path to executable (for stdio)
-- MCP_SERVER_URI: ws:// or wss:// (for ws)
+- MCP_SERVER_URI: ws:// or wss:// (for ws); streamable HTTP endpoint such as
+  http://127.0.0.1:8001/mcp (for http)
+- MCP_SERVER_PROFILES: path to a server_profiles.json; when set, the webapp
+  serves every enabled profile through one gateway instead of the single
+  MCP_MODE server (see gateway.py)
 - MCP_TIMEOUT_DEFAULT: seconds (int, default 10)
-- MCP_RETRY_MAX: int (default 3)  — future use
+- MCP_RETRY_MAX: int (default 3) — replays of an idempotent call whose
+  server crashed or connection dropped mid-call
+- MCP_IDEMPOTENT_TOOLS: comma-separated tools safe to replay
+  (default: read_file,list_files)
+- MCP_POOL_MIN_SIZE: stdio sessions started eagerly (int, default 1)
+- MCP_POOL_MAX_SIZE: upper bound on live stdio sessions (int, default 4)
+- MCP_POOL_ACQUIRE_TIMEOUT: seconds to wait for a free session (float, default 5)
+- MCP_POOL_MAX_INFLIGHT: concurrent requests pipelined per session (int, default 8)
+- MCP_RECONNECT_BACKOFF_INITIAL / MCP_RECONNECT_BACKOFF_MAX: seconds between
+  failed connect/spawn attempts, doubling per failure (default 0.5 / 30)
+- MCP_JSON_CODEC: auto | orjson | msgspec | json  (default: auto, see json_codec)
+- MCP_MAX_MESSAGE_BYTES: largest stdio/ws/http message accepted from a server
+  (int, default 67108864 = 64 MiB); bigger replies fail with message_too_large
+- MCP_BATCH_CONCURRENCY: batch items in flight at once (int, default 16)
+- MCP_BATCH_MAX_ITEMS: largest batch accepted by /mcp/actions:batch (int, default 500)
+- MCP_SHUTDOWN_GRACE: seconds in-flight calls get to finish at shutdown (float, default 10)
+- MCP_CACHE_TOOLS: comma-separated tool[:ttl_seconds] whose results are cached
+  (default: none; ttl defaults to 30), e.g. read_file:30,list_files:5
+- MCP_CACHE_MAX_BYTES: total size of cached results (int, default 33554432 = 32 MiB)
+- MCP_LIMIT_MIN: floor of the adaptive per-server concurrency limit (int, default 1);
+  the ceiling is MCP_POOL_MAX_SIZE * MCP_POOL_MAX_INFLIGHT
+- MCP_LIMIT_LATENCY_TOLERANCE: a call slower than this multiple of the average
+  latency shrinks the limit (float, default 2.0)
+- MCP_BREAKER_FAILURE_RATE: share of failed calls that opens the circuit
+  (float, default 0.5; 0 disables)
+- MCP_BREAKER_MIN_CALLS: calls observed before the rate counts (int, default 10)
+- MCP_BREAKER_OPEN_SECONDS: fail-fast period before a probe call (float, default 10)
+- MCP_HEDGE_PERCENTILE: hedge an idempotent call still running after this
+  percentile of the tool's recent latency (float 0-100, default 0 = off)
+- MCP_HEDGE_BUDGET: at most this share of calls is duplicated (float, default 0.1)
+- MCP_AFFINITY_KEYS: comma-separated tool[:param] whose calls are routed by
+  consistent hashing of that parameter to the same pooled server process
+  (default: none = least-loaded; read_file/list_files default to path/directory)
+- MCP_AFFINITY_LOAD_FACTOR: a process holding more than this multiple of the
+  average in-flight calls passes keys on to the next one (float, default 1.25)
+- MCP_ADMISSION_MAX_CONCURRENT: /mcp requests served at once, the rest queue
+  (int, default 64, 0 = no admission control)
+- MCP_ADMISSION_MAX_QUEUE: queued requests before new ones get 503 (int, default 256)
+- MCP_ADMISSION_MAX_WAIT: seconds a request may wait in the queue (float, default 5)
+- MCP_COALESCE_EXCLUDE: comma-separated tools whose identical concurrent calls
+  are NOT coalesced into one upstream call (default: none; * = all)
+- MCP_JOBS_WORKERS: worker tasks running POST /mcp/jobs calls (int, default 4)
+- MCP_JOBS_MAX_QUEUE: queued jobs before new ones get 503 (int, default 1000)
+- MCP_JOBS_TTL: seconds a finished job and its result are kept (float, default 600)
+- MCP_JOBS_MAX_BYTES: total encoded job results kept; the oldest finished jobs
+  are evicted beyond it (int, default 64 MiB)
+- MCP_WS_MAX_INFLIGHT: calls in flight per /mcp/ws connection; beyond it the
+  socket is not read until one finishes (int, default 32)
+- MCP_RESOURCE_CACHE_TTL: seconds a listed resource's contents are cached when
+  the server cannot notify updates (no resources.subscribe capability; float,
+  default 0 = not cached). Servers that can are cached until they notify
+- MCP_RESOURCE_CACHE_MAX_BYTES: cached resource contents per server (int,
+  default 16 MiB)
 
 Error model
 - Raise McpClientError with code/message; router will convert to HTTP error JSON.
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import subprocess
 import sys
 import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from . import json_codec
+from .affinity import parse_affinity_keys
+from .framing import DEFAULT_MAX_MESSAGE_BYTES, FrameTooLarge, LineFramer
+from .result_cache import DEFAULT_CACHE_MAX_BYTES, ResultCache, canonical_params, get_result_cache
+from .singleflight import FlightKey, SingleFlight, get_single_flight
+
+DEFAULT_CACHE_TTL = 30.0
 
 
 class McpClientError(Exception):
@@ -38,11 +105,45 @@ class McpClientError(Exception):
 
 @dataclass
 class McpClientConfig:
-    mode: str = "mock"  # mock | stdio | ws
+    mode: str = "mock"  # mock | stdio | ws | http
     exec_path: Optional[str] = None
     server_uri: Optional[str] = None
+    server_profiles: Optional[str] = None  # path to server_profiles.json
     timeout_default: int = 10
     retry_max: int = 3
+    pool_min_size: int = 1
+    pool_max_size: int = 4
+    pool_acquire_timeout: float = 5.0
+    pool_max_inflight: int = 8
+    reconnect_backoff_initial: float = 0.5
+    reconnect_backoff_max: float = 30.0
+    max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES
+    batch_concurrency: int = 16
+    batch_max_items: int = 500
+    shutdown_grace: float = 10.0
+    idempotent_tools: Tuple[str, ...] = ("read_file", "list_files")
+    cache_tools: Dict[str, float] = field(default_factory=dict)  # tool -> ttl seconds
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    coalesce_exclude: Tuple[str, ...] = ()
+    limit_min: int = 1
+    limit_latency_tolerance: float = 2.0
+    breaker_failure_rate: float = 0.5
+    breaker_min_calls: int = 10
+    breaker_open_seconds: float = 10.0
+    hedge_percentile: float = 0.0
+    hedge_budget: float = 0.1
+    affinity_keys: Dict[str, str] = field(default_factory=dict)  # tool -> param
+    affinity_load_factor: float = 1.25
+    admission_max_concurrent: int = 64
+    admission_max_queue: int = 256
+    admission_max_wait: float = 5.0
+    jobs_workers: int = 4
+    jobs_max_queue: int = 1000
+    jobs_ttl: float = 600.0
+    jobs_max_bytes: int = 64 * 1024 * 1024
+    ws_max_inflight: int = 32
+    resource_cache_ttl: float = 0.0
+    resource_cache_max_bytes: int = 16 * 1024 * 1024
 
     @classmethod
     def from_env(cls) -> "McpClientConfig":
@@ -50,14 +151,65 @@ class McpClientConfig:
             mode=os.getenv("MCP_MODE", "mock").lower(),
             exec_path=os.getenv("MCP_EXEC_PATH"),
             server_uri=os.getenv("MCP_SERVER_URI"),
+            server_profiles=os.getenv("MCP_SERVER_PROFILES") or None,
             timeout_default=int(os.getenv("MCP_TIMEOUT_DEFAULT", "10")),
             retry_max=int(os.getenv("MCP_RETRY_MAX", "3")),
+            pool_min_size=int(os.getenv("MCP_POOL_MIN_SIZE", "1")),
+            pool_max_size=int(os.getenv("MCP_POOL_MAX_SIZE", "4")),
+            pool_acquire_timeout=float(os.getenv("MCP_POOL_ACQUIRE_TIMEOUT", "5")),
+            pool_max_inflight=int(os.getenv("MCP_POOL_MAX_INFLIGHT", "8")),
+            reconnect_backoff_initial=float(os.getenv("MCP_RECONNECT_BACKOFF_INITIAL", "0.5")),
+            reconnect_backoff_max=float(os.getenv("MCP_RECONNECT_BACKOFF_MAX", "30")),
+            max_message_bytes=int(os.getenv("MCP_MAX_MESSAGE_BYTES", str(DEFAULT_MAX_MESSAGE_BYTES))),
+            batch_concurrency=int(os.getenv("MCP_BATCH_CONCURRENCY", "16")),
+            batch_max_items=int(os.getenv("MCP_BATCH_MAX_ITEMS", "500")),
+            shutdown_grace=float(os.getenv("MCP_SHUTDOWN_GRACE", "10")),
+            idempotent_tools=_env_list("MCP_IDEMPOTENT_TOOLS", "read_file,list_files"),
+            cache_tools=_env_ttls("MCP_CACHE_TOOLS"),
+            cache_max_bytes=int(os.getenv("MCP_CACHE_MAX_BYTES", str(DEFAULT_CACHE_MAX_BYTES))),
+            coalesce_exclude=_env_list("MCP_COALESCE_EXCLUDE", ""),
+            limit_min=int(os.getenv("MCP_LIMIT_MIN", "1")),
+            limit_latency_tolerance=float(os.getenv("MCP_LIMIT_LATENCY_TOLERANCE", "2.0")),
+            breaker_failure_rate=float(os.getenv("MCP_BREAKER_FAILURE_RATE", "0.5")),
+            breaker_min_calls=int(os.getenv("MCP_BREAKER_MIN_CALLS", "10")),
+            breaker_open_seconds=float(os.getenv("MCP_BREAKER_OPEN_SECONDS", "10")),
+            hedge_percentile=float(os.getenv("MCP_HEDGE_PERCENTILE", "0")),
+            hedge_budget=float(os.getenv("MCP_HEDGE_BUDGET", "0.1")),
+            affinity_keys=parse_affinity_keys(list(_env_list("MCP_AFFINITY_KEYS", ""))),
+            affinity_load_factor=float(os.getenv("MCP_AFFINITY_LOAD_FACTOR", "1.25")),
+            admission_max_concurrent=int(os.getenv("MCP_ADMISSION_MAX_CONCURRENT", "64")),
+            admission_max_queue=int(os.getenv("MCP_ADMISSION_MAX_QUEUE", "256")),
+            admission_max_wait=float(os.getenv("MCP_ADMISSION_MAX_WAIT", "5")),
+            jobs_workers=int(os.getenv("MCP_JOBS_WORKERS", "4")),
+            jobs_max_queue=int(os.getenv("MCP_JOBS_MAX_QUEUE", "1000")),
+            jobs_ttl=float(os.getenv("MCP_JOBS_TTL", "600")),
+            jobs_max_bytes=int(os.getenv("MCP_JOBS_MAX_BYTES", str(64 * 1024 * 1024))),
+            ws_max_inflight=int(os.getenv("MCP_WS_MAX_INFLIGHT", "32")),
+            resource_cache_ttl=float(os.getenv("MCP_RESOURCE_CACHE_TTL", "0")),
+            resource_cache_max_bytes=int(os.getenv("MCP_RESOURCE_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
         )
 
 
+def _env_list(name: str, default: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in os.getenv(name, default).split(",") if item.strip())
+
+
+def _env_ttls(name: str) -> Dict[str, float]:
+    ttls = {}
+    for item in _env_list(name, ""):
+        tool, _, ttl = item.partition(":")
+        ttls[tool.strip()] = float(ttl) if ttl.strip() else DEFAULT_CACHE_TTL
+    return ttls
+
+
 class McpClient:
-    def __init__(self, config: Optional[McpClientConfig] = None) -> None:
+    def __init__(self, config: Optional[McpClientConfig] = None, cache: Optional[ResultCache] = None,
+                 flights: Optional[SingleFlight] = None) -> None:
         self.config = config or McpClientConfig.from_env()
+        # Results of MCP_CACHE_TOOLS are served from the shared cache
+        self._cache = cache or (get_result_cache() if self.config.cache_tools else None)
+        # Identical concurrent calls share one upstream request
+        self._flights = flights or get_single_flight()
 
         # Select adapter
         mode = self.config.mode
@@ -66,9 +218,12 @@ class McpClient:
         elif mode == "stdio":
             if not self.config.exec_path:
                 raise McpClientError("config_error", "MCP_EXEC_PATH required for stdio mode")
-            self._adapter = _StdioAdapter(self.config.exec_path, self.config.timeout_default)
-        elif mode == "ws":
-            self._adapter = _NotImplementedAdapter("ws")
+            self._adapter = _StdioAdapter(self.config.exec_path, self.config.timeout_default,
+                                          max_message_bytes=self.config.max_message_bytes)
+        elif mode in ("ws", "http"):
+            from .session_pool import _SyncPoolAdapter  # imports the asyncio stack
+
+            self._adapter = _SyncPoolAdapter(self.config)
         else:
             raise McpClientError("config_error", f"Unsupported MCP_MODE: {mode}")
 
@@ -76,6 +231,12 @@ class McpClient:
     def list_tools(self) -> List[Dict[str, Any]]:
         return self._adapter.list_tools()
 
+    def close(self) -> None:
+        """Release the server process / connections held by the adapter."""
+        close = getattr(self._adapter, "close", None)
+        if close is not None:
+            close()
+
     def health(self) -> Dict[str, Any]:
         return self._adapter.health()
 
@@ -85,10 +246,178 @@ class McpClient:
         timeout: seconds override; adapter should honor when applicable.
         """
         start = time.perf_counter()
-        data = self._adapter.call_tool(name, params, timeout=timeout or self.config.timeout_default)
+        ttl = self.config.cache_tools.get(name)
+        key = self._cache.key(name, params) if ttl and self._cache is not None else None
+        data = self._cache.get(key) if key is not None else None
+        if data is None:
+            def call() -> Dict[str, Any]:
+                result = self._adapter.call_tool(name, params, timeout=timeout or self.config.timeout_default)
+                if key is not None:
+                    self._cache.put(key, result, ttl)
+                return result
+
+            flight = _flight_key(self.config, name, params)
+            data = call() if flight is None else self._flights.do(flight, call)
         latency_ms = int((time.perf_counter() - start) * 1000)
         return data, latency_ms
 
+    def call_tools_batch(self, items: List[Dict[str, Any]], concurrency: Optional[int] = None,
+                         timeout: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Call several tools concurrently; one result per item, in order.
+
+        items: [{"tool": name, "params": {...}}, ...]. Up to ``concurrency``
+        calls (default MCP_BATCH_CONCURRENCY) are in flight at once; on stdio
+        they are pipelined over the one server process. A failing item is
+        reported in its result instead of raising.
+        """
+        if not items:
+            return []
+        workers = min(len(items), _batch_concurrency(concurrency, self.config))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-batch") as executor:
+            return list(executor.map(lambda item: self._call_batch_item(item, timeout), items))
+
+    def _call_batch_item(self, item: Dict[str, Any], timeout: Optional[int]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        tool, params, error = _parse_batch_item(item)
+        if error is None:
+            try:
+                data, _ = self.call_tool(tool, params, timeout=timeout)
+                return _batch_result(tool, start, data=data)
+            except McpClientError as e:
+                error = e
+        return _batch_result(tool, start, error=error)
+
+
+# JSON-RPC helpers shared by the sync adapters and the asyncio client
+INITIALIZE_PARAMS: Dict[str, Any] = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {},
+    "clientInfo": {
+        "name": "fastapi-mcp-client",
+        "version": "0.1.0"
+    }
+}
+
+
+def _raise_for_rpc_error(response: Dict[str, Any]) -> None:
+    """Convert a JSON-RPC error response into McpClientError."""
+    if "error" in response:
+        error = response["error"]
+        raise McpClientError(
+            str(error.get("code", "rpc_error")),
+            error.get("message", "Unknown RPC error"),
+            {"detail": error.get("data")}
+        )
+
+
+def _fail_oversized(
+    error: FrameTooLarge,
+    fail_one: Callable[[int, McpClientError], None],
+    fail_all: Callable[[McpClientError], None],
+) -> None:
+    """Report a rejected oversized frame to its caller (or everyone if unknown)."""
+    request_id = error.request_id
+    client_error = McpClientError(
+        "message_too_large",
+        f"Server message exceeds MCP_MAX_MESSAGE_BYTES ({error.limit} bytes)",
+        {"limit": error.limit, "request_id": request_id},
+    )
+    if request_id is None:
+        fail_all(client_error)
+    else:
+        fail_one(request_id, client_error)
+
+
+_STDERR_CHUNK = 64 * 1024
+
+
+def _append_stderr(tail: Deque[str], chunk: bytes) -> None:
+    """Keep the last lines of server stderr for error details."""
+    for line in chunk.decode("utf-8", "replace").splitlines():
+        if line.strip():
+            tail.append(line.rstrip()[:1000])
+
+
+def _flight_key(config: McpClientConfig, name: str, params: Dict[str, Any]) -> Optional[FlightKey]:
+    """Single-flight key of a call, or None when it must not be coalesced."""
+    if "*" in config.coalesce_exclude or name in config.coalesce_exclude:
+        return None
+    canonical = canonical_params(name, params)
+    return None if canonical is None else (name, canonical)
+
+
+def _batch_concurrency(requested: Optional[int], config: McpClientConfig) -> int:
+    return max(1, requested or config.batch_concurrency)
+
+
+def _parse_batch_item(item: Any) -> Tuple[str, Dict[str, Any], Optional[McpClientError]]:
+    """Return (tool, params, error) for one {"tool", "params"} batch entry."""
+    if not isinstance(item, dict) or not isinstance(item.get("tool"), str):
+        return "", {}, McpClientError("validation_error", "Batch item needs a 'tool' name")
+    params = item.get("params") or {}
+    if not isinstance(params, dict):
+        return item["tool"], {}, McpClientError("validation_error", "'params' must be an object")
+    return item["tool"], params, None
+
+
+def _batch_result(tool: str, start: float, data: Optional[Dict[str, Any]] = None,
+                  error: Optional[McpClientError] = None) -> Dict[str, Any]:
+    """Per-item entry returned by call_tools_batch."""
+    return {
+        "tool": tool,
+        "success": error is None,
+        "data": data,
+        "error": None if error is None else {"code": error.code, "message": error.message, "detail": error.detail},
+        "latency_ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+# Sent by servers whose tools/list result changed (capability tools.listChanged)
+TOOLS_LIST_CHANGED = "notifications/tools/list_changed"
+
+# Resource and prompt counterparts (capabilities resources.subscribe,
+# resources.listChanged, prompts.listChanged); params.uri names the resource
+RESOURCE_UPDATED = "notifications/resources/updated"
+RESOURCES_LIST_CHANGED = "notifications/resources/list_changed"
+PROMPTS_LIST_CHANGED = "notifications/prompts/list_changed"
+
+# How servers report an unknown resource URI or prompt name: the spec's
+# -32002 for resources, or (FastMCP) error code 0 with one of these messages
+RESOURCE_NOT_FOUND_RPC_CODE = "-32002"
+UNKNOWN_RESOURCE_MESSAGE = "Unknown resource:"
+UNKNOWN_PROMPT_MESSAGE = "Unknown prompt:"
+
+
+def _catalog_tools(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Tool entries of one tools/list page, inputSchema included."""
+    tools = []
+    for tool in result.get("tools", []):
+        entry = dict(tool)
+        entry["description"] = entry.get("description") or ""
+        entry.setdefault("inputSchema", {"type": "object"})
+        tools.append(entry)
+    return tools
+
+
+def _catalog_etag(tools: List[Dict[str, Any]]) -> str:
+    """Strong ETag of a tool catalog (stable across key order)."""
+    digest = hashlib.sha256(json.dumps(tools, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _tool_result_data(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract text content from a tools/call result.
+
+    MCP returns: { "content": [{ "type": "text", "text": "..." }, ...] }
+    """
+    if "content" in result:
+        for item in result["content"]:
+            if isinstance(item, dict) and item.get("type") == "text":
+                return {"text": item["text"]}
+
+    # Fallback: return raw result
+    return result
+
 
 class _MockAdapter:
     """Local adapter for development and tests.
@@ -96,12 +425,17 @@ class _MockAdapter:
     Tools:
     - echo: returns { echo: params }
     - sum: expects { numbers: [number, ...] } returns { sum: float }
+    Resources: mock://readme and the template mock://echo/{text}
+    Prompts: echo { text }
     """
 
     def list_tools(self) -> List[Dict[str, Any]]:
         return [
-            {"name": "echo", "description": "Echo back the provided parameters"},
-            {"name": "sum", "description": "Sum a list of numbers: {numbers: [..]}"},
+            {"name": "echo", "description": "Echo back the provided parameters",
+             "inputSchema": {"type": "object", "additionalProperties": True}},
+            {"name": "sum", "description": "Sum a list of numbers: {numbers: [..]}",
+             "inputSchema": {"type": "object", "properties": {"numbers": {"type": "array", "items": {"type": "number"}}},
+                             "required": ["numbers"]}},
         ]
 
     def health(self) -> Dict[str, Any]:
@@ -121,19 +455,28 @@ class _MockAdapter:
             return {"sum": total}
         raise McpClientError("tool_not_found", f"Unknown tool: {name}")
 
+    def list_resources(self) -> Dict[str, Any]:
+        return {
+            "resources": [{"uri": "mock://readme", "name": "readme", "mimeType": "text/plain"}],
+            "resourceTemplates": [{"uriTemplate": "mock://echo/{text}", "name": "echo", "mimeType": "text/plain"}],
+        }
 
-class _NotImplementedAdapter:
-    def __init__(self, kind: str) -> None:
-        self.kind = kind
-
-    def list_tools(self) -> List[Dict[str, Any]]:
-        raise McpClientError("not_implemented", f"{self.kind} adapter not implemented yet")
+    def read_resource(self, uri: str) -> Dict[str, Any]:
+        if uri == "mock://readme":
+            text = "Mock MCP server"
+        elif uri.startswith("mock://echo/"):
+            text = f"Echo: {uri[len('mock://echo/'):]}"
+        else:
+            raise McpClientError("resource_not_found", f"Unknown resource: {uri}")
+        return {"contents": [{"uri": uri, "mimeType": "text/plain", "text": text}]}
 
-    def health(self) -> Dict[str, Any]:
-        raise McpClientError("not_implemented", f"{self.kind} adapter not implemented yet")
+    def list_prompts(self) -> List[Dict[str, Any]]:
+        return [{"name": "echo", "arguments": [{"name": "text", "required": True}]}]
 
-    def call_tool(self, name: str, params: Dict[str, Any], timeout: int = 10) -> Dict[str, Any]:
-        raise McpClientError("not_implemented", f"{self.kind} adapter not implemented yet")
+    def get_prompt(self, name: str, arguments: Dict[str, str]) -> Dict[str, Any]:
+        if name != "echo":
+            raise McpClientError("prompt_not_found", f"Unknown prompt: {name}")
+        return {"messages": [{"role": "user", "content": {"type": "text", "text": arguments.get("text", "")}}]}
 
 
 class _StdioAdapter:
@@ -141,15 +484,41 @@ class _StdioAdapter:
 
     Manages a subprocess running an MCP server and communicates via stdin/stdout
     using JSON-RPC 2.0 protocol.
+
+    Requests are pipelined: callers only hold the lock while writing, and a
+    dedicated reader thread matches each response to its waiting caller by
+    JSON-RPC id. Server-initiated notifications go to registered handlers.
+
+    Each caller waits on its own future with its own deadline. On expiry the
+    request is abandoned with notifications/cancelled and its late response is
+    dropped, so a timeout never leaves a stale reply for the next caller.
+
+    stdout is framed by LineFramer: replies are parsed from one reusable
+    buffer, and one larger than max_message_bytes fails only its own request
+    with message_too_large.
+
+    The tools/list catalog is cached until the server sends
+    notifications/tools/list_changed.
     """
 
-    def __init__(self, exec_path: str, timeout: int = 10) -> None:
+    def __init__(self, exec_path: str, timeout: int = 10,
+                 max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES) -> None:
         self.exec_path = exec_path
         self.timeout = timeout
+        self.max_message_bytes = max_message_bytes
         self._request_id = 0
         self._proc = None
         self._server_info = None
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # guards id allocation and stdin writes
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._notification_handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._stderr_tail: Deque[str] = deque(maxlen=20)
+        self._closed_reason: Optional[str] = None
+        self.dropped_responses = 0
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._tools_generation = 0  # bumped by tools/list_changed
+        self.add_notification_handler(self._on_tools_changed)
 
         # Start server and initialize
         self._start_server()
@@ -161,102 +530,170 @@ class _StdioAdapter:
             # Parse exec_path (e.g., "python echo.py" or "C:\\path\\server.exe")
             cmd_parts = self.exec_path.split()
 
+            # Binary pipes: frames are UTF-8 JSON bytes handled by json_codec
             self._proc = subprocess.Popen(
                 cmd_parts,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',  # Explicitly use UTF-8 for MCP JSON-RPC communication
-                bufsize=1  # Line buffered
             )
         except FileNotFoundError as e:
             raise McpClientError("connection_error", f"Server executable not found: {self.exec_path}", {"detail": str(e)})
         except Exception as e:
             raise McpClientError("connection_error", f"Failed to start server: {e}", {"detail": str(e)})
 
-    def _send_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Send JSON-RPC request and wait for response."""
-        if not self._proc or self._proc.poll() is not None:
+        threading.Thread(target=self._reader_loop, daemon=True, name="mcp-stdio-reader").start()
+        # Drain stderr so server logging can never fill the pipe and stall it
+        threading.Thread(target=self._stderr_loop, daemon=True, name="mcp-stdio-stderr").start()
+
+    def add_notification_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback for server-initiated notifications."""
+        self._notification_handlers.append(handler)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests waiting for a response."""
+        return len(self._pending)
+
+    def _send_request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send JSON-RPC request and wait for response.
+
+        timeout: per-call deadline in seconds (defaults to self.timeout).
+        """
+        request_id, future = self._submit(method, params)
+        response = self._wait(request_id, future, timeout or self.timeout)
+        _raise_for_rpc_error(response)
+        return response.get("result", {})
+
+    def _submit(self, method: str, params: Optional[Dict[str, Any]] = None) -> Tuple[int, Future]:
+        """Write a request and return its id and the future its response resolves."""
+        if not self.is_alive():
             raise McpClientError("connection_closed", "Server process is not running")
 
+        future: Future = Future()
         with self._lock:
             self._request_id += 1
-            request = {
-                "jsonrpc": "2.0",
-                "id": self._request_id,
-                "method": method,
-                "params": params or {}
-            }
-
+            request_id = self._request_id
+            with self._pending_lock:
+                self._pending[request_id] = future
             try:
-                # Send request
-                request_line = json.dumps(request) + "\n"
-                self._proc.stdin.write(request_line)
-                self._proc.stdin.flush()
-
-                # Read response with timeout
-                response_line = self._read_line_with_timeout(self.timeout)
-                response = json.loads(response_line)
-
-                # Check for JSON-RPC error
-                if "error" in response:
-                    error = response["error"]
-                    raise McpClientError(
-                        str(error.get("code", "rpc_error")),
-                        error.get("message", "Unknown RPC error"),
-                        {"detail": error.get("data")}
-                    )
-
-                return response.get("result", {})
-
-            except json.JSONDecodeError as e:
-                raise McpClientError("protocol_error", f"Invalid JSON response: {e}")
-            except McpClientError:
-                raise
+                self._write({
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": method,
+                    "params": params or {}
+                })
             except Exception as e:
+                with self._pending_lock:
+                    self._pending.pop(request_id, None)
                 raise McpClientError("communication_error", f"Communication failed: {e}")
+        return request_id, future
 
-    def _read_line_with_timeout(self, timeout: int) -> str:
-        """Read one line from stdout with timeout."""
-        result = {"line": None, "error": None}
-
-        def read_line():
-            try:
-                line = self._proc.stdout.readline()
-                if not line:
-                    result["error"] = "EOF: Server closed connection"
-                else:
-                    result["line"] = line
-            except Exception as e:
-                result["error"] = str(e)
-
-        thread = threading.Thread(target=read_line, daemon=True)
-        thread.start()
-        thread.join(timeout)
+    def _write(self, message: Dict[str, Any]) -> None:
+        """Write one JSON-RPC message (caller holds self._lock)."""
+        self._proc.stdin.write(json_codec.dumps(message) + b"\n")
+        self._proc.stdin.flush()
 
-        if thread.is_alive():
+    def _wait(self, request_id: int, future: Future, timeout: float) -> Dict[str, Any]:
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self._abandon(request_id, f"Client timed out after {timeout} seconds")
             raise McpClientError("timeout", f"Server did not respond within {timeout} seconds")
 
-        if result["error"]:
-            raise McpClientError("connection_error", result["error"])
-
-        if result["line"] is None:
-            raise McpClientError("connection_closed", "No response from server")
+    def _abandon(self, request_id: int, reason: str) -> None:
+        """Forget a request and tell the server to stop working on it.
 
-        return result["line"]
+        A response that still arrives later finds no waiter and is dropped by
+        the reader, so the session stays usable.
+        """
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+        try:
+            with self._lock:
+                self._write({
+                    "jsonrpc": "2.0",
+                    "method": "notifications/cancelled",
+                    "params": {"requestId": request_id, "reason": reason}
+                })
+        except Exception:
+            pass  # Best effort; the reader reports a broken pipe
+
+    def _reader_loop(self) -> None:
+        """Read response frames and hand each to the caller waiting on its id."""
+        readinto = self._proc.stdout.readinto1
+        framer = LineFramer(self.max_message_bytes)
+        try:
+            while framer.read_from(readinto):
+                framer.drain(self._on_frame, self._on_frame_too_large)
+            reason = "EOF: Server closed connection"
+        except Exception as e:  # noqa: BLE001
+            reason = f"Communication failed: {e}"
+        self._closed_reason = reason
+        self._fail_pending(McpClientError("connection_closed", reason, {"stderr": list(self._stderr_tail)}))
+
+    def _on_frame(self, frame: memoryview) -> None:
+        try:
+            message = json_codec.loads(frame)
+        except ValueError as e:
+            # Without an id the bad line cannot be attributed; fail everyone
+            self._fail_pending(McpClientError("protocol_error", f"Invalid JSON response: {e}"))
+            return
+        if isinstance(message, dict):
+            self._dispatch(message)
+
+    def _on_frame_too_large(self, error: FrameTooLarge) -> None:
+        _fail_oversized(error, self._dispatch_error, self._fail_pending)
+
+    def _dispatch_error(self, request_id: int, error: McpClientError) -> None:
+        with self._pending_lock:
+            future = self._pending.pop(request_id, None)
+        if future is None:
+            self.dropped_responses += 1
+        elif not future.done():
+            future.set_exception(error)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        msg_id = message.get("id")
+        if msg_id is not None and "method" not in message:
+            with self._pending_lock:
+                future = self._pending.pop(msg_id, None)
+            if future is None:
+                self.dropped_responses += 1  # late reply to an abandoned request
+            elif not future.done():
+                future.set_result(message)
+            return
+        if "method" in message and msg_id is None:
+            for handler in list(self._notification_handlers):
+                try:
+                    handler(message)
+                except Exception:
+                    pass  # A broken handler must not kill the reader
+        # Server-to-client requests (sampling, roots, ...) are not supported
+
+    def _fail_pending(self, error: McpClientError) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _stderr_loop(self) -> None:
+        try:
+            # read1 instead of line iteration: a huge log line must not be buffered whole
+            while True:
+                chunk = self._proc.stderr.read1(_STDERR_CHUNK)
+                if not chunk:
+                    return
+                _append_stderr(self._stderr_tail, chunk)
+        except Exception:
+            pass
 
     def _initialize(self) -> None:
         """Initialize MCP session."""
         try:
-            result = self._send_request("initialize", {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "fastapi-mcp-client",
-                    "version": "0.1.0"
-                }
-            })
+            result = self._send_request("initialize", INITIALIZE_PARAMS)
             self._server_info = result
         except Exception as e:
             # Cleanup on init failure
@@ -265,39 +702,37 @@ class _StdioAdapter:
             raise McpClientError("initialization_error", f"Failed to initialize MCP session: {e}")
 
     def list_tools(self) -> List[Dict[str, Any]]:
-        """List available tools from MCP server."""
-        result = self._send_request("tools/list")
-        tools = result.get("tools", [])
-
-        # Convert MCP tool schema to simplified format
-        return [
-            {
-                "name": tool.get("name"),
-                "description": tool.get("description", "")
-            }
-            for tool in tools
-        ]
-
-    def call_tool(self, name: str, params: Dict[str, Any], timeout: int = 10) -> Dict[str, Any]:
-        """Call a tool on the MCP server."""
+        """List available tools from MCP server (cached, all pages)."""
+        tools = self._tools
+        if tools is None:
+            generation = self._tools_generation
+            tools, cursor = [], None
+            while True:
+                result = self._send_request("tools/list", {"cursor": cursor} if cursor else None)
+                tools.extend(_catalog_tools(result))
+                cursor = result.get("nextCursor")
+                if not cursor:
+                    break
+            if generation == self._tools_generation:
+                self._tools = tools
+        return list(tools)
+
+    def _on_tools_changed(self, message: Dict[str, Any]) -> None:
+        if message.get("method") == TOOLS_LIST_CHANGED:
+            self._tools_generation += 1
+            self._tools = None
+
+    def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Call a tool on the MCP server (timeout defaults to self.timeout)."""
         result = self._send_request("tools/call", {
             "name": name,
             "arguments": params
-        })
-
-        # Extract text content from MCP response
-        # MCP returns: { "content": [{ "type": "text", "text": "..." }, ...] }
-        if "content" in result:
-            for item in result["content"]:
-                if isinstance(item, dict) and item.get("type") == "text":
-                    return {"text": item["text"]}
-
-        # Fallback: return raw result
-        return result
+        }, timeout=timeout)
+        return _tool_result_data(result)
 
     def health(self) -> Dict[str, Any]:
         """Get server health status."""
-        if not self._proc or self._proc.poll() is not None:
+        if not self.is_alive():
             return {
                 "status": "error",
                 "server_type": "stdio",
@@ -310,11 +745,19 @@ class _StdioAdapter:
             "server_info": self._server_info
         }
 
-    def __del__(self):
-        """Cleanup: terminate server process."""
+    def is_alive(self) -> bool:
+        """True while the server process is running and its pipe is open."""
+        return self._proc is not None and self._proc.poll() is None and self._closed_reason is None
+
+    def close(self) -> None:
+        """Terminate the server process."""
         if self._proc and self._proc.poll() is None:
             try:
                 self._proc.terminate()
                 self._proc.wait(timeout=2)
             except Exception:
                 pass  # Best effort cleanup
+
+    def __del__(self):
+        """Cleanup: terminate server process."""
+        self.close()
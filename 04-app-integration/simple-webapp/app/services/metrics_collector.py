@@ -5,6 +5,12 @@ Metrics Collector - 성능 메트릭 수집 및 관리
 - 인메모리 저장 (딕셔너리)
 - 스레드 안전성 (Lock 사용)
 - 도구별 통계 (호출 횟수, 응답 시간, 성공률)
+- 도구별 결과 캐시 통계 (hit, miss, eviction)
+- 도구별 coalescing 통계 (진행 중인 동일 호출에 합류한 요청 수)
+- 도구별 최근 응답 시간 이력 (백분위수 계산, hedging 지연 기준)
+- 도구별 hedging 통계 (hedge 비율, hedge 승률)
+- 우선순위 클래스별 admission 통계 (입장/거절/대기 시간 초과, 대기 시간)
+- 비동기 job 통계 (성공/실패/거절, 대기열 대기 시간, 실행 시간)
 
 작성일: 2025-12-14
 작성자: Claude Sonnet 4.5 (Anthropic)
@@ -12,10 +18,12 @@ Metrics Collector - 성능 메트릭 수집 및 관리
 
 from __future__ import annotations
 
+import math
 import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, Optional
 
 
 class MetricsCollector:
@@ -26,6 +34,12 @@ class MetricsCollector:
 
     Attributes:
         _metrics: 도구별 메트릭 데이터
+        _cache: 도구별 캐시 이벤트 카운터
+        _coalesced: 도구별 coalescing 대기자 수
+        _recent: 도구별 최근 응답 시간 (최대 LATENCY_HISTORY개)
+        _hedging: 도구별 hedging 이벤트 카운터
+        _admission: 우선순위 클래스별 admission 카운터와 최근 대기 시간
+        _jobs: job 결과 카운터와 최근 대기/실행 시간
         _lock: 스레드 안전성을 위한 Lock
         _start_time: 시스템 시작 시간 (초, UNIX timestamp)
     """
@@ -33,6 +47,12 @@ class MetricsCollector:
     def __init__(self) -> None:
         """메트릭 수집기 초기화"""
         self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+        self._coalesced: Dict[str, int] = {}
+        self._recent: Dict[str, Deque[int]] = {}
+        self._hedging: Dict[str, Dict[str, int]] = {}
+        self._admission: Dict[str, Dict[str, Any]] = {}
+        self._jobs = self._new_job_entry()
         self._lock = threading.Lock()
         self._start_time = time.time()
 
@@ -80,6 +100,301 @@ class MetricsCollector:
             stats["max_latency_ms"] = max(stats["max_latency_ms"], latency_ms)
             stats["last_call_time"] = datetime.now(timezone.utc).isoformat()
 
+            recent = self._recent.get(tool)
+            if recent is None:
+                recent = self._recent[tool] = deque(maxlen=LATENCY_HISTORY)
+            recent.append(latency_ms)
+
+    def get_latency_percentile(
+        self,
+        tool: str,
+        percentile: float,
+        min_samples: int = 20
+    ) -> Optional[float]:
+        """
+        최근 호출 이력에서 응답 시간 백분위수를 계산합니다 (nearest-rank).
+
+        Args:
+            tool: 도구 이름
+            percentile: 0~100 (예: 95)
+            min_samples: 이보다 이력이 적으면 None (판단 근거 부족)
+
+        Returns:
+            응답 시간 (밀리초) 또는 None
+
+        Example:
+            >>> collector.get_latency_percentile("read_file", 95)
+            120
+        """
+        with self._lock:
+            samples = sorted(self._recent.get(tool, ()))
+
+        if not samples or len(samples) < min_samples:
+            return None
+
+        rank = max(1, math.ceil(percentile / 100 * len(samples)))
+        return samples[min(rank, len(samples)) - 1]
+
+    def record_hedge_event(self, tool: str, event: str) -> None:
+        """
+        hedging 이벤트를 기록합니다.
+
+        Args:
+            tool: 도구 이름
+            event: "eligible" (hedging 대상 호출) | "hedged" (중복 요청 전송)
+                   | "won" (중복 요청이 먼저 응답)
+
+        Example:
+            >>> collector.record_hedge_event("read_file", "hedged")
+        """
+        if event not in HEDGE_EVENTS:
+            raise ValueError(f"Unknown hedge event: {event}")
+
+        with self._lock:
+            counters = self._hedging.setdefault(tool, dict.fromkeys(HEDGE_EVENTS, 0))
+            counters[event] += 1
+
+    def get_hedging_stats(self) -> Dict[str, Any]:
+        """
+        hedging 통계를 조회합니다.
+
+        Returns:
+            - eligible / hedged / won: 전체 합계
+            - hedge_rate: 대상 호출 중 중복 요청을 보낸 비율 (추가 부하)
+            - win_rate: 중복 요청 중 먼저 응답한 비율 (효과)
+            - tools: 도구별 카운터 (도구 이름순)
+
+        Example:
+            >>> stats = collector.get_hedging_stats()
+            >>> print(stats["hedge_rate"], stats["win_rate"])
+            0.05 0.6
+        """
+        with self._lock:
+            tools = [
+                {"name": name, **counters}
+                for name, counters in sorted(self._hedging.items())
+            ]
+
+        eligible = sum(t["eligible"] for t in tools)
+        hedged = sum(t["hedged"] for t in tools)
+        won = sum(t["won"] for t in tools)
+
+        return {
+            "eligible": eligible,
+            "hedged": hedged,
+            "won": won,
+            "hedge_rate": round(hedged / eligible, 4) if eligible > 0 else 0.0,
+            "win_rate": round(won / hedged, 4) if hedged > 0 else 0.0,
+            "tools": tools
+        }
+
+    def record_admission(self, priority: str, outcome: str, wait_ms: int = 0) -> None:
+        """
+        admission 결과를 기록합니다.
+
+        Args:
+            priority: 우선순위 클래스 (예: "interactive", "batch")
+            outcome: "admitted" (입장) | "rejected" (대기열 가득 참)
+                     | "timed_out" (최대 대기 시간 초과)
+            wait_ms: 입장까지 대기한 시간 (밀리초, admitted일 때만 의미)
+
+        Example:
+            >>> collector.record_admission("batch", "admitted", 120)
+        """
+        if outcome not in ADMISSION_OUTCOMES:
+            raise ValueError(f"Unknown admission outcome: {outcome}")
+
+        with self._lock:
+            entry = self._admission.setdefault(priority, {
+                **dict.fromkeys(ADMISSION_OUTCOMES, 0),
+                "total_wait_ms": 0,
+                "max_wait_ms": 0,
+                "waits": deque(maxlen=LATENCY_HISTORY),
+            })
+            entry[outcome] += 1
+            if outcome == "admitted":
+                entry["total_wait_ms"] += wait_ms
+                entry["max_wait_ms"] = max(entry["max_wait_ms"], wait_ms)
+                entry["waits"].append(wait_ms)
+
+    def get_admission_stats(self) -> Dict[str, Any]:
+        """
+        우선순위 클래스별 admission 통계를 조회합니다.
+
+        Returns:
+            - admitted / rejected / timed_out: 전체 합계
+            - classes: 클래스별 카운터와 대기 시간 (avg, p95, max; 밀리초)
+
+        Example:
+            >>> stats = collector.get_admission_stats()
+            >>> print(stats["classes"][0]["p95_wait_ms"])
+            35
+        """
+        with self._lock:
+            classes = []
+            for priority, entry in sorted(self._admission.items()):
+                waits = sorted(entry["waits"])
+                admitted = entry["admitted"]
+                p95 = waits[max(1, math.ceil(0.95 * len(waits))) - 1] if waits else 0
+                classes.append({
+                    "priority": priority,
+                    **{outcome: entry[outcome] for outcome in ADMISSION_OUTCOMES},
+                    "avg_wait_ms": round(entry["total_wait_ms"] / admitted, 2) if admitted > 0 else 0.0,
+                    "p95_wait_ms": p95,
+                    "max_wait_ms": entry["max_wait_ms"],
+                })
+
+        return {
+            **{outcome: sum(c[outcome] for c in classes) for outcome in ADMISSION_OUTCOMES},
+            "classes": classes
+        }
+
+    @staticmethod
+    def _new_job_entry() -> Dict[str, Any]:
+        return {
+            **dict.fromkeys(JOB_OUTCOMES, 0),
+            "queue_ms": deque(maxlen=LATENCY_HISTORY),
+            "run_ms": deque(maxlen=LATENCY_HISTORY),
+        }
+
+    def record_job(self, outcome: str, queue_ms: int = 0, run_ms: int = 0) -> None:
+        """
+        비동기 job 결과를 기록합니다.
+
+        Args:
+            outcome: "succeeded" | "failed" | "rejected" (대기열 가득 참)
+            queue_ms: 대기열에서 기다린 시간 (밀리초, rejected가 아닐 때만 의미)
+            run_ms: 도구 호출 실행 시간 (밀리초)
+
+        Example:
+            >>> collector.record_job("succeeded", 40, 1200)
+        """
+        if outcome not in JOB_OUTCOMES:
+            raise ValueError(f"Unknown job outcome: {outcome}")
+
+        with self._lock:
+            self._jobs[outcome] += 1
+            if outcome != "rejected":
+                self._jobs["queue_ms"].append(queue_ms)
+                self._jobs["run_ms"].append(run_ms)
+
+    def get_job_stats(self) -> Dict[str, Any]:
+        """
+        비동기 job 통계를 조회합니다.
+
+        Returns:
+            - succeeded / failed / rejected: 합계
+            - queue_ms / run_ms: 최근 job의 대기열 대기 시간과 실행 시간
+              (avg, p95, max; 밀리초)
+
+        Example:
+            >>> stats = collector.get_job_stats()
+            >>> print(stats["queue_ms"]["p95"])
+            35
+        """
+        with self._lock:
+            counts = {outcome: self._jobs[outcome] for outcome in JOB_OUTCOMES}
+            samples = {name: sorted(self._jobs[name]) for name in ("queue_ms", "run_ms")}
+
+        def summarize(values: Any) -> Dict[str, Any]:
+            if not values:
+                return {"avg": 0.0, "p95": 0, "max": 0}
+            return {
+                "avg": round(sum(values) / len(values), 2),
+                "p95": values[max(1, math.ceil(0.95 * len(values))) - 1],
+                "max": values[-1],
+            }
+
+        return {**counts, **{name: summarize(values) for name, values in samples.items()}}
+
+    def record_cache_event(self, tool: str, event: str) -> None:
+        """
+        결과 캐시 이벤트를 기록합니다.
+
+        Args:
+            tool: 도구 이름 (예: "read_file")
+            event: "hit" | "miss" | "eviction"
+
+        Example:
+            >>> collector.record_cache_event("read_file", "hit")
+        """
+        if event not in CACHE_EVENTS:
+            raise ValueError(f"Unknown cache event: {event}")
+
+        with self._lock:
+            counters = self._cache.setdefault(tool, dict.fromkeys(CACHE_EVENTS, 0))
+            counters[event] += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        결과 캐시 통계를 조회합니다.
+
+        Returns:
+            캐시 통계 딕셔너리
+            - hits / misses / evictions: 전체 합계
+            - hit_rate: 조회 대비 hit 비율
+            - tools: 도구별 카운터 (도구 이름순)
+
+        Example:
+            >>> stats = collector.get_cache_stats()
+            >>> print(stats["hit_rate"])
+            0.9
+        """
+        with self._lock:
+            tools = [
+                {"name": name, "hits": c["hit"], "misses": c["miss"], "evictions": c["eviction"]}
+                for name, c in sorted(self._cache.items())
+            ]
+
+        hits = sum(t["hits"] for t in tools)
+        misses = sum(t["misses"] for t in tools)
+        lookups = hits + misses
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": sum(t["evictions"] for t in tools),
+            "hit_rate": round(hits / lookups, 4) if lookups > 0 else 0.0,
+            "tools": tools
+        }
+
+    def record_coalesced_call(self, tool: str) -> None:
+        """
+        진행 중인 동일 호출에 합류한 요청을 기록합니다 (singleflight).
+
+        Args:
+            tool: 도구 이름 (예: "list_files")
+
+        Example:
+            >>> collector.record_coalesced_call("list_files")
+        """
+        with self._lock:
+            self._coalesced[tool] = self._coalesced.get(tool, 0) + 1
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """
+        coalescing 통계를 조회합니다.
+
+        Returns:
+            - coalesced: 업스트림 호출 없이 결과를 공유받은 요청 수 (전체)
+            - tools: 도구별 카운터 (도구 이름순)
+
+        Example:
+            >>> stats = collector.get_coalescing_stats()
+            >>> print(stats["coalesced"])
+            42
+        """
+        with self._lock:
+            tools = [
+                {"name": name, "coalesced": count}
+                for name, count in sorted(self._coalesced.items())
+            ]
+
+        return {
+            "coalesced": sum(t["coalesced"] for t in tools),
+            "tools": tools
+        }
+
     def get_metrics(self) -> Dict[str, Any]:
         """
         전체 메트릭 데이터를 조회합니다.
@@ -88,6 +403,11 @@ class MetricsCollector:
             메트릭 데이터 딕셔너리
             - uptime_seconds: 시스템 가동 시간
             - tools: 도구별 통계 리스트
+            - cache: 결과 캐시 통계 (get_cache_stats)
+            - coalescing: coalescing 통계 (get_coalescing_stats)
+            - hedging: hedging 통계 (get_hedging_stats)
+            - admission: admission 통계 (get_admission_stats)
+            - jobs: 비동기 job 통계 (get_job_stats)
 
         Example:
             >>> metrics = collector.get_metrics()
@@ -142,10 +462,15 @@ class MetricsCollector:
             # 도구 이름순 정렬
             tools_data.sort(key=lambda x: x["name"])
 
-            return {
-                "uptime_seconds": self.get_uptime_seconds(),
-                "tools": tools_data
-            }
+        return {
+            "uptime_seconds": self.get_uptime_seconds(),
+            "tools": tools_data,
+            "cache": self.get_cache_stats(),
+            "coalescing": self.get_coalescing_stats(),
+            "hedging": self.get_hedging_stats(),
+            "admission": self.get_admission_stats(),
+            "jobs": self.get_job_stats()
+        }
 
     def get_tool_stats(self, tool: str) -> Optional[Dict[str, Any]]:
         """
@@ -241,11 +566,20 @@ class MetricsCollector:
             200
             >>> # 이제 메트릭이 비어있음
         """
+        # get_summary()가 Lock을 잡으므로 Lock 밖에서 먼저 계산
+        previous_summary = self.get_summary()
+
         with self._lock:
-            previous_summary = self.get_summary()
             self._metrics = {}
+            self._cache = {}
+            self._coalesced = {}
+            self._recent = {}
+            self._hedging = {}
+            self._admission = {}
+            self._jobs = self._new_job_entry()
             self._start_time = time.time()
-            return previous_summary
+
+        return previous_summary
 
     def get_uptime_seconds(self) -> int:
         """
@@ -272,6 +606,22 @@ class MetricsCollector:
         )
 
 
+# 캐시 이벤트 종류 (result_cache.ResultCache가 기록)
+CACHE_EVENTS = ("hit", "miss", "eviction")
+
+# hedging 이벤트 종류 (session_pool.SessionPool이 기록)
+HEDGE_EVENTS = ("eligible", "hedged", "won")
+
+# admission 결과 종류 (admission.AdmissionController가 기록)
+ADMISSION_OUTCOMES = ("admitted", "rejected", "timed_out")
+
+# job 결과 종류 (jobs.JobManager가 기록)
+JOB_OUTCOMES = ("succeeded", "failed", "rejected")
+
+# 백분위수 계산에 쓰는 도구별 최근 호출 수
+LATENCY_HISTORY = 200
+
+
 # 글로벌 싱글톤 인스턴스
 _global_collector: Optional[MetricsCollector] = None
 _collector_lock = threading.Lock()
@@ -0,0 +1,78 @@
+"""
+Zero-reparse passthrough of JSON-RPC results.
+
+A ``tools/call`` reply normally goes through a full cycle: the frame is
+decoded into Python objects, ``_tool_result_data`` keeps the first text
+item, and the router encodes it again. For large results (read_file) that
+is two full passes and two full-size copies, and any image or resource
+items after the first text item are lost.
+
+In passthrough mode (``call_tool(..., raw=True)``) the session leaves the
+``result`` of the reply encoded:
+
+- A JSON-RPC response has exactly ``jsonrpc``, ``id`` and ``result`` (or
+  ``error``). When a frame starts with the first two and then ``result``,
+  as every serializer we know writes it, the result runs from there to the
+  frame's closing brace. Its bytes are copied once (out of the reader's
+  buffer) into ``RawJson`` and never scanned.
+- Any other layout (``error`` replies, reordered keys) is decoded as usual,
+  and the session re-encodes a raw caller's result. That costs what the
+  regular path costs and is still correct.
+
+The server's bytes are forwarded as they are, without validation.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Collection, Dict, Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_HEAD_BYTES = 256
+_RESULT_HEAD_RE = re.compile(
+    rb'^\s*\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*(-?\d+)\s*,'
+    rb'\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"result"\s*:\s*'
+)
+_WHITESPACE = b" \t\r\n"
+_CLOSE_BRACE = ord("}")
+
+
+class RawJson:
+    """Encoded JSON value to be embedded in a response without decoding.
+
+    A wrapper, not a bytes subclass: building a subclass from a memoryview
+    makes a temporary full-size copy first.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"RawJson({len(self.data)} bytes)"
+
+
+def split_response(frame: Buffer, raw_ids: Collection[int]) -> Optional[Dict[str, Any]]:
+    """``{"id", "result": RawJson}`` for a success reply to one of ``raw_ids``.
+
+    Returns None when the frame is anything else, or when its layout needs a
+    real parse; decode it as usual then.
+    """
+    match = _RESULT_HEAD_RE.match(frame[:_HEAD_BYTES])
+    if match is None:
+        return None
+    request_id = int(match.group(1))
+    if request_id not in raw_ids:
+        return None
+    end = len(frame)
+    while end and frame[end - 1] in _WHITESPACE:
+        end -= 1
+    if end <= match.end() or frame[end - 1] != _CLOSE_BRACE:
+        return None
+    end -= 1  # the envelope's own brace
+    while end > match.end() and frame[end - 1] in _WHITESPACE:
+        end -= 1
+    if end <= match.end():
+        return None
+    return {"id": request_id, "result": RawJson(bytes(frame[match.end():end]))}
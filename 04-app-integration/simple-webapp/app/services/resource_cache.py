@@ -0,0 +1,95 @@
+"""
+Cache of ``resources/read`` results for one MCP server (one per SessionPool).
+
+Agents read the same resources over and over, and unlike tool results a
+resource can tell us when it changes. SessionPool.read_resource caches the
+contents of resources the server lists in ``resources/list`` (templated URIs
+are dynamic and always read through):
+
+- a server with the ``resources.subscribe`` capability is sent
+  ``resources/subscribe`` for the URI before it is first read, and the entry
+  is kept until ``notifications/resources/updated`` names it
+- for other servers the entry expires after MCP_RESOURCE_CACHE_TTL seconds
+  (default 0: not cached at all)
+- everything is dropped on ``notifications/resources/list_changed``; the
+  entries of a session that is lost are dropped with its subscriptions
+
+A read started before an invalidation is not cached (``generation``), so a
+reply racing an update notification cannot be kept past it. Entries are
+evicted least-recently-used beyond MCP_RESOURCE_CACHE_MAX_BYTES. Hits,
+misses and evictions are counted in ``MetricsCollector`` under the tool name
+``resources/read``.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from . import json_codec
+from .metrics_collector import MetricsCollector
+
+METRICS_NAME = "resources/read"
+
+
+class ResourceCache:
+    """LRU of resources/read results by URI, bounded by their encoded size."""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl: float = 0.0,
+                 metrics: Optional[MetricsCollector] = None) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # for servers without resources.subscribe
+        self._metrics = metrics
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0  # bumped by every invalidation
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, uri: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(uri)
+        if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+            self._remove(uri)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(uri)
+        self._record("hit" if entry is not None else "miss")
+        return entry[0] if entry is not None else None
+
+    def put(self, uri: str, result: Dict[str, Any], ttl: Optional[float], generation: int) -> None:
+        """Cache ``result`` (ttl None = until invalidated) if nothing was invalidated since ``generation``."""
+        if generation != self._generation or (ttl is not None and ttl <= 0):
+            return
+        size = len(json_codec.dumps(result)) + len(uri)
+        if size > self.max_bytes:
+            return
+        self._remove(uri)
+        self._entries[uri] = (result, size, None if ttl is None else time.monotonic() + ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._record("eviction")
+
+    def invalidate(self, uri: str) -> None:
+        self._generation += 1
+        self._remove(uri)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "ttl": self.ttl, "invalidations": self._generation}
+
+    def _remove(self, uri: str) -> None:
+        entry = self._entries.pop(uri, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _record(self, event: str) -> None:
+        if self._metrics is not None:
+            self._metrics.record_cache_event(METRICS_NAME, event)
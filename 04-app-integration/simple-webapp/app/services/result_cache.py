@@ -0,0 +1,166 @@
+"""
+In-process cache of tool results, shared by McpClient and AsyncMcpClient.
+
+Hot ``read_file`` / ``list_files`` calls for the same paths otherwise make a
+round trip to the server every time. Caching is opt-in per tool
+(MCP_CACHE_TOOLS, e.g. ``read_file:30,list_files:5`` = tool:ttl seconds):
+
+- key: tool name plus canonicalized params (sorted JSON, the file path made
+  absolute), so ``{"path": "./a.txt"}`` and ``{"path": "a.txt"}`` share one
+  entry
+- file tools (FILE_PATH_PARAMS) are validated against the target's mtime and
+  size on every lookup; an entry for a file that changed is dropped. A path
+  that cannot be stat'ed here (missing, or only on a remote ws/http server's
+  filesystem) is not cached at all
+- entries expire after the tool's TTL and are evicted least-recently-used
+  once their total size exceeds MCP_CACHE_MAX_BYTES
+- only successful results are cached; cached data is shared between callers
+  and must be treated as read-only
+
+Hits, misses and evictions are counted per tool in ``MetricsCollector``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from . import json_codec
+from .metrics_collector import MetricsCollector, get_metrics_collector
+
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Tools whose result depends on a local file/directory, and the param naming it
+FILE_PATH_PARAMS: Dict[str, str] = {
+    "read_file": "path",
+    "list_files": "directory",
+}
+
+
+def canonical_params(tool: str, params: Dict[str, Any]) -> Optional[str]:
+    """Sorted-key JSON of params with a file tool's path made absolute.
+
+    Returns None for params that cannot be keyed (not JSON-serializable).
+    """
+    path_param = FILE_PATH_PARAMS.get(tool)
+    if path_param is not None and isinstance(params.get(path_param), str):
+        params = {**params, path_param: os.path.abspath(params[path_param])}
+    try:
+        return json.dumps(params, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheKey(NamedTuple):
+    tool: str
+    params: str  # canonical JSON
+    stamp: Optional[Tuple[int, int]]  # (mtime_ns, size) of the target file
+
+
+@dataclass
+class _Entry:
+    data: Dict[str, Any]
+    size: int
+    expires_at: float
+    stamp: Optional[Tuple[int, int]]
+
+
+class ResultCache:
+    """Thread-safe LRU of tool results bounded by their total encoded size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 metrics: Optional[MetricsCollector] = None) -> None:
+        self.max_bytes = max_bytes
+        self._metrics = metrics
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, tool: str, params: Dict[str, Any]) -> Optional[CacheKey]:
+        """Build the lookup key, or None when this call cannot be cached."""
+        stamp = None
+        path_param = FILE_PATH_PARAMS.get(tool)
+        if path_param is not None:
+            path = params.get(path_param)
+            if not isinstance(path, str):
+                return None
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            stamp = (st.st_mtime_ns, st.st_size)
+        canonical = canonical_params(tool, params)
+        if canonical is None:
+            return None
+        return CacheKey(tool, canonical, stamp)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key[:2])
+            if entry is not None and (entry.stamp != key.stamp or entry.expires_at <= time.monotonic()):
+                self._remove(key[:2])
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key[:2])
+        self._record(key.tool, "hit" if entry is not None else "miss")
+        return entry.data if entry is not None else None
+
+    def put(self, key: CacheKey, data: Dict[str, Any], ttl: float) -> None:
+        try:
+            size = len(json_codec.dumps(data)) + len(key.params)
+        except (TypeError, ValueError):
+            return
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        evicted = []
+        with self._lock:
+            self._remove(key[:2])
+            self._entries[key[:2]] = _Entry(data, size, time.monotonic() + ttl, key.stamp)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                (tool, _params), entry = self._entries.popitem(last=False)
+                self._bytes -= entry.size
+                evicted.append(tool)
+        for tool in evicted:
+            self._record(tool, "eviction")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _record(self, tool: str, event: str) -> None:
+        if self._metrics is not None:
+            self._metrics.record_cache_event(tool, event)
+
+
+# Global singleton (one cache per app process)
+_global_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide cache (MCP_CACHE_MAX_BYTES, global metrics)."""
+    global _global_cache
+
+    if _global_cache is None:
+        with _cache_lock:
+            if _global_cache is None:
+                from .mcp_client import McpClientConfig
+
+                _global_cache = ResultCache(McpClientConfig.from_env().cache_max_bytes,
+                                            metrics=get_metrics_collector())
+    return _global_cache
@@ -0,0 +1,200 @@
+"""
+Streaming a tools/call reply while it is still arriving.
+
+A ``read_file`` of tens of MiB is one JSON-RPC frame. Assembling that frame,
+decoding it and re-encoding the text costs several full-size copies and the
+client sees nothing until the server has sent its last byte. For
+``POST /mcp/actions/{tool}:stream`` the session hands the frame over instead:
+
+- ``FrameStream``: the reply's bytes, passed from the session's reader task
+  to one consumer as they are read. It holds at most ``max_bytes``; beyond
+  that ``write()`` waits, so the reader stops reading and the server blocks
+  on a full pipe (other requests on that session wait too). A consumer that
+  goes away ``close()``s it and the rest of the frame is dropped.
+- ``tool_text()``: turns the stream into pieces of the first content item's
+  text. When the reply starts the way every serializer we know writes it
+  (``{"jsonrpc", "id", "result": {"content": [{"type": "text", "text": "``)
+  the pieces are slices of the text as the server escaped it, cut between
+  escape sequences and UTF-8 characters, so each is valid inside a JSON
+  string. The rest of the frame (FastMCP repeats the text in
+  ``structuredContent``) is skipped unread. Any other reply (errors, another
+  layout) is read whole, up to MCP_MAX_MESSAGE_BYTES, and decoded as usual.
+
+The text is forwarded without validation, as passthrough mode does.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Union
+
+from . import json_codec
+from .mcp_client import McpClientError, _raise_for_rpc_error, _tool_result_data
+
+# Reply bytes buffered per stream before the session's reader waits
+STREAM_BUFFER_BYTES = 1024 * 1024
+
+_HEAD_BYTES = 256
+_TEXT_HEAD_RE = re.compile(
+    rb'^\s*\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*-?\d+\s*,'
+    rb'\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"result"\s*:\s*\{\s*"content"\s*:\s*\[\s*'
+    rb'\{\s*"type"\s*:\s*"text"\s*,\s*"text"\s*:\s*"'
+)
+_HIGH_SURROGATE_RE = re.compile(rb'\\u[dD][89abAB][0-9a-fA-F]{2}')
+_BACKSLASH, _QUOTE, _U = 0x5C, 0x22, 0x75
+
+
+class FrameStream:
+    """Bounded handoff of one reply's bytes from a session reader to its consumer."""
+
+    def __init__(self, max_bytes: int = STREAM_BUFFER_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._chunks: Deque[bytes] = deque()
+        self._bytes = 0
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._ended = False
+        self._error: Optional[McpClientError] = None
+        self._closed = False
+
+    # reader side
+    async def write(self, data: bytes) -> None:
+        """Queue bytes, waiting while ``max_bytes`` are unread."""
+        while self._bytes >= self.max_bytes and not self._closed:
+            self._writable.clear()
+            await self._writable.wait()
+        self.write_nowait(data)
+
+    def write_nowait(self, data: bytes) -> None:
+        if self._closed or not data:
+            return
+        self._chunks.append(data)
+        self._bytes += len(data)
+        self._readable.set()
+
+    def finish(self, error: Optional[McpClientError] = None) -> None:
+        """End of the frame, or ``error`` if the connection was lost before it."""
+        self._ended = True
+        self._error = error
+        self._readable.set()
+
+    # consumer side
+    async def read(self) -> bytes:
+        """Next bytes of the frame; b"" once it is complete."""
+        while not self._chunks:
+            if self._ended:
+                if self._error is not None:
+                    raise self._error
+                return b""
+            self._readable.clear()
+            await self._readable.wait()
+        data = self._chunks.popleft()
+        self._bytes -= len(data)
+        self._writable.set()
+        return data
+
+    def close(self) -> None:
+        """The consumer is done; drop what is buffered and whatever still arrives."""
+        self._closed = True
+        self._chunks.clear()
+        self._bytes = 0
+        self._writable.set()
+
+
+async def tool_text(stream: FrameStream, chunk_size: int,
+                    max_message_bytes: int) -> AsyncIterator[Union[bytes, Dict[str, Any]]]:
+    """Escaped text pieces of at most ``chunk_size`` bytes, or the decoded data of another reply.
+
+    Raises McpClientError for an error reply, before anything is yielded.
+    """
+    buf = bytearray()
+    while True:
+        data = await stream.read()
+        buf += data
+        match = _TEXT_HEAD_RE.match(buf)
+        if match is not None or not data or len(buf) >= _HEAD_BYTES:
+            break
+    if match is None:
+        while data:
+            data = await stream.read()
+            buf += data
+            if len(buf) > max_message_bytes:
+                raise McpClientError("message_too_large",
+                                     f"Server message exceeds MCP_MAX_MESSAGE_BYTES ({max_message_bytes} bytes)",
+                                     {"limit": max_message_bytes})
+        try:
+            message = json_codec.loads(buf)
+        except ValueError as e:
+            raise McpClientError("protocol_error", f"Invalid JSON response: {e}")
+        _raise_for_rpc_error(message)
+        yield _tool_result_data(message.get("result", {}))
+        return
+
+    del buf[:match.end()]
+    end = 0  # buf[:end] is complete characters and escapes
+    while True:
+        end = _string_end(buf, end)
+        closed = end < len(buf) and buf[end] == _QUOTE
+        while end > chunk_size:
+            cut = _text_cut(buf, chunk_size)
+            yield bytes(buf[:cut])
+            del buf[:cut]
+            end -= cut
+        if closed:
+            if end:
+                yield bytes(buf[:end])
+            break
+        data = await stream.read()
+        if not data:
+            raise McpClientError("protocol_error", "Response ended inside the result text")
+        buf += data
+    while await stream.read():
+        pass  # the other result fields are not part of the data
+
+
+def _string_end(data: bytearray, pos: int) -> int:
+    """Position of the closing quote of the JSON string running through ``pos``.
+
+    len(data), or the position of a trailing incomplete escape, if the quote
+    has not arrived yet. Uses bytes.find (memchr); a regex over the text is
+    ~40x slower when it has few escapes.
+    """
+    n = len(data)
+    quote = data.find(b'"', pos)
+    while True:
+        backslash = data.find(b"\\", pos, quote if quote >= 0 else n)
+        if backslash < 0:
+            return quote if quote >= 0 else n
+        if backslash + 1 >= n:
+            return backslash
+        pos = backslash + 2
+        if 0 <= quote < pos:  # that quote was escaped
+            quote = data.find(b'"', pos)
+
+
+def _text_cut(data: bytearray, cut: int) -> int:
+    """Largest position <= cut that splits no escape sequence, surrogate pair or UTF-8 character.
+
+    ``data`` starts at a character boundary and has bytes beyond ``cut``.
+    """
+    while data[cut] & 0xC0 == 0x80:
+        cut -= 1  # UTF-8 continuation byte
+    for back in range(1, 6):
+        start = cut - back
+        if data[start] == _BACKSLASH and _escape_starts(data, start):
+            if back < (6 if data[start + 1] == _U else 2):
+                cut = start
+            break
+    if cut >= 6 and _HIGH_SURROGATE_RE.match(data, cut - 6) and _escape_starts(data, cut - 6):
+        cut -= 6  # keep the two escapes of a surrogate pair together
+    return cut
+
+
+def _escape_starts(data: bytearray, i: int) -> bool:
+    """Whether the backslash at ``i`` starts an escape (is not itself escaped)."""
+    run = 0
+    while i >= 0 and data[i] == _BACKSLASH:
+        run += 1
+        i -= 1
+    return run % 2 == 1
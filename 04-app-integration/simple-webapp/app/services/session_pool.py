@@ -0,0 +1,906 @@
+"""
+Process-wide pool of pre-initialized MCP sessions.
+
+Spawning the server (e.g. ``file_server.py``) and running the ``initialize``
+handshake costs hundreds of milliseconds. Instead of starting a server per
+HTTP request, the app keeps a small set of warm sessions and lends them out
+per call.
+
+- min_size sessions are started eagerly by ``start()``; more are spawned on
+  demand up to max_size once every live session is saturated.
+- Sessions are multiplexed: up to max_inflight callers share one process,
+  each request pipelined over the same pipe.
+- Checkout is health-gated: sessions whose server process died are dropped
+  and replaced instead of being handed out.
+- Sessions that fail with a transport error are discarded on return, since
+  their pipe may hold a stale or partial reply.
+- Failed spawns/connects back off exponentially, so a down server (or a
+  remote ws/http daemon being restarted) is retried without a reconnect storm.
+- Supervision: a session whose server exits (EOF / non-zero returncode) or
+  whose connection drops is reaped at once, and a background task respawns
+  and re-initializes replacements up to min_size with the same backoff.
+- Overload protection (flow_control): an AIMD concurrency limit and a
+  circuit breaker make call_tool fail fast with overloaded / circuit_open
+  instead of queueing behind a slow or failing server.
+- Hedging (optional, hedging.py): an idempotent call still unanswered after
+  the tool's MCP_HEDGE_PERCENTILE latency is duplicated on another session;
+  the first answer wins, within a MCP_HEDGE_BUDGET share of extra calls.
+- Every completed call is recorded in MetricsCollector (per-tool counts and
+  the latency history hedging reads).
+- Affinity (optional, affinity.py): calls of MCP_AFFINITY_KEYS tools are
+  routed by consistent hashing of a parameter (e.g. the file path) to the
+  same session, spilling over to the next one on the ring under load.
+- Safe replay: calls to tools listed as idempotent (MCP_IDEMPOTENT_TOOLS,
+  e.g. read_file, list_files) that die with their session are retried on a
+  fresh one, up to replay_max times within the original deadline.
+- stream_tool: a call whose reply is forwarded while it arrives
+  (result_stream.py). A slow reader stalls the session's reader, so the
+  stream leases its session exclusively (charged max_inflight) until the
+  reply has been read; it is neither replayed nor hedged, since part of it
+  may already be sent.
+
+The pool runs on the event loop (sessions are ``AsyncStdioSession``,
+``ws_transport.AsyncWsSession`` or ``http_transport.AsyncHttpSession``) and
+implements the async adapter interface (list_tools/call_tool/health), so
+``AsyncMcpClient(pool=pool)`` works unchanged for callers.
+``_SyncPoolAdapter`` drives a pool from synchronous code (McpClient).
+The app's startup warm-up (``warmup.py``) fills the pool and caches its
+``tools/list`` so the first requests after a deploy find warm sessions.
+That catalog (with an ETag for ``GET /mcp/tools``) is kept until a session
+reports ``notifications/tools/list_changed`` or a session is lost, since a
+restarted server may expose different tools. The resources/list and
+prompts/list results are kept the same way (their own list_changed), and
+reads of listed resources are cached per pool (resource_cache.py).
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple,
+                    Union)
+
+from .affinity import HashRing, affinity_key, load_bound
+from .async_mcp_client import AsyncStdioSession, ProgressCallback
+from .flow_control import FAILURE_CODES, AdaptiveLimiter, CircuitBreaker
+from .hedging import HedgeBudget, hedged
+from .mcp_client import (
+    PROMPTS_LIST_CHANGED,
+    RESOURCE_UPDATED,
+    RESOURCES_LIST_CHANGED,
+    TOOLS_LIST_CHANGED,
+    McpClientConfig,
+    McpClientError,
+    _catalog_etag,
+)
+from .metrics_collector import MetricsCollector, get_metrics_collector
+from .resource_cache import ResourceCache
+from .result_stream import tool_text
+
+# MCP_MODE values served through a SessionPool
+POOLED_MODES = ("stdio", "ws", "http")
+
+# Failures meaning the session died under the call (the request may or may
+# not have run); only these are replayed, and only for idempotent tools
+_REPLAY_CODES = {"connection_closed", "communication_error"}
+
+# Error codes after which a session can no longer be trusted. Timeouts are
+# not among them: late replies are matched by id and dropped by the session.
+_DISCARD_CODES = {
+    "connection_closed",
+    "connection_error",
+    "communication_error",
+    "protocol_error",
+}
+
+
+def session_factory(
+    config: McpClientConfig,
+    args: Sequence[str] = (),
+    env: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Callable[[], Awaitable[Any]]:
+    """Return a coroutine function opening one initialized session for config.mode.
+
+    args/env extend the stdio command line and environment; headers are sent
+    on ws/http connections (server_profiles.json fields).
+    """
+    timeout = config.timeout_default
+    max_message_bytes = config.max_message_bytes
+    if config.mode == "stdio":
+        if not config.exec_path:
+            raise McpClientError("config_error", "MCP_EXEC_PATH required for stdio mode")
+        exec_path = config.exec_path
+        return lambda: AsyncStdioSession.open(exec_path, timeout, max_message_bytes, args=args, env=env)
+    if config.mode == "ws":
+        if not config.server_uri:
+            raise McpClientError("config_error", "MCP_SERVER_URI required for ws mode")
+        from .ws_transport import AsyncWsSession
+
+        uri = config.server_uri
+        return lambda: AsyncWsSession.open(uri, timeout, headers, max_message_bytes=max_message_bytes)
+    if config.mode == "http":
+        if not config.server_uri:
+            raise McpClientError("config_error", "MCP_SERVER_URI required for http mode")
+        from .http_transport import AsyncHttpSession
+
+        url = config.server_uri
+        max_connections = config.pool_max_inflight
+        return lambda: AsyncHttpSession.open(url, timeout, headers, max_connections=max_connections,
+                                             max_message_bytes=max_message_bytes)
+    raise McpClientError("config_error", f"No session pool for MCP_MODE: {config.mode}")
+
+
+class SessionPool:
+    """Bounded pool of MCP sessions for one server.
+
+    Each session pipelines up to max_inflight concurrent requests; a new
+    session is only opened once every live session is saturated.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        min_size: int = 1,
+        max_size: int = 4,
+        acquire_timeout: float = 5.0,
+        max_inflight: int = 8,
+        server_type: str = "stdio",
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        idempotent_tools: Iterable[str] = (),
+        replay_max: int = 0,
+        limiter: Optional[AdaptiveLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[MetricsCollector] = None,
+        hedge_percentile: float = 0.0,
+        hedge_budget: float = 0.1,
+        affinity_keys: Optional[Dict[str, str]] = None,
+        affinity_load_factor: float = 1.25,
+        resource_cache: Optional[ResourceCache] = None,
+    ) -> None:
+        if max_size < 1 or max_inflight < 1:
+            raise McpClientError("config_error", "Pool max_size and max_inflight must be >= 1")
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.max_inflight = max_inflight
+        self.acquire_timeout = acquire_timeout
+        self.server_type = server_type
+        self._factory = factory
+        self._leases: Dict[Any, int] = {}  # live session -> borrowers
+        self._spawning = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._closed = False
+        self._spawned = 0
+        self._discarded = 0
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._connect_failures = 0  # consecutive
+        self._retry_at = 0.0  # loop time before which no new spawn is tried
+        self._catalog: Optional[Tuple[List[Dict[str, Any]], str]] = None  # cached tools/list + ETag
+        self._catalog_generation = 0  # bumped on every invalidation
+        self._catalog_lock: Optional[asyncio.Lock] = None
+        self._listings: Dict[str, Any] = {}  # "resources" / "prompts" -> cached list result
+        self._listing_generations = {"resources": 0, "prompts": 0}
+        self._listed_uris: Optional[Tuple[Any, frozenset]] = None  # (resources listing, its URIs)
+        self._subscriptions: Dict[str, Any] = {}  # resource URI -> session subscribed to it
+        self._subscribing: Dict[str, asyncio.Future] = {}  # resource URI -> resources/subscribe in flight
+        self.resource_cache = resource_cache or ResourceCache(metrics=metrics)
+        self.idempotent_tools = frozenset(idempotent_tools)
+        self.replay_max = max(0, replay_max)
+        self._supervisor: Optional[asyncio.Future] = None
+        self._tasks: Set[asyncio.Future] = set()
+        self._crashes = 0  # sessions lost while in the pool
+        self._restarts = 0  # replacements spawned by the supervisor
+        self._replayed = 0
+        # Ceiling: every session saturated
+        self.limiter = limiter or AdaptiveLimiter(max_size * max_inflight)
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics
+        self.hedge_percentile = hedge_percentile  # 0 = no hedging
+        self.hedge_budget = HedgeBudget(hedge_budget)
+        self.affinity_keys = dict(affinity_keys or {})  # tool -> param; empty = least-loaded
+        self.affinity_load_factor = affinity_load_factor
+        self._ring = HashRing()
+        self._slots: Dict[Any, str] = {}  # live session -> ring member
+        self._slot_sessions: Dict[str, Any] = {}
+        self._affinity_home = 0  # keyed calls served by the key's own replica
+        self._affinity_spilled = 0
+
+    @classmethod
+    def from_config(cls, config: McpClientConfig,
+                    factory: Optional[Callable[[], Awaitable[Any]]] = None) -> "SessionPool":
+        """Pool for config.mode; factory overrides how sessions are opened."""
+        if factory is None:
+            factory = session_factory(config)
+        return cls(
+            factory,
+            min_size=config.pool_min_size,
+            max_size=config.pool_max_size,
+            acquire_timeout=config.pool_acquire_timeout,
+            max_inflight=config.pool_max_inflight,
+            server_type=config.mode,
+            backoff_initial=config.reconnect_backoff_initial,
+            backoff_max=config.reconnect_backoff_max,
+            idempotent_tools=config.idempotent_tools,
+            replay_max=config.retry_max,
+            limiter=AdaptiveLimiter(
+                config.pool_max_size * config.pool_max_inflight,
+                min_limit=config.limit_min,
+                tolerance=config.limit_latency_tolerance,
+            ),
+            breaker=CircuitBreaker(
+                failure_rate=config.breaker_failure_rate,
+                min_calls=config.breaker_min_calls,
+                open_seconds=config.breaker_open_seconds,
+            ),
+            metrics=get_metrics_collector(),
+            hedge_percentile=config.hedge_percentile,
+            hedge_budget=config.hedge_budget,
+            affinity_keys=config.affinity_keys,
+            affinity_load_factor=config.affinity_load_factor,
+            resource_cache=ResourceCache(config.resource_cache_max_bytes, config.resource_cache_ttl,
+                                         metrics=get_metrics_collector()),
+        )
+
+    @property
+    def cond(self) -> asyncio.Condition:
+        # Created lazily so the pool binds to the loop that first uses it
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @property
+    def _size(self) -> int:
+        return len(self._leases) + self._spawning
+
+    # lifecycle
+    async def start(self) -> None:
+        """Open sessions until min_size are live (spawned concurrently)."""
+        async with self.cond:
+            missing = 0 if self._closed else max(0, self.min_size - self._size)
+            self._spawning += missing
+        results = await asyncio.gather(*[self._spawn(leases=0) for _ in range(missing)],
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def close(self, grace: float = 0) -> None:
+        """Stop lending sessions and close them.
+
+        grace: seconds to let borrowed sessions finish their calls before
+        they are closed under their callers (graceful shutdown). With 0 only
+        idle sessions are closed now and borrowed ones on return.
+        """
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        async with self.cond:
+            self._closed = True
+            self.cond.notify_all()
+            if grace > 0:
+                try:
+                    await asyncio.wait_for(self.cond.wait_for(lambda: not any(self._leases.values())), grace)
+                except asyncio.TimeoutError:
+                    pass  # close the stragglers below
+            to_close = [s for s, n in self._leases.items() if n == 0 or grace > 0]
+            for session in to_close:
+                del self._leases[session]
+        for session in to_close:
+            await session.close()
+
+    # checkout / return
+    async def acquire(self, exclude: Iterable[Any] = (), timeout: Optional[float] = None,
+                      key: Optional[str] = None, weight: int = 1) -> Any:
+        """Borrow a session other than ``exclude``, waiting up to ``timeout``
+        (default acquire_timeout) for one to free up. With an affinity
+        ``key`` the key's replica on the hash ring is preferred. ``weight``
+        leases are taken at once; max_inflight takes the session exclusively."""
+        loop = asyncio.get_running_loop()
+        if timeout is None:
+            timeout = self.acquire_timeout
+        deadline = loop.time() + timeout
+        async with self.cond:
+            while True:
+                if self._closed:
+                    raise McpClientError("pool_closed", "Session pool is closed")
+                session = self._least_loaded_locked(exclude, weight)
+                if session is not None:
+                    if key is not None:
+                        session = self._affine_locked(key, exclude, weight) or session
+                    self._leases[session] += weight
+                    return session
+                now = loop.time()
+                if self._size < self.max_size:
+                    if now >= self._retry_at:
+                        self._spawning += 1
+                        break
+                    if self._retry_at > deadline and not self._leases:
+                        raise McpClientError(
+                            "connection_error",
+                            f"Server unavailable; reconnecting in {self._retry_at - now:.1f} seconds",
+                            {"consecutive_failures": self._connect_failures},
+                        )
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise McpClientError(
+                        "pool_exhausted",
+                        f"No MCP session available within {timeout} seconds",
+                        {"max_size": self.max_size, "max_inflight": self.max_inflight},
+                    )
+                try:
+                    # Wake on a returned session or when the backoff expires
+                    wait = min(remaining, max(self._retry_at - now, 0) or remaining)
+                    await asyncio.wait_for(self.cond.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass  # re-check state; raises pool_exhausted above
+        # Spawn outside the lock so other callers can keep returning sessions
+        return await self._spawn(leases=weight)
+
+    async def release(self, session: Any, discard: bool = False, weight: int = 1) -> None:
+        to_close = None
+        async with self.cond:
+            if session in self._leases:
+                self._leases[session] -= weight
+                if discard or not session.is_alive():
+                    self._drop_locked(session)
+                    to_close = session
+                elif self._closed and self._leases[session] == 0:
+                    del self._leases[session]
+                    to_close = session
+            self.cond.notify_all()
+        if to_close is not None:
+            # Other borrowers of a dropped session see connection_closed
+            await to_close.close()
+
+    @asynccontextmanager
+    async def session(self, exclude: Iterable[Any] = (), timeout: Optional[float] = None,
+                      key: Optional[str] = None, exclusive: bool = False) -> AsyncIterator[Any]:
+        weight = self.max_inflight if exclusive else 1
+        session = await self.acquire(exclude, timeout, key, weight)
+        discard = False
+        try:
+            yield session
+        except McpClientError as e:
+            discard = e.code in _DISCARD_CODES
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # The session abandoned the request (or, for stream_tool, drops
+            # the rest of the reply); it is still usable
+            raise
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            await self.release(session, discard=discard, weight=weight)
+
+    def _least_loaded_locked(self, exclude: Iterable[Any] = (), weight: int = 1) -> Any:
+        """Pick the live session with the fewest borrowers that has room for ``weight`` more."""
+        best = None
+        for session, leases in list(self._leases.items()):
+            if not session.is_alive():
+                self._drop_locked(session)
+                self._background(session.close())  # already exited; reap it
+                continue
+            if session in exclude:
+                continue
+            if leases + weight <= self.max_inflight and (best is None or leases < self._leases[best]):
+                best = session
+        return best
+
+    def _affine_locked(self, key: str, exclude: Iterable[Any] = (), weight: int = 1) -> Any:
+        """The first replica on the ring from ``key`` that is below the load bound (and has room for ``weight``)."""
+        bound = min(self.max_inflight, load_bound(self.affinity_load_factor, sum(self._leases.values()),
+                                                  len(self._leases)))
+        for i, slot in enumerate(self._ring.walk(key)):
+            session = self._slot_sessions[slot]
+            leases = self._leases.get(session, bound)
+            if session in exclude or leases >= bound or leases + weight > self.max_inflight:
+                continue
+            if i == 0:
+                self._affinity_home += 1
+            else:
+                self._affinity_spilled += 1
+            return session
+        return None
+
+    def _assign_slot_locked(self, session: Any) -> None:
+        # Lowest free slot: a respawned replica inherits the keys of the one it replaces
+        taken = set(self._slot_sessions)
+        slot = next(str(i) for i in range(len(taken) + 1) if str(i) not in taken)
+        self._slots[session] = slot
+        self._slot_sessions[slot] = session
+        self._ring.add(slot)
+
+    async def _spawn(self, leases: int) -> Any:
+        """Open a session (a spawn slot must already be reserved)."""
+        try:
+            session = await self._factory()
+        except BaseException as e:
+            async with self.cond:
+                self._spawning -= 1
+                if isinstance(e, Exception):  # not cancellation
+                    self._connect_failures += 1
+                    delay = min(self.backoff_max, self.backoff_initial * 2 ** (self._connect_failures - 1))
+                    self._retry_at = asyncio.get_running_loop().time() + delay
+                self.cond.notify_all()
+            raise
+        async with self.cond:
+            self._spawning -= 1
+            self._leases[session] = leases
+            self._assign_slot_locked(session)
+            self._spawned += 1
+            self._connect_failures = 0
+            self._retry_at = 0.0
+            self.cond.notify_all()
+        watch = getattr(session, "add_lost_handler", None)
+        if watch is not None:
+            watch(lambda reason: self._background(self._session_lost(session)))
+        listen = getattr(session, "add_notification_handler", None)
+        if listen is not None:
+            listen(self._on_notification)
+        return session
+
+    def _on_notification(self, message: Dict[str, Any]) -> None:
+        method = message.get("method")
+        if method == TOOLS_LIST_CHANGED:
+            self.invalidate_tools()
+        elif method == RESOURCE_UPDATED:
+            self.resource_cache.invalidate((message.get("params") or {}).get("uri"))
+        elif method == RESOURCES_LIST_CHANGED:
+            self._invalidate_listing("resources")
+        elif method == PROMPTS_LIST_CHANGED:
+            self._invalidate_listing("prompts")
+
+    # supervision
+    async def _session_lost(self, session: Any) -> None:
+        """Reap a session whose server exited or whose connection dropped."""
+        async with self.cond:
+            # Sessions the pool already dropped or closed itself are not crashes
+            if self._closed or session not in self._leases:
+                return
+            self._drop_locked(session)
+            self._crashes += 1
+            self.cond.notify_all()
+        # The replacement may run a different build
+        self.invalidate_tools()
+        self._invalidate_listing("resources")
+        self._invalidate_listing("prompts")
+        await session.close()
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = self._background(self._replenish())
+
+    async def _replenish(self) -> None:
+        """Respawn sessions up to min_size, backing off after failures."""
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self.cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                wait = self._retry_at - loop.time()
+                if wait <= 0:
+                    self._spawning += 1
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await self._spawn(leases=0)
+            except Exception:
+                continue  # _spawn recorded the backoff
+            self._restarts += 1
+
+    def _background(self, coro: Awaitable[Any]) -> "asyncio.Future[Any]":
+        # The loop only keeps weak references to tasks; hold them until done
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _drop_locked(self, session: Any) -> None:
+        if self._leases.pop(session, None) is not None:
+            self._discarded += 1
+        # Its subscriptions end with it: nothing would tell us about updates
+        for uri in [uri for uri, owner in self._subscriptions.items() if owner is session]:
+            del self._subscriptions[uri]
+            self.resource_cache.invalidate(uri)
+        slot = self._slots.pop(session, None)
+        if slot is not None:
+            del self._slot_sessions[slot]
+            self._ring.remove(slot)
+
+    # adapter interface
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Return tools/list, served from the cache once fetched."""
+        tools, _ = await self.tool_catalog()
+        return list(tools)
+
+    async def tool_catalog(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Return the cached (tools, etag); concurrent misses share one fetch."""
+        catalog = self._catalog
+        if catalog is None:
+            if self._catalog_lock is None:
+                self._catalog_lock = asyncio.Lock()
+            async with self._catalog_lock:
+                catalog = self._catalog or await self._fetch_catalog()
+        return catalog
+
+    async def refresh_tools(self) -> List[Dict[str, Any]]:
+        """Fetch tools/list from the server and cache it."""
+        tools, _ = await self._fetch_catalog()
+        return list(tools)
+
+    @property
+    def catalog_generation(self) -> int:
+        """Bumped whenever the cached catalog is dropped (list_changed, lost session)."""
+        return self._catalog_generation
+
+    def invalidate_tools(self) -> None:
+        """Drop the cached catalog; the next list_tools() refetches it."""
+        self._catalog_generation += 1
+        self._catalog = None
+
+    async def _fetch_catalog(self) -> Tuple[List[Dict[str, Any]], str]:
+        generation = self._catalog_generation
+        async with self.session() as s:
+            tools = await s.list_tools()
+        catalog = (tools, _catalog_etag(tools))
+        # A list_changed that arrived mid-fetch may postdate this answer
+        if generation == self._catalog_generation:
+            self._catalog = catalog
+        return catalog
+
+    # resources and prompts
+    async def list_resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        """resources/list + resources/templates/list, cached until list_changed or a lost session."""
+        return await self._listing("resources")
+
+    async def list_prompts(self) -> List[Dict[str, Any]]:
+        """prompts/list, cached until list_changed or a lost session."""
+        return await self._listing("prompts")
+
+    async def read_resource(self, uri: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """resources/read; a listed resource is served from the ResourceCache when it can be.
+
+        On a server with resources.subscribe the URI is subscribed (on the
+        session doing the read, before reading) and cached until the server
+        sends notifications/resources/updated for it.
+        """
+        cache = self.resource_cache
+        listed = await self._is_listed(uri)
+        if listed:
+            cached = cache.get(uri)
+            if cached is not None:
+                return cached
+        generation = cache.generation
+        async with self.session() as s:
+            ttl: Optional[float] = cache.ttl
+            if listed and getattr(s, "capabilities", {}).get("resources", {}).get("subscribe"):
+                if await self._subscribe(s, uri):
+                    ttl = None  # until notified
+            result = await s.read_resource(uri, timeout=timeout)
+        if listed:
+            cache.put(uri, result, ttl, generation)
+        return result
+
+    async def _subscribe(self, session: Any, uri: str) -> bool:
+        """Subscribe ``session`` to ``uri`` unless one already is; whether a session is subscribed.
+
+        Concurrent first reads of a URI wait for the one resources/subscribe
+        in flight instead of subscribing again (on another session, which
+        would then own the subscription and leave the first one behind).
+        A failed subscribe only costs the caching: the read uses the TTL.
+        """
+        pending = self._subscribing.get(uri)
+        if pending is not None:
+            await asyncio.shield(pending)
+        elif uri not in self._subscriptions:
+            pending = self._subscribing[uri] = asyncio.get_running_loop().create_future()
+            try:
+                await session.subscribe_resource(uri)
+                if session in self._leases:  # not dropped meanwhile (nothing would clean it up)
+                    self._subscriptions[uri] = session
+            except McpClientError:
+                pass
+            finally:
+                del self._subscribing[uri]
+                pending.set_result(None)
+        return uri in self._subscriptions
+
+    async def get_prompt(self, name: str, arguments: Dict[str, str],
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        async with self.session() as s:
+            return await s.get_prompt(name, arguments, timeout=timeout)
+
+    async def _listing(self, kind: str) -> Any:
+        listing = self._listings.get(kind)
+        if listing is None:
+            generation = self._listing_generations[kind]
+            async with self.session() as s:
+                listing = await (s.list_resources() if kind == "resources" else s.list_prompts())
+            # A list_changed that arrived mid-fetch may postdate this answer
+            if generation == self._listing_generations[kind]:
+                self._listings[kind] = listing
+        return listing
+
+    def _invalidate_listing(self, kind: str) -> None:
+        self._listing_generations[kind] += 1
+        self._listings.pop(kind, None)
+        if kind == "resources":
+            self.resource_cache.clear()  # a resource may be gone or no longer static
+
+    async def _is_listed(self, uri: str) -> bool:
+        """Whether resources/list names ``uri`` (templated URIs are not cached)."""
+        try:
+            listing = await self.list_resources()
+        except McpClientError:
+            return False  # a server without resources: read through
+        if self._listed_uris is None or self._listed_uris[0] is not listing:
+            self._listed_uris = (listing, frozenset(r.get("uri") for r in listing["resources"]))
+        return uri in self._listed_uris[1]
+
+    async def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        """Call a tool on a pooled session, behind the breaker and the limiter.
+
+        progress follows the call across replays; a hedged duplicate reports none.
+        raw: return the undecoded result (passthrough.RawJson).
+        """
+        self.breaker.before_call()
+        if not self.limiter.try_acquire():
+            self.breaker.record(None)
+            raise self.limiter.overloaded_error(self.server_type)
+        start = time.perf_counter()
+        failure: Optional[bool] = None  # None: cancelled, no verdict
+        ok = False
+        try:
+            result = await self._call_with_replay(name, params, timeout, progress, raw)
+            failure, ok = False, True
+            return result
+        except McpClientError as e:
+            failure = e.code in FAILURE_CODES
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            self.limiter.release(latency, dropped=bool(failure))
+            self.breaker.record(failure)
+            if failure is not None and self.metrics is not None:
+                self.metrics.record_call(name, int(latency * 1000), success=ok)
+
+    async def stream_tool(self, name: str, params: Dict[str, Any], chunk_size: int,
+                          timeout: Optional[float] = None) -> AsyncIterator[Union[bytes, Dict[str, Any]]]:
+        """call_tool whose result comes as result_stream.tool_text pieces, behind the breaker and the limiter.
+
+        ``timeout`` bounds the wait for the reply to start, not its transfer.
+        The call is settled (limiter, breaker, latency history) once the
+        reply has started: the transfer runs at the client's pace.
+        """
+        self.breaker.before_call()
+        if not self.limiter.try_acquire():
+            self.breaker.record(None)
+            raise self.limiter.overloaded_error(self.server_type)
+        start = time.perf_counter()
+        settled = False
+
+        def settle(failure: Optional[bool], ok: bool = False) -> None:  # None: cancelled, no verdict
+            nonlocal settled
+            settled = True
+            latency = time.perf_counter() - start
+            self.limiter.release(latency, dropped=bool(failure))
+            self.breaker.record(failure)
+            if failure is not None and self.metrics is not None:
+                self.metrics.record_call(name, int(latency * 1000), success=ok)
+
+        try:
+            key = affinity_key(self.affinity_keys, name, params) if self.affinity_keys else None
+            async with self.session(key=key, exclusive=True) as s:
+                stream = await s.call_tool_stream(name, params, timeout=timeout)
+                try:
+                    # tool_text raises an error reply before its first piece
+                    async for piece in tool_text(stream, chunk_size, s.max_message_bytes):
+                        if not settled:
+                            settle(False, ok=True)
+                        yield piece
+                finally:
+                    stream.close()
+            if not settled:
+                settle(False, ok=True)  # empty text
+        except McpClientError as e:
+            if not settled:
+                settle(e.code in FAILURE_CODES)
+            raise
+        finally:
+            if not settled:
+                settle(None)
+
+    async def _call_with_replay(self, name: str, params: Dict[str, Any], timeout: Optional[float],
+                                progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        replays = 0
+        while True:
+            try:
+                return await self._call_once(name, params, timeout, progress, raw)
+            except McpClientError as e:
+                if (e.code not in _REPLAY_CODES or name not in self.idempotent_tools
+                        or replays >= self.replay_max):
+                    raise
+                if deadline is not None:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        raise
+            replays += 1
+            self._replayed += 1
+
+    async def _call_once(self, name: str, params: Dict[str, Any], timeout: Optional[float],
+                         progress: Optional[ProgressCallback] = None, raw: bool = False) -> Any:
+        key = affinity_key(self.affinity_keys, name, params) if self.affinity_keys else None
+        options: Dict[str, Any] = {"raw": True} if raw else {}
+        tracked = options if progress is None else {**options, "progress": progress}
+        delay = self._hedge_delay(name)
+        if delay is None:
+            async with self.session(key=key) as s:
+                return await s.call_tool(name, params, timeout=timeout, **tracked)
+
+        picked: List[Any] = []
+
+        async def primary() -> Any:
+            async with self.session(key=key) as s:
+                picked.append(s)
+                return await s.call_tool(name, params, timeout=timeout, **tracked)
+
+        async def hedge() -> Any:
+            # Another replica only: a new one may be spawned, but never wait
+            async with self.session(exclude=picked, timeout=0) as s:
+                return await s.call_tool(name, params, timeout=None if timeout is None else max(timeout - delay, 0.001),
+                                         **options)
+
+        self.hedge_budget.deposit()
+        self.metrics.record_hedge_event(name, "eligible")
+        return await hedged(primary, hedge, delay, self.hedge_budget,
+                            record=lambda event: self.metrics.record_hedge_event(name, event))
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds to wait before hedging this call, or None to not hedge."""
+        if (self.hedge_percentile <= 0 or self.metrics is None or self.max_size < 2
+                or name not in self.idempotent_tools):
+            return None
+        latency_ms = self.metrics.get_latency_percentile(name, self.hedge_percentile)
+        return None if latency_ms is None else latency_ms / 1000
+
+    async def health(self) -> Dict[str, Any]:
+        try:
+            async with self.session() as s:
+                data = await s.health()
+        except McpClientError as e:
+            data = {"status": "error", "server_type": self.server_type, "message": e.message}
+        data["pool"] = self.stats()
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        idle = sum(1 for n in self._leases.values() if n == 0)
+        return {
+            "size": self._size,
+            "idle": idle,
+            "in_use": len(self._leases) - idle,
+            "in_flight": sum(self._leases.values()),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "max_inflight": self.max_inflight,
+            "spawned": self._spawned,
+            "discarded": self._discarded,
+            "connect_failures": self._connect_failures,
+            "tools_cached": self._catalog is not None,
+            "tools_invalidations": self._catalog_generation,
+            "resources": {**self.resource_cache.stats(), "subscriptions": len(self._subscriptions)},
+            "crashes": self._crashes,
+            "restarts": self._restarts,
+            "replayed": self._replayed,
+            "limiter": self.limiter.stats(),
+            "breaker": self.breaker.stats(),
+            "affinity": {
+                "tools": sorted(self.affinity_keys),
+                "ring_members": len(self._ring),
+                "home": self._affinity_home,
+                "spilled": self._affinity_spilled,
+            },
+        }
+
+
+class _SyncPoolAdapter:
+    """Synchronous adapter over a SessionPool (MCP_MODE=ws/http).
+
+    The pool lives on a private event loop thread so McpClient (scripts,
+    health checks) can share long-lived connections without asyncio.
+    """
+
+    def __init__(self, config: McpClientConfig) -> None:
+        self.timeout = config.timeout_default
+        self._pool = SessionPool.from_config(config)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                        name=f"mcp-{config.mode}-loop")
+        self._thread.start()
+        try:
+            self._run(self._pool.start(), self.timeout)
+        except Exception:
+            self.close()
+            raise
+
+    def _run(self, coro: Any, timeout: Optional[float]) -> Any:
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        # Small grace period so the session's own deadline fires first
+        return future.result(None if timeout is None else timeout + 1)
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        return self._run(self._pool.list_tools(), self.timeout)
+
+    def call_tool(self, name: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        timeout = timeout or self.timeout
+        return self._run(self._pool.call_tool(name, params, timeout=timeout), timeout)
+
+    def health(self) -> Dict[str, Any]:
+        return self._run(self._pool.health(), self.timeout)
+
+    def close(self) -> None:
+        loop = getattr(self, "_loop", None)
+        if loop is None or loop.is_closed():
+            return
+        try:
+            self._run(self._pool.close(), 2)
+        except Exception:
+            pass  # Best effort cleanup
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+        self._loop.close()
+
+    def __del__(self):
+        self.close()
+
+
+# Global singleton instance
+_global_pool: Optional[Any] = None  # SessionPool or gateway.Gateway
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> Optional[Any]:
+    """Return the shared pool, creating it on first use.
+
+    Returns None when MCP_MODE has no pooled transport (mock). With
+    MCP_SERVER_PROFILES set it is a gateway.Gateway over one pool per profile
+    (same adapter interface).
+    Sessions are opened lazily; the app lifespan runs ``warmup.warm_up`` to
+    pre-spawn min_size of them.
+    """
+    global _global_pool
+
+    if _global_pool is None:
+        with _pool_lock:
+            # Double-checked locking
+            if _global_pool is None:
+                config = McpClientConfig.from_env()
+                if config.server_profiles:
+                    from .gateway import Gateway  # builds on this module
+
+                    _global_pool = Gateway.from_config(config)
+                elif config.mode not in POOLED_MODES:
+                    return None
+                else:
+                    _global_pool = SessionPool.from_config(config)
+
+    return _global_pool
+
+
+def peek_session_pool() -> Optional[Any]:
+    """Return the shared pool if one exists, without creating it."""
+    return _global_pool
+
+
+async def close_session_pool(grace: float = 0) -> None:
+    """Close the shared pool (app shutdown); see SessionPool.close for grace."""
+    global _global_pool
+
+    with _pool_lock:
+        pool, _global_pool = _global_pool, None
+    if pool is not None:
+        await pool.close(grace=grace)
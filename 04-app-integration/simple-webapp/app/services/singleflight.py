@@ -0,0 +1,127 @@
+"""
+Single-flight coalescing of identical concurrent tool calls.
+
+When many requests ask for the same result at once (``list_files`` on a big
+shared directory, or every poller right after a cache entry expired), each
+would otherwise reach the server on its own. McpClient / AsyncMcpClient
+route calls through a flight group instead:
+
+- the key is the tool name plus canonical params (result_cache.canonical_params)
+- the first caller (leader) makes the upstream call; identical calls that
+  arrive while it is in flight wait for it and get the same result or error
+- each joined waiter is counted per tool in ``MetricsCollector``
+  (``coalesced``), so the saving is visible on /monitoring/metrics
+- tools with side effects opt out via MCP_COALESCE_EXCLUDE (``*`` = all)
+
+Results are shared between waiters and must be treated as read-only, as
+with cached results. In the asyncio group the upstream call runs in its own
+task, so a leader whose HTTP client went away does not fail the waiters.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .metrics_collector import MetricsCollector, get_metrics_collector
+
+T = TypeVar("T")
+
+FlightKey = Tuple[str, str]  # (tool, canonical params)
+
+
+class SingleFlight:
+    """Thread-based flight group (McpClient, batch worker threads)."""
+
+    def __init__(self, metrics: Optional[MetricsCollector] = None) -> None:
+        self._metrics = metrics
+        self._flights: Dict[FlightKey, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: FlightKey, fn: Callable[[], T]) -> T:
+        """Run fn once for all concurrent callers with the same key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+        if not leader:
+            _record(self._metrics, key[0])
+            return flight.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+class AsyncSingleFlight:
+    """asyncio flight group (AsyncMcpClient)."""
+
+    def __init__(self, metrics: Optional[MetricsCollector] = None) -> None:
+        self._metrics = metrics
+        self._flights: Dict[FlightKey, "asyncio.Task[Any]"] = {}
+
+    async def do(self, key: FlightKey, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() once for all concurrent callers with the same key."""
+        task = self._flights.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            _record(self._metrics, key[0])
+        # shield: one waiter being cancelled must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: FlightKey, task: "asyncio.Task[Any]") -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved: waiters may all have gone away
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+def _record(metrics: Optional[MetricsCollector], tool: str) -> None:
+    if metrics is not None:
+        metrics.record_coalesced_call(tool)
+
+
+# Global singletons: flights must be shared by the per-request client facades
+_sync_group: Optional[SingleFlight] = None
+_async_group: Optional[AsyncSingleFlight] = None
+_group_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    global _sync_group
+
+    if _sync_group is None:
+        with _group_lock:
+            if _sync_group is None:
+                _sync_group = SingleFlight(metrics=get_metrics_collector())
+    return _sync_group
+
+
+def get_async_single_flight() -> AsyncSingleFlight:
+    global _async_group
+
+    if _async_group is None:
+        with _group_lock:
+            if _async_group is None:
+                _async_group = AsyncSingleFlight(metrics=get_metrics_collector())
+    return _async_group
@@ -0,0 +1,98 @@
+"""
+Startup warm-up and readiness for the shared session pool.
+
+Without it the first requests after a deploy pay for the server spawn, its
+``mcp.server.fastmcp`` import and the ``initialize`` handshake. The app
+lifespan instead:
+
+- starts ``warm_up()`` in the background: fill the pool to MCP_POOL_MIN_SIZE
+  and cache ``tools/list``, retrying with backoff while the server is down
+- reports ``GET /ready`` as 503 until that finished, so a load balancer only
+  routes traffic to warm instances (``/health`` stays a plain liveness check)
+- on shutdown flips readiness back to not-ready, stops a pending warm-up and
+  gives in-flight calls MCP_SHUTDOWN_GRACE seconds before closing sessions;
+  running jobs (POST /mcp/jobs) share that grace, queued ones are dropped
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from .admission import reset_admission_controller
+from .jobs import close_job_manager
+from .mcp_client import McpClientConfig, McpClientError
+from .session_pool import close_session_pool, get_session_pool, peek_session_pool
+
+
+@dataclass
+class Readiness:
+    status: str = "starting"  # starting | ready | stopping
+    detail: Optional[str] = None  # last warm-up error while starting
+    attempts: int = 0
+    warmup_ms: Optional[int] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        pool = peek_session_pool()
+        if pool is not None:
+            data["pool"] = pool.stats()
+        return data
+
+
+_readiness = Readiness()
+
+
+def get_readiness() -> Readiness:
+    return _readiness
+
+
+async def warm_up() -> None:
+    """Fill the shared pool and cache tools/list; retry until it succeeds."""
+    state = _readiness
+    start = time.perf_counter()
+    pool = get_session_pool()
+    if pool is not None:
+        delay = pool.backoff_initial
+        while True:
+            state.attempts += 1
+            try:
+                await pool.start()
+                await pool.refresh_tools()
+                break
+            except McpClientError as e:
+                if e.code == "pool_closed":
+                    return
+                state.detail = f"{e.code}: {e.message}"
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, pool.backoff_max)
+    state.status = "ready"
+    state.detail = None
+    state.warmup_ms = int((time.perf_counter() - start) * 1000)
+
+
+def start_warm_up() -> "asyncio.Task[None]":
+    """Reset readiness and run warm_up() in the background (app startup)."""
+    global _readiness
+
+    _readiness = Readiness()
+    return asyncio.create_task(warm_up())
+
+
+async def shut_down(warmup: Optional["asyncio.Task[None]"] = None) -> None:
+    """Stop taking traffic, then drain and close the shared pool (app shutdown)."""
+    _readiness.status = "stopping"
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+        await asyncio.gather(warmup, return_exceptions=True)
+    grace = McpClientConfig.from_env().shutdown_grace
+    deadline = time.monotonic() + grace
+    # Jobs first: their workers would otherwise build a new pool after this one closed
+    await close_job_manager(grace=grace)
+    await close_session_pool(grace=max(0.0, deadline - time.monotonic()))
+    reset_admission_controller()
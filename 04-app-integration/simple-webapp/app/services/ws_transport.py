@@ -0,0 +1,102 @@
+"""
+WebSocket transport for remote MCP servers (MCP_MODE=ws).
+
+A WebSocket server (MCP_SERVER_URI, e.g. the ``sample-ws`` profile in
+``03-discover-servers/configs/server_profiles.json``) runs as a shared daemon
+instead of one subprocess per web host. Each text frame carries one
+JSON-RPC message.
+
+- AsyncWsSession: one long-lived connection; JSON-RPC ids are multiplexed
+  over it exactly like AsyncStdioSession does over a pipe.
+- The SessionPool keeps several connections open and reconnects dropped
+  ones with exponential backoff.
+- The synchronous McpClient reaches the same pool through
+  ``session_pool._SyncPoolAdapter``.
+
+Requires the optional ``websockets`` package (installed with uvicorn[standard]).
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Optional
+
+try:
+    import websockets  # type: ignore
+except Exception:  # pragma: no cover
+    websockets = None
+
+from . import json_codec
+from .async_mcp_client import AsyncRpcSession
+from .framing import DEFAULT_MAX_MESSAGE_BYTES
+from .mcp_client import McpClientError
+
+
+class AsyncWsSession(AsyncRpcSession):
+    """One WebSocket connection to an MCP server."""
+
+    server_type = "ws"
+
+    def __init__(self, uri: str, timeout: float = 10, headers: Optional[Dict[str, str]] = None,
+                 max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES) -> None:
+        super().__init__(timeout)
+        self.uri = uri
+        self.headers = headers or {}
+        self.max_message_bytes = max_message_bytes
+        self._ws: Any = None
+
+    @classmethod
+    async def open(cls, uri: str, timeout: float = 10,
+                   headers: Optional[Dict[str, str]] = None,
+                   max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES) -> "AsyncWsSession":
+        """Connect and run the initialize handshake."""
+        session = cls(uri, timeout, headers, max_message_bytes)
+        await session._connect()
+        await session._initialize()
+        return session
+
+    async def _connect(self) -> None:
+        if websockets is None:
+            raise McpClientError("config_error", "websockets not installed (required for MCP_MODE=ws)")
+        try:
+            self._ws = await asyncio.wait_for(
+                websockets.connect(
+                    self.uri,
+                    additional_headers=self.headers or None,
+                    subprotocols=["mcp"],
+                    # Larger frames close the connection (1009 message too big)
+                    max_size=self.max_message_bytes,
+                ),
+                self.timeout,
+            )
+        except asyncio.TimeoutError:
+            raise McpClientError("connection_error", f"WebSocket connect timed out: {self.uri}")
+        except Exception as e:
+            raise McpClientError("connection_error", f"WebSocket connect failed: {e}", {"uri": self.uri})
+        self._tasks = [asyncio.create_task(self._reader_loop())]
+
+    def _transport_alive(self) -> bool:
+        return self._ws is not None and self._ws.close_code is None
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        # MCP frames are text; the encoded bytes are already valid UTF-8
+        await self._ws.send(json_codec.dumps(message), text=True)
+
+    async def _reader_loop(self) -> None:
+        reason = "WebSocket closed by server"
+        try:
+            async for frame in self._ws:
+                self._on_frame(frame)
+        except asyncio.CancelledError:
+            reason = "Session closed"
+        except Exception as e:  # noqa: BLE001
+            reason = f"WebSocket connection lost: {e}"
+        self._connection_lost(reason, {"uri": self.uri})
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            try:
+                await asyncio.wait_for(self._ws.close(), 2)
+            except Exception:
+                pass  # Best effort close
+        await self._cancel_tasks()
+
@@ -0,0 +1,92 @@
+"""
+Per-call CPU cost of JSON handling for a read_file-sized tool result.
+
+Compares, for each payload size, the path one ``/mcp/actions/{tool}`` call
+took before json_codec with the current one:
+
+- stdlib: frame decoded to str, ``json.loads``, then the result re-validated
+  through ``ActionResponse`` and rendered by FastAPI's ``jsonable_encoder`` +
+  ``JSONResponse``
+- <codec>: bytes frame parsed by json_codec, response rendered by
+  ``CodecJSONResponse`` without re-validation
+
+Times are CPU seconds (time.process_time) per call, best of --repeat runs.
+
+Usage (from simple-webapp/):
+    python -m benchmarks.bench_json_codec [--sizes 10000 1000000 8000000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from app.routers.mcp import ActionResponse
+from app.services import json_codec
+
+
+def _frame(size: int) -> bytes:
+    text = ("line of a large file, with some unicode: é ✓\n" * (size // 45 + 1))[:size]
+    message = {"jsonrpc": "2.0", "id": 1,
+               "result": {"content": [{"type": "text", "text": text}], "isError": False}}
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def _baseline(frame: bytes) -> None:
+    message = json.loads(frame.decode("utf-8"))
+    data = {"text": message["result"]["content"][0]["text"]}
+    model = ActionResponse(tool="read_file", data=data, latency_ms=1)
+    JSONResponse(content=jsonable_encoder(model))
+
+
+def _with_codec(codec: json_codec.JsonCodec) -> Callable[[bytes], None]:
+    def run(frame: bytes) -> None:
+        message = codec.loads(frame)
+        data = {"text": message["result"]["content"][0]["text"]}
+        body = {"tool": "read_file", "data": data, "latency_ms": 1, "success": True}
+        # What CodecJSONResponse does, with this codec instead of the configured one
+        Response(content=codec.dumps(body), media_type="application/json")
+    return run
+
+
+def _measure(fn: Callable[[bytes], None], frame: bytes, number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        for _ in range(number):
+            fn(frame)
+        best = min(best, (time.process_time() - start) / number)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 8_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs: List[json_codec.JsonCodec] = []
+    for name in json_codec.BACKENDS:
+        codec = json_codec.load_codec(name)
+        if codec.name == name:  # skip backends that are not installed
+            codecs.append(codec)
+
+    print(f"{'payload':>10}  {'path':<8} {'ms/call':>9} {'saved':>7}")
+    for size in args.sizes:
+        frame = _frame(size)
+        number = max(1, 20_000_000 // max(size, 1) // 10)
+        base = _measure(_baseline, frame, number, args.repeat)
+        print(f"{size:>10}  {'baseline':<8} {base * 1000:>9.3f} {'-':>7}")
+        results: Dict[str, float] = {}
+        for codec in codecs:
+            results[codec.name] = _measure(_with_codec(codec), frame, number, args.repeat)
+            saved = 1 - results[codec.name] / base
+            print(f"{'':>10}  {codec.name:<8} {results[codec.name] * 1000:>9.3f} {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Peak Python memory while receiving one large stdio reply.
+
+Compares the former text-mode reader (``bufsize=1``, ``readline()`` and
+``json.loads`` of the decoded line) with ``_StdioAdapter`` (binary pipe,
+LineFramer, json_codec). Both talk to ``tests_mcp/fake_mcp_server.py`` and
+fetch a ``blob`` of each size; memory is the tracemalloc peak during the
+call (including the reader thread) and wall time per call.
+
+Usage (from simple-webapp/):
+    python -m benchmarks.bench_stdio_memory [--sizes 1 8 32]   (MiB)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+from app.services.mcp_client import INITIALIZE_PARAMS, _StdioAdapter
+
+FAKE_SERVER = [sys.executable, str(Path(__file__).resolve().parent.parent / "tests_mcp" / "fake_mcp_server.py")]
+MiB = 1024 * 1024
+
+
+class _TextModeClient:
+    """The previous _StdioAdapter read path, reduced to one request at a time."""
+
+    def __init__(self) -> None:
+        self._proc = subprocess.Popen(FAKE_SERVER, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      text=True, encoding="utf-8", bufsize=1)
+        self._id = 0
+        self.request("initialize", INITIALIZE_PARAMS)
+
+    def request(self, method: str, params: dict) -> dict:
+        self._id += 1
+        self._proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": self._id, "method": method,
+                                           "params": params}) + "\n")
+        self._proc.stdin.flush()
+        return json.loads(self._proc.stdout.readline())["result"]
+
+    def call_tool(self, name: str, params: dict) -> dict:
+        return self.request("tools/call", {"name": name, "arguments": params})["content"][0]
+
+    def close(self) -> None:
+        self._proc.terminate()
+        self._proc.wait()
+
+
+def _peak(call: Callable[[], dict]) -> Tuple[int, float]:
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - before
+    del result
+    return peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 8, 32], help="payload sizes in MiB")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    legacy = _TextModeClient()
+    adapter = _StdioAdapter(" ".join(FAKE_SERVER), timeout=60,
+                            max_message_bytes=(max(args.sizes) + 1) * MiB)
+    try:
+        print(f"{'payload':>9}  {'text readline':>22}  {'LineFramer':>22}")
+        for size in args.sizes:
+            params = {"size": size * MiB}
+            old, old_s = _peak(lambda: legacy.call_tool("blob", params))
+            new, new_s = _peak(lambda: adapter.call_tool("blob", params))
+            print(f"{size:>5} MiB  {old / MiB:>8.1f} MiB {old_s * 1000:>8.1f} ms"
+                  f"  {new / MiB:>8.1f} MiB {new_s * 1000:>8.1f} ms")
+    finally:
+        legacy.close()
+        adapter.close()
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Peak Python memory and latency per request: buffered POST /mcp/actions/{tool},
+the same with ?passthrough=true (result bytes spliced, never decoded), and
+the NDJSON POST /mcp/actions/{tool}:stream (reply forwarded as it arrives,
+never assembled).
+
+Runs the app in-process in stdio mode against ``tests_mcp/fake_mcp_server.py``
+and fetches a ``blob`` of each size through each variant. The ASGI app is
+driven directly with a ``send`` that counts and drops body chunks (httpx's
+ASGITransport would buffer the whole body client-side), so the tracemalloc
+peak is what the server holds for one request: the decoded reply plus
+whatever the endpoint builds from it, or for the stream the bounded buffer
+between session and response. "first" is the time to the first body chunk.
+Result caching and coalescing play no part (no MCP_CACHE_TOOLS, one request
+at a time).
+
+Usage (from simple-webapp/):
+    python -m benchmarks.bench_streaming [--sizes 8 32 50]   (MiB)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+FAKE_SERVER = f"{sys.executable} {Path(__file__).resolve().parent.parent / 'tests_mcp' / 'fake_mcp_server.py'}"
+MiB = 1024 * 1024
+
+
+async def _request(app: Any, path: str, body: bytes) -> Tuple[int, int, int, float]:
+    """POST through the ASGI interface; returns (status, body bytes, body chunks, first chunk time)."""
+    path, _, query = path.partition("?")
+    scope: Dict[str, Any] = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    sent: Dict[str, Any] = {"status": 0, "bytes": 0, "chunks": 0, "first": 0.0}
+    received = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)  # no disconnect while the response streams
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if not sent["chunks"]:
+                sent["first"] = time.perf_counter()
+            sent["bytes"] += len(message["body"])
+            sent["chunks"] += 1
+
+    await app(scope, receive, send)
+    return sent["status"], sent["bytes"], sent["chunks"], sent["first"]
+
+
+async def _measure(app: Any, path: str, size: int) -> Tuple[int, float, float, int]:
+    from app.services.session_pool import close_session_pool
+
+    # A fresh session per measurement: the previous reply's grown read buffer
+    # would otherwise sit in the baseline and be freed mid-request.
+    await close_session_pool()
+    await _request(app, "/mcp/actions/echo", b'{"params": {"text": "warm up"}}')
+    gc.collect()
+    body = b'{"params": {"size": %d}}' % size
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    status, length, chunks, first = await _request(app, path, body)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - before
+    if status != 200 or length < size:
+        raise SystemExit(f"{path}: HTTP {status}, {length} bytes")
+    return peak, elapsed, first - start, chunks
+
+
+async def run(sizes: Any) -> None:
+    os.environ.update({
+        "MCP_MODE": "stdio",
+        "MCP_EXEC_PATH": FAKE_SERVER,
+        "MCP_TIMEOUT_DEFAULT": "120",
+        "MCP_MAX_MESSAGE_BYTES": str((max(sizes) + 1) * MiB),
+    })
+    from app.main import create_app
+    from app.services.session_pool import close_session_pool
+
+    app = create_app()
+    try:
+        tracemalloc.start()
+        print(f"{'payload':>9}  {'buffered JSON':>22}  {'passthrough':>22}  {'NDJSON stream':>40}")
+        for size in sizes:
+            buffered, buffered_s, _, _ = await _measure(app, "/mcp/actions/blob", size * MiB)
+            raw, raw_s, _, _ = await _measure(app, "/mcp/actions/blob?passthrough=true", size * MiB)
+            streamed, streamed_s, first_s, chunks = await _measure(app, "/mcp/actions/blob:stream", size * MiB)
+            print(f"{size:>5} MiB  {buffered / MiB:>8.1f} MiB {buffered_s * 1000:>8.1f} ms"
+                  f"  {raw / MiB:>8.1f} MiB {raw_s * 1000:>8.1f} ms"
+                  f"  {streamed / MiB:>8.1f} MiB {streamed_s * 1000:>8.1f} ms (first {first_s * 1000:>5.1f} ms)"
+                  f" {chunks:>5} chunks")
+    finally:
+        tracemalloc.stop()
+        await close_session_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 50], help="payload sizes in MiB")
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes))
+
+
+if __name__ == "__main__":
+    main()
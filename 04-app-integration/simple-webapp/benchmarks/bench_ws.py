@@ -0,0 +1,151 @@
+"""
+Throughput of many small tool calls: POST /mcp/actions/{tool} vs /mcp/ws.
+
+Starts the app under uvicorn in a subprocess (stdio mode, pooled
+``tests_mcp/fake_mcp_server.py`` processes) and makes --calls ``echo``
+calls with --concurrency in flight, first as REST requests over a
+keep-alive httpx connection pool, then as JSON-RPC ``tools/call`` messages
+multiplexed over one WebSocket. Reports calls per second, per-call latency
+(p50/p95) and, on Linux, the server process's CPU time per call. Client and
+server share the machine and httpx spends more CPU per request than the
+server does, so on few cores calls/s understates REST; server CPU per call
+is the per-request HTTP overhead itself.
+Result caching plays no part (no MCP_CACHE_TOOLS); identical calls in
+flight would be coalesced, so each call echoes a distinct text. The adaptive
+limit is pinned at --concurrency (MCP_LIMIT_MIN) so neither path has calls
+shed with ``overloaded`` while the fake servers queue up.
+
+Usage (from simple-webapp/):
+    python -m benchmarks.bench_ws [--calls 5000] [--concurrency 32]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Dict, List, Optional, Tuple
+
+import httpx
+import websockets
+
+FAKE_SERVER = f"{sys.executable} {Path(__file__).resolve().parent.parent / 'tests_mcp' / 'fake_mcp_server.py'}"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime of a process (Linux /proc), None elsewhere."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _timed(name: str, pid: int, run: Awaitable[Tuple[float, List[float]]]) -> str:
+    cpu_before = _cpu_seconds(pid)
+    elapsed, latencies = await run
+    cpu_after = _cpu_seconds(pid)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    line = f"{name:>5}  {len(latencies) / elapsed:>9.0f} calls/s  p50 {p50:>7.2f} ms  p95 {p95:>7.2f} ms"
+    if cpu_before is not None and cpu_after is not None:
+        line += f"  server CPU {(cpu_after - cpu_before) / len(latencies) * 1000:>6.3f} ms/call"
+    return line
+
+
+async def _rest(base: str, calls: int, concurrency: int) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as http:
+        next_call = iter(range(calls))
+
+        async def worker() -> None:
+            for i in next_call:
+                start = time.perf_counter()
+                r = await http.post("/mcp/actions/echo", json={"params": {"text": f"call {i}"}})
+                if r.status_code != 200:
+                    raise SystemExit(f"REST call {i}: HTTP {r.status_code} {r.text}")
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, latencies
+
+
+async def _ws(url: str, calls: int, concurrency: int) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+    sent: Dict[int, float] = {}
+    window = asyncio.Semaphore(concurrency)
+    async with websockets.connect(url, max_size=None) as ws:
+        async def reader() -> None:
+            for _ in range(calls):
+                message = json.loads(await ws.recv())
+                if "error" in message:
+                    raise SystemExit(f"WS call {message['id']}: {message['error']}")
+                latencies.append(time.perf_counter() - sent.pop(message["id"]))
+                window.release()
+
+        start = time.perf_counter()
+        receiving = asyncio.ensure_future(reader())
+        for i in range(calls):
+            await window.acquire()
+            sent[i] = time.perf_counter()
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": i, "method": "tools/call",
+                                      "params": {"name": "echo", "arguments": {"text": f"call {i}"}}}))
+        await receiving
+        return time.perf_counter() - start, latencies
+
+
+async def run(calls: int, concurrency: int) -> None:
+    port = _free_port()
+    env = {**os.environ, "MCP_MODE": "stdio", "MCP_EXEC_PATH": FAKE_SERVER,
+           "MCP_POOL_MIN_SIZE": "4", "MCP_POOL_MAX_SIZE": "4", "MCP_POOL_MAX_INFLIGHT": str(concurrency),
+           "MCP_LIMIT_MIN": str(concurrency), "MCP_WS_MAX_INFLIGHT": str(concurrency),
+           "MCP_ADMISSION_MAX_CONCURRENT": str(concurrency * 2)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=Path(__file__).resolve().parent.parent)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base) as http:
+            for _ in range(200):
+                try:
+                    if (await http.get("/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise SystemExit("server did not become ready")
+        print(f"{calls} echo calls, {concurrency} in flight")
+        await _rest(base, min(calls, 200), concurrency)  # warm up both paths
+        await _ws(f"ws://127.0.0.1:{port}/mcp/ws", min(calls, 200), concurrency)
+        print(await _timed("REST", server.pid, _rest(base, calls, concurrency)))
+        print(await _timed("WS", server.pid, _ws(f"ws://127.0.0.1:{port}/mcp/ws", calls, concurrency)))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
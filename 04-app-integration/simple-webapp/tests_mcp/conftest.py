@@ -0,0 +1,83 @@
+import asyncio
+import inspect
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from app.services.mcp_client import McpClientError
+from app.services.session_pool import SessionPool
+
+# Command line of the scripted stdio server; append flags such as "--no-subscribe"
+FAKE_SERVER = f"{sys.executable} {Path(__file__).parent / 'fake_mcp_server.py'}"
+
+
+@pytest.fixture
+def stdio_env(monkeypatch):
+    """Point the app at a stdio server: stdio_env(exec_path=FAKE_SERVER, MCP_...="value")."""
+
+    def configure(exec_path=FAKE_SERVER, **env):
+        monkeypatch.setenv("MCP_MODE", "stdio")
+        monkeypatch.setenv("MCP_EXEC_PATH", exec_path)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+
+    return configure
+
+
+async def until(predicate, timeout=5.0):
+    """Poll ``predicate`` (plain or async) until it is true; AssertionError after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        reached = predicate()
+        if inspect.isawaitable(reached):
+            reached = await reached
+        if reached:
+            return
+        if time.monotonic() > deadline:
+            raise AssertionError(f"condition not reached within {timeout} seconds")
+        await asyncio.sleep(0.02)
+
+
+class Replica:
+    """In-process stand-in for one pooled server process: answers call_tool with its name after ``delay``."""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.alive = True
+        self.calls = 0
+        self.paths = Counter()  # calls by params["path"]
+        self.cancelled = 0
+
+    def is_alive(self):
+        return self.alive
+
+    async def call_tool(self, name, params, timeout=None):
+        self.calls += 1
+        self.paths[params.get("path")] += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise McpClientError("tool_error", f"{self.name} failed")
+        return {"replica": self.name}
+
+    async def close(self):
+        self.alive = False
+
+
+def replica_pool(replicas, **options):
+    """SessionPool whose spawns hand out ``replicas`` in order (one per replica by default)."""
+    queue = list(replicas)
+
+    async def factory():
+        return queue.pop(0)
+
+    options = {"min_size": len(replicas), "max_size": len(replicas), **options}
+    return SessionPool(factory, **options)
@@ -0,0 +1,227 @@
+"""
+Minimal stdio MCP server used by the client tests.
+
+Speaks newline-delimited JSON-RPC 2.0 like FastMCP's stdio transport, but only
+needs the standard library so each spawn is fast and deterministic.
+
+Tools
+- echo: { text, image? } -> text; with image (base64), an image item follows
+- pid: returns the server process id (lets tests tell sessions apart)
+- sleep: { seconds, text?, steps? } -> text after a delay; with steps and a
+  _meta.progressToken, sends that many notifications/progress along the way
+- crash: exits the process without answering
+- notify: { text } sends a notifications/message before answering
+- cancelled: JSON list of request ids named by notifications/cancelled
+- blob: { size } -> text of that many bytes (large-message tests)
+- add_tool: { name } registers another tool and sends
+  notifications/tools/list_changed before answering
+
+tools/list is paginated (PAGE_SIZE tools per page, nextCursor = offset).
+
+Resources and prompts mirror 03-discover-servers/servers/echo.py: the static
+echo://static, the template echo://{text} and the prompt echo { text }.
+resources/subscribe is supported (capability resources.subscribe). Unknown
+resources and prompts are answered like FastMCP does: error code 0 with
+"Unknown resource: <uri>" / "Unknown prompt: <name>". Test-only methods:
+- fake/set_resource: { uri, text } changes a resource and sends
+  notifications/resources/updated if the uri was subscribed
+- fake/reads: resources/read counts per uri
+
+Options
+- --delay-start SECONDS: sleep before serving (simulates a slow import)
+- --tool NAME: register an extra tool that answers with the server name
+  (FAKE_MCP_NAME env, default fake-mcp-server); repeatable
+- --no-subscribe: do not offer resources/subscribe
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+_write_lock = threading.Lock()
+_cancelled = []
+PAGE_SIZE = 4
+SERVER_NAME = os.environ.get("FAKE_MCP_NAME", "fake-mcp-server")
+
+TOOLS = [
+    {"name": "echo", "description": "Echo the input text",
+     "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}}},
+    {"name": "pid", "description": "Return the server process id",
+     "inputSchema": {"type": "object", "properties": {}}},
+    {"name": "sleep", "description": "Answer after a delay",
+     "inputSchema": {"type": "object", "properties": {"seconds": {"type": "number"}}}},
+    {"name": "crash", "description": "Exit without answering",
+     "inputSchema": {"type": "object", "properties": {}}},
+    {"name": "notify", "description": "Send a log notification, then answer",
+     "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}}},
+    {"name": "cancelled", "description": "List cancelled request ids",
+     "inputSchema": {"type": "object", "properties": {}}},
+    {"name": "blob", "description": "Return a text of the given size",
+     "inputSchema": {"type": "object", "properties": {"size": {"type": "integer"}}}},
+    {"name": "add_tool", "description": "Register a tool and announce list_changed",
+     "inputSchema": {"type": "object", "properties": {"name": {"type": "string"}}}},
+]
+_EXTRA_TOOLS = set()
+RESOURCES = {"echo://static": "Echo!"}
+_subscribed = set()
+_reads = {}
+SUBSCRIBE = "--no-subscribe" not in sys.argv
+
+
+def _send(message):
+    line = json.dumps(message) + "\n"
+    with _write_lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+def _text(value):
+    return {"content": [{"type": "text", "text": str(value)}], "isError": False}
+
+
+def _call_tool(name, args, meta):
+    if name == "echo":
+        result = _text(args.get("text", ""))
+        if "image" in args:
+            result["content"].append({"type": "image", "data": args["image"], "mimeType": "image/png"})
+        return result
+    if name == "pid":
+        return _text(os.getpid())
+    if name == "sleep":
+        seconds, steps = float(args.get("seconds", 0)), int(args.get("steps", 0))
+        token = meta.get("progressToken")
+        if steps and token is not None:
+            for step in range(1, steps + 1):
+                time.sleep(seconds / steps)
+                _send({"jsonrpc": "2.0", "method": "notifications/progress", "params": {
+                    "progressToken": token, "progress": step, "total": steps, "message": f"step {step}"}})
+        else:
+            time.sleep(seconds)
+        return _text(args.get("text", "done"))
+    if name == "crash":
+        os._exit(3)
+    if name == "notify":
+        _send({"jsonrpc": "2.0", "method": "notifications/message",
+               "params": {"level": "info", "data": args.get("text", "")}})
+        return _text("notified")
+    if name == "cancelled":
+        return _text(json.dumps(_cancelled))
+    if name == "blob":
+        return _text("x" * int(args.get("size", 0)))
+    if name in _EXTRA_TOOLS:
+        return _text(SERVER_NAME)
+    if name == "add_tool":
+        _add_tool(args["name"])
+        _send({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+        return _text("added")
+    raise KeyError(name)
+
+
+def _read_resource(uri):
+    _reads[uri] = _reads.get(uri, 0) + 1
+    if uri in RESOURCES:
+        text = RESOURCES[uri]
+    elif uri.startswith("echo://"):
+        text = f"Echo: {uri[len('echo://'):]}"
+    else:
+        raise KeyError(uri)
+    return {"contents": [{"uri": uri, "mimeType": "text/plain", "text": text}]}
+
+
+def _add_tool(name):
+    _EXTRA_TOOLS.add(name)
+    TOOLS.append({"name": name, "description": "Added at runtime",
+                  "inputSchema": {"type": "object", "properties": {}}})
+
+
+def _handle(message):
+    method = message.get("method")
+    msg_id = message.get("id")
+    params = message.get("params") or {}
+
+    if msg_id is None:
+        if method == "notifications/cancelled":
+            _cancelled.append(params.get("requestId"))
+        return  # notifications get no answer
+
+    if method == "initialize":
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {"tools": {"listChanged": True},
+                             "resources": {"subscribe": SUBSCRIBE, "listChanged": True},
+                             "prompts": {"listChanged": False}},
+            "serverInfo": {"name": SERVER_NAME, "version": "0.1.0"},
+        }})
+    elif method == "tools/list":
+        start = int(params.get("cursor") or 0)
+        result = {"tools": TOOLS[start:start + PAGE_SIZE]}
+        if start + PAGE_SIZE < len(TOOLS):
+            result["nextCursor"] = str(start + PAGE_SIZE)
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": result})
+    elif method == "tools/call":
+        try:
+            result = _call_tool(params.get("name"), params.get("arguments") or {}, params.get("_meta") or {})
+        except KeyError:
+            _send({"jsonrpc": "2.0", "id": msg_id,
+                   "error": {"code": -32602, "message": f"Unknown tool: {params.get('name')}"}})
+            return
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": result})
+    elif method == "resources/list":
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {
+            "resources": [{"uri": uri, "name": uri, "mimeType": "text/plain"} for uri in RESOURCES]}})
+    elif method == "resources/templates/list":
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {
+            "resourceTemplates": [{"uriTemplate": "echo://{text}", "name": "echo_template",
+                                   "description": "Echo the input text", "mimeType": "text/plain"}]}})
+    elif method == "resources/read":
+        try:
+            result = _read_resource(params.get("uri"))
+        except KeyError:
+            _send({"jsonrpc": "2.0", "id": msg_id,
+                   "error": {"code": 0, "message": f"Unknown resource: {params.get('uri')}"}})
+            return
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": result})
+    elif method == "resources/subscribe" and SUBSCRIBE:
+        _subscribed.add(params.get("uri"))
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {}})
+    elif method == "fake/set_resource":
+        RESOURCES[params["uri"]] = params["text"]
+        if params["uri"] in _subscribed:
+            _send({"jsonrpc": "2.0", "method": "notifications/resources/updated", "params": {"uri": params["uri"]}})
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {}})
+    elif method == "fake/reads":
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": dict(_reads)})
+    elif method == "prompts/list":
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {"prompts": [
+            {"name": "echo", "arguments": [{"name": "text", "required": True}]}]}})
+    elif method == "prompts/get":
+        if params.get("name") != "echo":
+            _send({"jsonrpc": "2.0", "id": msg_id,
+                   "error": {"code": 0, "message": f"Unknown prompt: {params.get('name')}"}})
+            return
+        text = (params.get("arguments") or {}).get("text", "")
+        _send({"jsonrpc": "2.0", "id": msg_id, "result": {
+            "messages": [{"role": "user", "content": {"type": "text", "text": text}}]}})
+    else:
+        _send({"jsonrpc": "2.0", "id": msg_id,
+               "error": {"code": -32601, "message": f"Method not found: {method}"}})
+
+
+def main():
+    if "--delay-start" in sys.argv:
+        time.sleep(float(sys.argv[sys.argv.index("--delay-start") + 1]))
+    for i, arg in enumerate(sys.argv):
+        if arg == "--tool":
+            _add_tool(sys.argv[i + 1])
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        message = json.loads(line)
+        # Answer each request on its own thread so slow tools don't block the pipe
+        threading.Thread(target=_handle, args=(message,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
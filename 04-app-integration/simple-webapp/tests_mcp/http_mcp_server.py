@@ -0,0 +1,74 @@
+"""
+Local streamable HTTP MCP server used by the http transport tests.
+
+A real FastMCP server (same SDK as ``fastmcp_quick_server.py``) served by
+uvicorn on a background thread, so the client is exercised against the
+official POST + SSE implementation rather than a hand-written stand-in.
+
+Tools
+- echo: { text } -> text
+- sleep: { seconds, text? } -> text after a delay (async; calls overlap)
+- notify: { text } sends a log notification on the reply stream, then answers
+
+Run standalone: python http_mcp_server.py --port 8001  (endpoint /mcp)
+"""
+import argparse
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from mcp.server.fastmcp import Context, FastMCP
+
+
+def build_server(json_response: bool = False) -> FastMCP:
+    mcp = FastMCP("http-test-server", json_response=json_response)
+
+    @mcp.tool()
+    def echo(text: str = "") -> str:
+        """Echo the input text"""
+        return text
+
+    @mcp.tool()
+    async def sleep(seconds: float = 0, text: str = "done") -> str:
+        """Answer after a delay"""
+        await asyncio.sleep(seconds)
+        return text
+
+    @mcp.tool()
+    async def notify(ctx: Context, text: str = "") -> str:
+        """Send a log notification, then answer"""
+        await ctx.info(text)
+        return "notified"
+
+    return mcp
+
+
+@contextmanager
+def serve_in_thread(json_response: bool = False) -> Iterator[str]:
+    """Run the server on a free port and yield its endpoint URL."""
+    app = build_server(json_response).streamable_http_app()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("HTTP MCP test server did not start")
+        time.sleep(0.02)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/mcp"
+    finally:
+        server.should_exit = True
+        thread.join(5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP MCP test server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--json", action="store_true", help="answer with JSON instead of SSE")
+    args = parser.parse_args()
+    uvicorn.run(build_server(args.json).streamable_http_app(), host="127.0.0.1", port=args.port)
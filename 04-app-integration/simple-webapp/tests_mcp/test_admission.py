@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import create_app
+from app.services.admission import AdmissionController, reset_admission_controller
+from app.services.mcp_client import McpClientError
+from app.services.metrics_collector import MetricsCollector
+from app.services.session_pool import close_session_pool
+
+
+def test_interactive_waiters_are_admitted_before_batch():
+    order = []
+
+    async def request(controller, name, priority, hold=0.0):
+        async with controller.admit(priority):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        metrics = MetricsCollector()
+        controller = AdmissionController(1, max_queue=8, metrics=metrics)
+        first = asyncio.ensure_future(request(controller, "first", "interactive", hold=0.05))
+        await asyncio.sleep(0)
+        queued = [asyncio.ensure_future(request(controller, name, priority)) for name, priority in
+                  [("batch-1", "batch"), ("batch-2", "batch"), ("ui-1", "interactive"), ("ui-2", "interactive")]]
+        await asyncio.sleep(0.01)
+        assert controller.stats()["queued"] == {"interactive": 2, "batch": 2}
+        await asyncio.gather(first, *queued)
+        assert controller.stats()["in_flight"] == 0
+        return metrics.get_admission_stats()
+
+    stats = asyncio.run(scenario())
+    assert order == ["first", "ui-1", "ui-2", "batch-1", "batch-2"]
+    assert stats["admitted"] == 5
+    batch = next(c for c in stats["classes"] if c["priority"] == "batch")
+    assert batch["max_wait_ms"] >= 40 and batch["p95_wait_ms"] == batch["max_wait_ms"]
+
+
+def test_full_queue_sheds_and_long_wait_times_out():
+    async def scenario():
+        metrics = MetricsCollector()
+        controller = AdmissionController(1, max_queue=2, max_wait=0.1, metrics=metrics)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire("batch"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(McpClientError) as exc:
+            await controller.acquire("batch")  # batch may use half the queue
+        assert exc.value.code == "queue_full"
+        interactive = asyncio.ensure_future(controller.acquire("interactive"))
+        await asyncio.sleep(0)
+        with pytest.raises(McpClientError) as exc:
+            await controller.acquire("interactive")
+        assert exc.value.code == "queue_full" and exc.value.detail["retry_after"] == 1
+
+        for task in (waiter, interactive):
+            with pytest.raises(McpClientError) as exc:
+                await task
+            assert exc.value.code == "queue_timeout"
+        assert controller.stats()["queue_depth"] == 0
+        controller.release()
+        assert controller.stats()["in_flight"] == 0
+        return metrics.get_admission_stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["admitted"], stats["rejected"], stats["timed_out"]) == (1, 2, 2)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(1, max_queue=4)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.stats()["queue_depth"] == 0
+        controller.release()
+        assert controller.stats()["in_flight"] == 0
+
+        disabled = AdmissionController(0)
+        async with disabled.admit("batch"):
+            assert disabled.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_busy_server_answers_503_and_reports_queue(stdio_env):
+    stdio_env(MCP_ADMISSION_MAX_CONCURRENT="1", MCP_ADMISSION_MAX_QUEUE="2")
+    reset_admission_controller()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                slow = asyncio.ensure_future(http.post("/mcp/actions/sleep", json={"params": {"seconds": 0.5}}))
+                await asyncio.sleep(0.1)
+                queued = asyncio.ensure_future(http.post("/mcp/actions:batch", json=[{"tool": "echo", "params": {"text": "b"}}]))
+                await asyncio.sleep(0.05)
+
+                metrics = (await http.get("/monitoring/metrics")).json()["admission"]
+                assert (metrics["in_flight"], metrics["queue_depth"]) == (1, 1)
+
+                r = await http.post("/mcp/actions/echo", json={"params": {"text": "x"}},
+                                    headers={"X-MCP-Priority": "batch"})
+                assert r.status_code == 503
+                assert r.json()["detail"]["code"] == "queue_full"
+                assert r.headers["retry-after"] == "1"
+
+                r = await http.post("/mcp/actions/echo", json={"params": {"text": "x"}},
+                                    headers={"X-MCP-Priority": "urgent"})
+                assert r.status_code == 422
+
+                assert (await slow).status_code == 200
+                assert (await queued).json()["succeeded"] == 1
+                return (await http.get("/monitoring/metrics")).json()["admission"]
+        finally:
+            await close_session_pool()
+            reset_admission_controller()
+
+    admission = asyncio.run(scenario())
+    assert admission["queue_depth"] == 0 and admission["rejected"] >= 1
+    batch = next(c for c in admission["classes"] if c["priority"] == "batch")
+    assert batch["admitted"] >= 1 and batch["max_wait_ms"] > 0
@@ -0,0 +1,96 @@
+import asyncio
+from collections import Counter
+
+from app.services.affinity import HashRing, affinity_key, parse_affinity_keys
+from conftest import Replica, replica_pool
+
+
+def _pool(replicas, **kwargs):
+    return replica_pool(replicas, min_size=3, max_size=3, affinity_keys={"read_file": "path"}, **kwargs)
+
+
+def test_ring_moves_only_the_keys_of_a_removed_member():
+    ring = HashRing()
+    for member in "0123":
+        ring.add(member)
+    keys = [f"/data/file-{i}.txt" for i in range(2000)]
+    before = {key: next(ring.walk(key)) for key in keys}
+    assert min(Counter(before.values()).values()) > 300  # roughly even with virtual nodes
+
+    ring.remove("2")
+    after = {key: next(ring.walk(key)) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved and all(before[key] == "2" for key in moved)
+
+    ring.add("2")
+    assert {key: next(ring.walk(key)) for key in keys} == before
+    assert sorted(ring.walk("any")) == ["0", "1", "2", "3"]
+
+
+def test_affinity_key_config():
+    keys = parse_affinity_keys(["read_file", "list_files", "grep:pattern", "unknown"])
+    assert keys == {"read_file": "path", "list_files": "directory", "grep": "pattern"}
+    assert affinity_key(keys, "read_file", {"path": "/a"}) == "/a"
+    assert affinity_key(keys, "read_file", {}) is None
+    assert affinity_key(keys, "echo", {"path": "/a"}) is None
+
+
+def test_same_path_sticks_to_one_replica():
+    replicas = [Replica(f"r{i}") for i in range(3)]
+
+    async def scenario():
+        pool = _pool(replicas)
+        await pool.start()
+        try:
+            for _ in range(5):
+                for i in range(30):
+                    await pool.call_tool("read_file", {"path": f"/data/{i}"})
+            return pool.stats()["affinity"]
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(scenario())
+    for i in range(30):
+        owners = [r for r in replicas if r.paths[f"/data/{i}"]]
+        assert len(owners) == 1 and owners[0].paths[f"/data/{i}"] == 5
+    assert all(r.calls for r in replicas)  # keys spread over the ring
+    assert stats == {"tools": ["read_file"], "ring_members": 3, "home": 150, "spilled": 0}
+
+
+def test_hot_key_spills_over_under_load():
+    replicas = [Replica(f"r{i}", delay=0.05) for i in range(3)]
+
+    async def scenario():
+        pool = _pool(replicas, max_inflight=8)
+        await pool.start()
+        try:
+            await asyncio.gather(*[pool.call_tool("read_file", {"path": "/hot"}) for _ in range(12)])
+            return pool.stats()["affinity"]
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(scenario())
+    served = sorted(r.paths["/hot"] for r in replicas)
+    assert sum(served) == 12 and served[-1] < 12 and served[-1] <= 6
+    assert stats["spilled"] > 0
+
+
+def test_respawned_replica_takes_over_the_slot():
+    replicas = [Replica(f"r{i}") for i in range(4)]
+
+    async def scenario():
+        pool = _pool(replicas)
+        await pool.start()
+        try:
+            home = (await pool.call_tool("read_file", {"path": "/k"}))["replica"]
+            next(r for r in replicas if r.name == home).alive = False
+            moved = (await pool.call_tool("read_file", {"path": "/k"}))["replica"]
+            await pool.start()  # replenish to min_size
+            back = (await pool.call_tool("read_file", {"path": "/k"}))["replica"]
+            return home, moved, back
+        finally:
+            await pool.close()
+
+    home, moved, back = asyncio.run(scenario())
+    assert moved != home
+    assert back == "r3"  # the replacement inherited the dead replica's slot
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app, create_app
+from app.services.mcp_client import McpClient, McpClientConfig
+from app.services.session_pool import close_session_pool
+from conftest import FAKE_SERVER
+
+
+def test_batch_endpoint_reports_each_item():
+    client = TestClient(app)
+    r = client.post("/mcp/actions:batch", json=[
+        {"tool": "echo", "params": {"n": 1}},
+        {"tool": "sum", "params": {"numbers": "oops"}},
+        {"tool": "missing"},
+        {"tool": "sum", "params": {"numbers": [1, 2]}},
+    ])
+    assert r.status_code == 200
+    body = r.json()
+    assert [item["tool"] for item in body["results"]] == ["echo", "sum", "missing", "sum"]
+    assert [item["success"] for item in body["results"]] == [True, False, False, True]
+    assert body["results"][0]["data"] == {"echo": {"n": 1}}
+    assert body["results"][1]["error"]["code"] == "validation_error"
+    assert body["results"][2]["error"]["code"] == "tool_not_found"
+    assert body["results"][3]["data"] == {"sum": 3.0}
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert all(isinstance(item["latency_ms"], int) for item in body["results"])
+
+
+def test_batch_endpoint_limits(monkeypatch):
+    monkeypatch.setenv("MCP_BATCH_MAX_ITEMS", "2")
+    client = TestClient(app)
+    r = client.post("/mcp/actions:batch", json=[{"tool": "echo"}] * 3)
+    assert r.status_code == 413
+    assert r.json()["detail"]["code"] == "batch_too_large"
+    assert client.post("/mcp/actions:batch?concurrency=0", json=[]).status_code == 422
+    assert client.post("/mcp/actions:batch", json=[]).json()["results"] == []
+
+
+def test_batch_items_overlap_across_pooled_sessions(stdio_env):
+    stdio_env(MCP_POOL_MAX_SIZE="2", MCP_POOL_MAX_INFLIGHT="4")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                items = [{"tool": "sleep", "params": {"seconds": 0.4, "text": str(i)}} for i in range(8)]
+                start = time.perf_counter()
+                r = await http.post("/mcp/actions:batch", json=items)
+                elapsed = time.perf_counter() - start
+                assert r.status_code == 200
+                assert [item["data"]["text"] for item in r.json()["results"]] == [str(i) for i in range(8)]
+                assert elapsed < 1.2  # serialized this would take 3.2s
+
+                # The cap bounds items in flight: 8 items, 2 at a time
+                start = time.perf_counter()
+                r = await http.post("/mcp/actions:batch?concurrency=2", json=items)
+                assert r.json()["succeeded"] == 8
+                assert time.perf_counter() - start >= 1.6
+        finally:
+            await close_session_pool()
+
+    asyncio.run(scenario())
+
+
+def test_sync_client_batch_is_pipelined_over_stdio():
+    client = McpClient(McpClientConfig(mode="stdio", exec_path=FAKE_SERVER, timeout_default=5))
+    try:
+        items = [{"tool": "sleep", "params": {"seconds": 0.4, "text": str(i)}} for i in range(6)]
+        items.append({"params": {}})
+        start = time.perf_counter()
+        results = client.call_tools_batch(items)
+        assert time.perf_counter() - start < 1.2
+        assert [r["data"]["text"] for r in results[:6]] == [str(i) for i in range(6)]
+        assert results[6]["success"] is False
+        assert results[6]["error"]["code"] == "validation_error"
+    finally:
+        client.close()
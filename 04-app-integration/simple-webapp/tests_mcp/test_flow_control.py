@@ -0,0 +1,147 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import create_app
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.flow_control import AdaptiveLimiter, CircuitBreaker
+from app.services.mcp_client import McpClientError
+from app.services.session_pool import SessionPool, close_session_pool
+from conftest import FAKE_SERVER
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_limiter_grows_under_load_and_backs_off_on_latency():
+    limiter = AdaptiveLimiter(4, min_limit=2, max_limit=6)
+    assert [limiter.try_acquire() for _ in range(5)] == [True] * 4 + [False]
+    assert limiter.rejected == 1
+
+    for _ in range(4):
+        limiter.release(0.010)  # saturated and fast: additive increase
+    assert limiter.limit == 6  # capped at max_limit
+
+    limiter.try_acquire()
+    limiter.release(0.010)  # one of six in use: no growth needed
+    assert limiter.limit == 6
+
+    limiter.try_acquire()
+    limiter.release(0.100)  # 10x the average latency
+    assert limiter.limit == 5
+    for _ in range(20):
+        limiter.try_acquire()
+        limiter.release(0.5, dropped=True)
+    assert limiter.limit == 2  # floored at min_limit
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_breaker_opens_fails_fast_and_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, open_seconds=5, clock=clock)
+    for failure in (False, True, False):
+        breaker.before_call()
+        breaker.record(failure)
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record(True)  # 2 of 4 failed
+    assert breaker.state == "open"
+
+    with pytest.raises(McpClientError) as exc:
+        breaker.before_call()
+    assert exc.value.code == "circuit_open" and exc.value.detail["retry_after"] == 5
+
+    clock.now += 5
+    breaker.before_call()  # the probe
+    assert breaker.state == "half_open"
+    with pytest.raises(McpClientError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record(True)
+    assert breaker.state == "open" and breaker.opened == 2
+
+    clock.now += 5
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == "closed"
+    assert breaker.stats() == {"state": "closed", "failure_rate": 0.0, "window_calls": 0,
+                               "opened": 2, "retry_after": None}
+
+
+def test_pool_trips_on_timeouts_and_recovers():
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), max_size=1,
+                           breaker=CircuitBreaker(min_calls=2, open_seconds=0.3))
+        await pool.start()
+        try:
+            # Tool errors say nothing about the server's health
+            for _ in range(3):
+                with pytest.raises(McpClientError):
+                    await pool.call_tool("missing", {})
+            assert pool.breaker.state == "closed"
+
+            for _ in range(2):
+                with pytest.raises(McpClientError) as exc:
+                    await pool.call_tool("sleep", {"seconds": 0.5}, timeout=0.05)
+                assert exc.value.code == "timeout"
+            with pytest.raises(McpClientError) as exc:
+                await pool.call_tool("echo", {"text": "fast fail"})
+            assert exc.value.code == "circuit_open"
+
+            await asyncio.sleep(0.35)
+            assert (await pool.call_tool("echo", {"text": "probe"}))["text"] == "probe"
+            assert pool.stats()["breaker"]["state"] == "closed"
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_rejects_calls_over_the_limit():
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), max_size=1, max_inflight=8,
+                           limiter=AdaptiveLimiter(2))
+        await pool.start()
+        try:
+            slow = [asyncio.ensure_future(pool.call_tool("sleep", {"seconds": 0.3})) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(McpClientError) as exc:
+                await pool.call_tool("echo", {"text": "one too many"})
+            assert exc.value.code == "overloaded"
+            await asyncio.gather(*slow)
+            assert (await pool.call_tool("echo", {"text": "room again"}))["text"] == "room again"
+            assert pool.stats()["limiter"]["rejected"] == 1
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_open_circuit_is_503_with_retry_after(stdio_env):
+    stdio_env(MCP_BREAKER_MIN_CALLS="2", MCP_BREAKER_OPEN_SECONDS="30")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                for _ in range(2):
+                    r = await http.post("/mcp/actions/crash", json={"params": {}})
+                    assert r.status_code == 400
+                r = await http.post("/mcp/actions/echo", json={"params": {"text": "hi"}})
+                assert r.status_code == 503
+                assert r.json()["detail"]["code"] == "circuit_open"
+                assert 1 <= int(r.headers["retry-after"]) <= 30
+
+                status = (await http.get("/monitoring/status")).json()
+                assert status["status"] == "degraded"
+                assert status["pool"]["breaker"]["state"] == "open"
+                assert status["pool"]["limiter"]["limit"] >= 1
+        finally:
+            await close_session_pool()
+
+    asyncio.run(scenario())
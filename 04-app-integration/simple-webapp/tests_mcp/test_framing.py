@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from app.services.framing import FrameTooLarge, LineFramer
+
+
+def _collect(framer):
+    return [bytes(f) for f in framer.frames()]
+
+
+def test_frames_split_across_chunks():
+    framer = LineFramer(max_message_bytes=1024, chunk_size=4)
+    stream = io.BytesIO(b'{"id":1}\n\r\n{"id":2}\r\n{"id"')
+    out = []
+    while framer.read_from(stream.readinto1):
+        out.extend(_collect(framer))
+    # blank lines are skipped, CRLF is tolerated, the partial frame is kept
+    assert out == [b'{"id":1}', b'{"id":2}']
+    assert framer.buffered == len(b'{"id"')
+    framer.append(b":3}\n")
+    assert _collect(framer) == [b'{"id":3}']
+
+
+def test_oversized_frame_is_skipped_and_framer_resyncs():
+    framer = LineFramer(max_message_bytes=64, chunk_size=16)
+    framer.append(b'{"jsonrpc": "2.0", "id": 42, "result": "' + b"x" * 100)
+    with pytest.raises(FrameTooLarge) as exc:
+        _collect(framer)
+    assert exc.value.request_id == 42
+    assert exc.value.limit == 64
+    assert framer.buffered == 0  # not kept while the rest is discarded
+
+    framer.append(b"y" * 200 + b'"}\n{"id":43}\n')
+    assert _collect(framer) == [b'{"id":43}']
+
+
+def test_complete_oversized_frame_and_unknown_id():
+    framer = LineFramer(max_message_bytes=8, chunk_size=64)
+    framer.append(b'{"method":"x","params":{"id":1}}\n{"id":2}\n')
+    frames, errors = [], []
+    framer.drain(lambda f: frames.append(bytes(f)), errors.append)
+    assert frames == [b'{"id":2}']
+    assert len(errors) == 1 and errors[0].request_id is None
+
+
+def test_buffer_shrinks_after_large_frame():
+    framer = LineFramer(max_message_bytes=1 << 20, chunk_size=1024)
+    big = b"z" * 200_000
+    stream = io.BytesIO(big + b"\n" + b"small\n")
+    sizes = []
+    while framer.read_from(stream.readinto1):
+        sizes.extend(len(f) for f in framer.frames())
+    assert sizes == [200_000, 5]
+    assert framer.capacity == 1024
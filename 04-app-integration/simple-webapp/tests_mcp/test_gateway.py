@@ -0,0 +1,129 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.main import create_app
+from app.services.gateway import Gateway, load_profiles
+from app.services.health_checker import HealthChecker
+from app.services.mcp_client import McpClientConfig, McpClientError
+from app.services.session_pool import close_session_pool
+from conftest import FAKE_SERVER
+
+
+def _profile(name, *tools, **extra):
+    args = [arg for tool in tools for arg in ("--tool", tool)]
+    return {"name": name, "type": "stdio", "exec_path": FAKE_SERVER, "args": args,
+            "env": {"FAKE_MCP_NAME": name}, **extra}
+
+
+@pytest.fixture
+def profiles_file(tmp_path):
+    path = tmp_path / "server_profiles.json"
+    path.write_text(json.dumps({"profiles": [
+        _profile("alpha", "whoami", "alpha_only"),
+        _profile("beta", "whoami"),
+        _profile("gamma", "whoami", enabled=False),
+    ]}))
+    return str(path)
+
+
+def test_index_routes_unique_names_and_namespaces_conflicts(profiles_file):
+    config = McpClientConfig(server_profiles=profiles_file, pool_min_size=1)
+
+    async def scenario():
+        gateway = Gateway.from_config(config)
+        assert list(gateway.pools) == ["alpha", "beta"]  # gamma is disabled
+        await gateway.start()
+        try:
+            tools = await gateway.refresh_tools()
+            names = {t["name"]: t["server"] for t in tools}
+            assert names["alpha_only"] == "alpha"
+            assert names["alpha.whoami"] == "alpha" and names["beta.whoami"] == "beta"
+            assert "whoami" not in names and "echo" not in names
+
+            assert await gateway.call_tool("alpha_only", {}) == {"text": "alpha"}
+            assert await gateway.call_tool("beta.whoami", {}) == {"text": "beta"}
+            assert await gateway.call_tool("alpha.alpha_only", {}) == {"text": "alpha"}
+            with pytest.raises(McpClientError) as exc:
+                await gateway.call_tool("whoami", {})
+            assert exc.value.code == "tool_not_found"
+            assert exc.value.detail["candidates"] == ["alpha.whoami", "beta.whoami"]
+
+            stats = gateway.stats()
+            assert stats["indexed_servers"] == ["alpha", "beta"] and "whoami" in stats["conflicts"]
+        finally:
+            await gateway.close()
+
+    asyncio.run(scenario())
+
+
+def test_down_server_is_skipped_and_new_tools_are_routed(tmp_path, monkeypatch):
+    path = tmp_path / "server_profiles.json"
+    path.write_text(json.dumps({"profiles": [
+        _profile("alpha", "alpha_only"),
+        {"name": "broken", "type": "stdio", "exec_path": "/nonexistent/mcp-server"},
+    ]}))
+    monkeypatch.setenv("MCP_SERVER_PROFILES", str(path))
+    monkeypatch.setenv("MCP_RECONNECT_BACKOFF_INITIAL", "30")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                tools = (await http.get("/mcp/tools")).json()["tools"]
+                assert {t["server"] for t in tools} == {"alpha"}
+                assert "echo" in {t["name"] for t in tools}
+
+                r = await http.post("/mcp/actions/add_tool", json={"params": {"name": "fresh"}})
+                assert r.status_code == 200
+                r = await http.post("/mcp/actions/fresh", json={"params": {}})
+                assert r.status_code == 200 and r.json()["data"] == {"text": "alpha"}
+
+                r = await http.post("/mcp/actions/missing", json={"params": {}})
+                assert r.status_code == 404
+
+                status = (await http.get("/monitoring/status")).json()
+                assert set(status["pool"]["servers"]) == {"alpha", "broken"}
+                assert status["pool"]["indexed_servers"] == ["alpha"]
+        finally:
+            await close_session_pool()
+
+    asyncio.run(scenario())
+
+
+def test_health_checker_tracks_every_profile(tmp_path, monkeypatch):
+    path = tmp_path / "server_profiles.json"
+    path.write_text(json.dumps({"profiles": [
+        _profile("alpha"),
+        {"name": "broken", "type": "stdio", "exec_path": "/nonexistent/mcp-server"},
+    ]}))
+    monkeypatch.setenv("MCP_SERVER_PROFILES", str(path))
+
+    checker = HealthChecker()
+    checker._check_health()
+    health = {h["server_name"]: h for h in checker.get_all_health_status()}
+    assert health["alpha"]["status"] == "ok"
+    assert health["alpha"]["server_info"]["server_info"]["serverInfo"]["name"] == "alpha"
+    assert health["broken"]["status"] == "degraded"
+
+
+@pytest.mark.parametrize("profiles", [
+    [{"name": "a", "type": "stdio"}, {"name": "a", "type": "ws"}],
+    [{"name": "a.b", "type": "stdio"}],
+    [{"name": "a", "type": "grpc"}],
+])
+def test_invalid_profiles_are_rejected(tmp_path, profiles):
+    path = tmp_path / "server_profiles.json"
+    path.write_text(json.dumps({"profiles": profiles}))
+    with pytest.raises(McpClientError) as exc:
+        load_profiles(str(path))
+    assert exc.value.code == "config_error"
+
+
+def test_repo_profiles_file_loads():
+    path = Path(__file__).resolve().parents[3] / "03-discover-servers" / "configs" / "server_profiles.json"
+    profiles = load_profiles(str(path))
+    assert [(p.name, p.type) for p in profiles] == [("sample-stdio", "stdio"), ("sample-ws", "ws")]
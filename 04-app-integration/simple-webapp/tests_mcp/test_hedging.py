@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.metrics_collector import MetricsCollector
+from conftest import Replica, replica_pool
+
+
+def _pool(replicas, budget=1.0, samples=20, **kwargs):
+    metrics = MetricsCollector()
+    for _ in range(samples):
+        metrics.record_call("read_file", 20)
+    options = dict(idempotent_tools={"read_file"}, metrics=metrics, hedge_percentile=95, hedge_budget=budget)
+    options.update(kwargs)
+    return replica_pool(replicas, **options), metrics
+
+
+def test_slow_replica_is_hedged_and_loser_cancelled():
+    slow, fast = Replica("slow", 2.0), Replica("fast", 0.01)
+
+    async def scenario():
+        pool, metrics = _pool([slow, fast])
+        await pool.start()
+        try:
+            start = time.perf_counter()
+            assert await pool.call_tool("read_file", {"path": "a"}) == {"replica": "fast"}
+            assert time.perf_counter() - start < 0.5
+            await asyncio.sleep(0.01)
+            assert slow.cancelled == 1
+            assert pool.stats()["in_flight"] == 0
+            return metrics.get_hedging_stats()
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(scenario())
+    assert (stats["eligible"], stats["hedged"], stats["won"]) == (1, 1, 1)
+    assert stats["hedge_rate"] == 1.0 and stats["win_rate"] == 1.0
+
+
+def test_primary_answer_wins_when_hedge_fails():
+    slowish, broken = Replica("slowish", 0.1), Replica("broken", 0.0, fail=True)
+
+    async def scenario():
+        pool, metrics = _pool([slowish, broken])
+        await pool.start()
+        try:
+            assert await pool.call_tool("read_file", {}) == {"replica": "slowish"}
+            assert metrics.get_hedging_stats()["won"] == 0
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+    assert broken.calls == 1
+
+
+@pytest.mark.parametrize("tool, budget, samples", [
+    ("read_file", 0.0, 20),   # budget exhausted
+    ("write_file", 1.0, 20),  # not idempotent
+    ("read_file", 1.0, 5),    # too little latency history
+])
+def test_calls_that_are_not_hedged(tool, budget, samples):
+    slow, fast = Replica("slow", 0.15), Replica("fast", 0.0)
+
+    async def scenario():
+        pool, metrics = _pool([slow, fast], budget=budget, samples=samples)
+        if tool != "read_file":
+            for _ in range(samples):
+                metrics.record_call(tool, 20)
+        await pool.start()
+        try:
+            assert await pool.call_tool(tool, {}) == {"replica": "slow"}
+            return metrics.get_hedging_stats()["hedged"]
+        finally:
+            await pool.close()
+
+    assert asyncio.run(scenario()) == 0
+    assert fast.calls == 0
+
+
+def test_pool_records_calls_for_latency_history():
+    async def scenario():
+        pool, metrics = _pool([Replica("only", 0.0)], samples=0, hedge_percentile=0)
+        await pool.start()
+        try:
+            for _ in range(3):
+                await pool.call_tool("read_file", {})
+            return metrics
+        finally:
+            await pool.close()
+
+    metrics = asyncio.run(scenario())
+    assert metrics.get_tool_stats("read_file")["total_calls"] == 3
+    assert metrics.get_latency_percentile("read_file", 50, min_samples=3) is not None
+    assert metrics.get_latency_percentile("read_file", 50) is None  # below min_samples
+
+
+def test_latency_percentile_nearest_rank():
+    metrics = MetricsCollector()
+    for latency in range(1, 101):
+        metrics.record_call("t", latency)
+    assert metrics.get_latency_percentile("t", 50) == 50
+    assert metrics.get_latency_percentile("t", 95) == 95
+    assert metrics.get_latency_percentile("t", 100) == 100
+    assert metrics.get_latency_percentile("missing", 95) is None
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("uvicorn")
+
+import http_mcp_server  # noqa: E402
+from app.services.http_transport import AsyncHttpSession  # noqa: E402
+from app.services.mcp_client import McpClient, McpClientConfig, McpClientError  # noqa: E402
+from app.services.session_pool import SessionPool  # noqa: E402
+
+
+def _config(url: str, **kwargs) -> McpClientConfig:
+    options = dict(mode="http", server_uri=url, timeout_default=5,
+                   pool_min_size=1, pool_max_size=1, pool_acquire_timeout=2)
+    options.update(kwargs)
+    return McpClientConfig(**options)
+
+
+@pytest.fixture(params=[False, True], ids=["sse", "json"])
+def server_url(request):
+    with http_mcp_server.serve_in_thread(json_response=request.param) as url:
+        yield url
+
+
+def test_requests_share_one_http_session(server_url):
+    async def scenario():
+        pool = SessionPool.from_config(_config(server_url))
+        await pool.start()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                pool.call_tool("sleep", {"seconds": 0.5, "text": str(i)}) for i in range(5)
+            ])
+            assert [r["text"] for r in results] == [str(i) for i in range(5)]
+            assert time.perf_counter() - start < 1.5
+            tools = await pool.list_tools()
+            assert {"echo", "sleep", "notify"} <= {t["name"] for t in tools}
+            stats = pool.stats()
+            assert stats["spawned"] == 1 and stats["discarded"] == 0
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_id_is_reused(server_url):
+    async def scenario():
+        session = await AsyncHttpSession.open(server_url, timeout=5)
+        try:
+            session_id = session.session_id
+            assert session_id
+            for i in range(3):
+                assert (await session.call_tool("echo", {"text": str(i)}))["text"] == str(i)
+            assert session.session_id == session_id
+        finally:
+            await session.close()
+        assert not session.is_alive()
+
+    asyncio.run(scenario())
+
+
+
+def test_oversized_reply_fails_only_its_request(server_url):
+    async def scenario():
+        session = await AsyncHttpSession.open(server_url, timeout=5, max_message_bytes=4096)
+        try:
+            with pytest.raises(McpClientError) as exc:
+                await session.call_tool("echo", {"text": "x" * 10000})
+            assert exc.value.code == "message_too_large" and exc.value.detail["limit"] == 4096
+            assert session.is_alive() and session.in_flight == 0
+            assert (await session.call_tool("echo", {"text": "after"}))["text"] == "after"
+        finally:
+            await session.close()
+
+    asyncio.run(scenario())
+
+def test_stream_notifications_arrive_before_result():
+    async def scenario(url):
+        session = await AsyncHttpSession.open(url, timeout=5)
+        seen = []
+        session.add_notification_handler(lambda m: seen.append(m["method"]))
+        try:
+            data = await session.call_tool("notify", {"text": "partial"})
+            # Delivered on the same SSE stream, ahead of the response
+            assert data == {"text": "notified"}
+            assert seen == ["notifications/message"]
+        finally:
+            await session.close()
+
+    with http_mcp_server.serve_in_thread() as url:
+        asyncio.run(scenario(url))
+
+
+def test_timeout_abandons_request_and_keeps_session():
+    async def scenario(url):
+        session = await AsyncHttpSession.open(url, timeout=5)
+        try:
+            with pytest.raises(McpClientError) as exc:
+                await session.call_tool("sleep", {"seconds": 2}, timeout=0.2)
+            assert exc.value.code == "timeout"
+            assert session.in_flight == 0
+            assert session.is_alive()
+            assert (await session.call_tool("echo", {"text": "after"}))["text"] == "after"
+        finally:
+            await session.close()
+
+    with http_mcp_server.serve_in_thread() as url:
+        asyncio.run(scenario(url))
+
+
+def test_unreachable_server_is_connection_error():
+    async def scenario():
+        pool = SessionPool.from_config(_config("http://127.0.0.1:9/mcp", pool_acquire_timeout=0.2,
+                                               reconnect_backoff_initial=1))
+        try:
+            with pytest.raises(McpClientError) as exc:
+                await pool.call_tool("echo", {})
+            assert exc.value.code in ("initialization_error", "connection_error")
+            assert pool.stats()["connect_failures"] == 1
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_sync_client_http_mode():
+    with http_mcp_server.serve_in_thread() as url:
+        client = McpClient(_config(url))
+        try:
+            data, _ = client.call_tool("echo", {"text": "over http"})
+            assert data == {"text": "over http"}
+            health = client.health()
+            assert health["status"] == "ok" and health["server_type"] == "http"
+        finally:
+            client.close()
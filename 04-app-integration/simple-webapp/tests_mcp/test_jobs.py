@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import create_app
+from app.services.jobs import JobManager, close_job_manager
+from app.services.mcp_client import McpClientError
+from app.services.metrics_collector import MetricsCollector
+from app.services.session_pool import close_session_pool
+
+
+class _StubClient:
+    async def call_tool(self, tool, params):
+        if tool == "boom":
+            raise McpClientError("tool_error", "boom")
+        await asyncio.sleep(params.get("seconds", 0))
+        return {"text": "x" * params.get("size", 1)}, 1
+
+
+def test_manager_bounds_queue_and_result_store():
+    metrics = MetricsCollector()
+
+    async def scenario():
+        client = _StubClient()
+        manager = JobManager(lambda: client, workers=1, max_queue=2, ttl=60, max_bytes=100, metrics=metrics)
+        try:
+            slow = manager.submit("slow", {"seconds": 0.2})
+            await asyncio.sleep(0.02)  # the only worker is busy with it
+            queued = [manager.submit("fast", {"size": 35}), manager.submit("fast", {"size": 35})]
+            with pytest.raises(McpClientError) as full:
+                manager.submit("fast", {})
+            depth = manager.stats()["queue_depth"]
+
+            polled = (await manager.wait(slow.id, 0.01)).status
+            assert (await manager.wait(slow.id, 5)).status == "succeeded"
+            for job in queued:
+                await manager.wait(job.id, 5)
+            # 12 + 46 + 46 result bytes do not fit in 100: the oldest went first
+            with pytest.raises(McpClientError) as evicted:
+                manager.get(slow.id)
+
+            failed = await manager.wait(manager.submit("boom", {}).id, 5)
+            too_large = await manager.wait(manager.submit("fast", {"size": 200}).id, 5)
+            stats = manager.stats()
+            manager.ttl = 0
+            with pytest.raises(McpClientError):
+                manager.get(queued[0].id)
+            return full.value, depth, polled, evicted.value, failed, too_large, stats, manager.stats()
+        finally:
+            await manager.close()
+
+    full, depth, polled, evicted, failed, too_large, stats, expired = asyncio.run(scenario())
+    assert full.code == "queue_full" and full.detail["max_queue"] == 2
+    assert depth == 2 and polled == "running"
+    assert evicted.code == "job_not_found"
+    assert failed.status == "failed" and failed.error["code"] == "tool_error"
+    assert too_large.status == "failed" and too_large.error["code"] == "result_too_large"
+    assert stats["evicted"] == 1 and stats["stored_bytes"] <= 100
+    assert expired["jobs"] == {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+    assert expired["stored_bytes"] == 0
+
+    job_stats = metrics.get_job_stats()
+    assert (job_stats["succeeded"], job_stats["failed"], job_stats["rejected"]) == (3, 2, 1)
+    # asyncio.sleep may wake a little before perf_counter says 0.2 s have passed
+    assert job_stats["run_ms"]["max"] >= 190 and job_stats["queue_ms"]["max"] >= 150
+
+
+def test_jobs_endpoints_long_poll_against_pooled_sessions(stdio_env):
+    stdio_env()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                submitted = await http.post("/mcp/jobs", json={"tool": "sleep", "params": {"seconds": 0.3}})
+                location = submitted.headers["location"]
+                pending = await http.get(location)
+                done = await http.get(location, params={"wait": 10})
+                missing_tool = await http.post("/mcp/jobs", json={"tool": "missing"})
+                failed = await http.get(missing_tool.headers["location"], params={"wait": 10})
+                unknown = await http.get("/mcp/jobs/nope")
+                metrics = (await http.get("/monitoring/metrics")).json()["jobs"]
+                return submitted, pending, done, failed, unknown, metrics
+        finally:
+            await close_job_manager()
+            await close_session_pool()
+
+    submitted, pending, done, failed, unknown, metrics = asyncio.run(scenario())
+    assert submitted.status_code == 202 and submitted.json()["status"] == "queued"
+    assert submitted.headers["location"] == f"/mcp/jobs/{submitted.json()['id']}"
+    assert pending.json()["status"] in ("queued", "running") and pending.json()["data"] is None
+    body = done.json()
+    assert body["status"] == "succeeded" and body["data"] == {"text": "done"}
+    assert body["latency_ms"] >= 250 and body["finished_at"] is not None
+    assert failed.json()["status"] == "failed" and failed.json()["error"]["code"]
+    assert unknown.status_code == 404 and unknown.json()["detail"]["code"] == "job_not_found"
+    assert metrics["queue_depth"] == 0 and metrics["jobs"]["succeeded"] == 1
+    assert metrics["succeeded"] >= 1 and metrics["run_ms"]["max"] >= 250
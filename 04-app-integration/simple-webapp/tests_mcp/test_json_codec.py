@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import json_codec
+
+MESSAGE = {
+    "jsonrpc": "2.0",
+    "id": 7,
+    "result": {"content": [{"type": "text", "text": "héllo\nwörld ✓ " + "x" * 1000}], "isError": False},
+}
+
+
+def _available(name):
+    if name != "json":
+        pytest.importorskip(name)
+    return json_codec.load_codec(name)
+
+
+@pytest.mark.parametrize("name", json_codec.BACKENDS)
+def test_roundtrip_is_bytes_and_compact(name):
+    codec = _available(name)
+    assert codec.name == name
+    encoded = codec.dumps(MESSAGE)
+    assert isinstance(encoded, bytes)
+    assert b"\n" not in encoded  # safe as one newline-delimited frame
+    assert codec.loads(encoded) == MESSAGE
+    assert codec.loads(encoded.decode("utf-8")) == MESSAGE
+    assert codec.loads(memoryview(encoded)[:]) == MESSAGE  # framer hands out views
+    # Interchangeable with the stdlib on the wire
+    assert json.loads(encoded) == MESSAGE
+
+
+@pytest.mark.parametrize("name", json_codec.BACKENDS)
+def test_invalid_input_raises_value_error(name):
+    codec = _available(name)
+    with pytest.raises(ValueError):
+        codec.loads(b'{"jsonrpc": "2.0", "id": ')
+    with pytest.raises(ValueError):
+        codec.loads(b"\xff\xfe")
+
+
+def test_unknown_or_missing_backend(monkeypatch):
+    with pytest.raises(ValueError):
+        json_codec.load_codec("yaml")
+
+    def missing():
+        raise ImportError("not installed")
+
+    monkeypatch.setitem(json_codec._FACTORIES, "orjson", missing)
+    monkeypatch.setitem(json_codec._FACTORIES, "msgspec", missing)
+    assert json_codec.load_codec("orjson").name == "json"
+    assert json_codec.load_codec("auto").name == "json"
+
+
+def test_action_response_rendered_by_codec():
+    client = TestClient(app)
+    r = client.post("/mcp/actions/echo", json={"params": {"text": "héllo"}})
+    assert r.status_code == 200
+    assert r.content == json_codec.dumps(r.json())
+    assert r.json()["data"] == {"echo": {"text": "héllo"}}
+    assert r.json()["success"] is True
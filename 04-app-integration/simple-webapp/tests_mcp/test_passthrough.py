@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app, create_app
+from app.services.async_mcp_client import AsyncRpcSession
+from app.services.passthrough import RawJson, split_response
+from app.services.session_pool import close_session_pool
+
+
+def test_split_response_only_touches_raw_ids():
+    result = b'{"content": [{"type": "text", "text": "' + b"y" * 100000 + b'"}], "isError": false}'
+    frame = memoryview(b'{"jsonrpc": "2.0", "id": 7, "result": ' + result + b' }\n')
+    message = split_response(frame, {7})
+    assert message["id"] == 7 and isinstance(message["result"], RawJson) and message["result"].data == result
+
+    assert split_response(b'{"jsonrpc": "2.0", "id": 8, "result": {}}', {7}) is None
+    assert split_response(b'{"jsonrpc": "2.0", "method": "notifications/progress", "params": {}}', {7}) is None
+    assert split_response(b'{"jsonrpc": "2.0", "id": 7, "error": {"code": -32602, "message": "bad"}}', {7}) is None
+    assert split_response(b'{"result": {}, "jsonrpc": "2.0", "id": 7}', {7}) is None  # needs a real parse
+
+
+def test_reordered_reply_is_still_passed_through_whole():
+    class Session(AsyncRpcSession):
+        def _transport_alive(self):
+            return True
+
+        async def _send(self, message):
+            reply = {"result": {"content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]},
+                     "id": message["id"], "jsonrpc": "2.0"}
+            asyncio.get_running_loop().call_soon(self._on_frame, json.dumps(reply).encode())
+
+    async def scenario():
+        session = Session()
+        return await session.call_tool("any", {}, raw=True), session._raw
+
+    result, raw_ids = asyncio.run(scenario())
+    assert isinstance(result, RawJson) and json.loads(result.data)["content"][1]["text"] == "b"
+    assert raw_ids == set()
+
+
+def test_passthrough_keeps_every_content_item(stdio_env):
+    stdio_env()
+    params = {"params": {"text": "hi", "image": "aGk="}}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                raw, decoded = await asyncio.gather(
+                    http.post("/mcp/actions/echo?passthrough=true", json=params),
+                    http.post("/mcp/actions/echo", json=params),
+                )
+                missing = await http.post("/mcp/actions/missing?passthrough=true", json={"params": {}})
+                return raw, decoded, missing
+        finally:
+            await close_session_pool()
+
+    raw, decoded, missing = asyncio.run(scenario())
+    assert raw.status_code == 200 and raw.headers["content-type"] == "application/json"
+    body = raw.json()
+    assert body["tool"] == "echo" and body["success"] is True and isinstance(body["latency_ms"], int)
+    assert body["data"] == {"content": [{"type": "text", "text": "hi"},
+                                        {"type": "image", "data": "aGk=", "mimeType": "image/png"}],
+                            "isError": False}
+    assert decoded.json()["data"] == {"text": "hi"}  # the default shape is unchanged
+    assert missing.status_code == 400 and missing.json()["detail"]["code"] == "-32602"
+
+
+def test_passthrough_in_mock_mode():
+    r = TestClient(app).post("/mcp/actions/echo?passthrough=true", json={"params": {"message": "hi"}})
+    assert r.status_code == 200
+    assert r.json()["data"]["echo"] == {"message": "hi"}
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+
+from app.main import create_app
+from app.routers import mcp as mcp_router
+from app.services import json_codec
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.session_pool import close_session_pool
+from conftest import FAKE_SERVER
+
+
+def _events(body):
+    """SSE body -> [(event, data)]; comments come back as (":", text)."""
+    events = []
+    for block in body.decode().split("\n\n"):
+        if block.startswith(":"):
+            events.append((":", block[1:].strip()))
+        elif block:
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((fields["event"], json_codec.loads(fields["data"])))
+    return events
+
+
+def test_session_routes_progress_by_token():
+    async def scenario():
+        session = await AsyncStdioSession.open(FAKE_SERVER, 5)
+        try:
+            seen, other = [], []
+            result, _ = await asyncio.gather(
+                session.call_tool("sleep", {"seconds": 0.1, "steps": 2}, progress=seen.append),
+                session.call_tool("sleep", {"seconds": 0.1, "steps": 3}, progress=other.append),
+            )
+            plain = await session.call_tool("sleep", {"seconds": 0.01, "steps": 2})  # no token, no progress
+            return result, plain, seen, other, session._progress
+        finally:
+            await session.close()
+
+    result, plain, seen, other, subscribers = asyncio.run(scenario())
+    assert result == plain == {"text": "done"}
+    assert [p["progress"] for p in seen] == [1, 2] and seen[-1]["total"] == 2
+    assert [p["progress"] for p in other] == [1, 2, 3]
+    assert seen[0]["progressToken"] != other[0]["progressToken"]
+    assert subscribers == {}
+
+
+def test_events_endpoint_streams_progress_then_result(monkeypatch, stdio_env):
+    stdio_env()
+    monkeypatch.setattr(mcp_router, "SSE_HEARTBEAT_SECONDS", 0.05)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                progress = await http.post("/mcp/actions/sleep:events",
+                                           json={"params": {"seconds": 0.3, "steps": 3}})
+                silent = await http.post("/mcp/actions/sleep:events", json={"params": {"seconds": 0.3}})
+                missing = await http.post("/mcp/actions/missing:events", json={"params": {}})
+                return progress, silent, missing
+        finally:
+            await close_session_pool()
+
+    progress, silent, missing = asyncio.run(scenario())
+    assert progress.status_code == 200
+    assert progress.headers["content-type"].startswith("text/event-stream")
+    events = [e for e in _events(progress.content) if e[0] != ":"]
+    assert events[:3] == [("progress", {"progress": step, "total": 3, "message": f"step {step}"})
+                          for step in (1, 2, 3)]
+    assert events[3][0] == "result" and events[3][1]["data"] == {"text": "done"}
+
+    # a tool that reports nothing still shows signs of life
+    events = _events(silent.content)
+    assert events[0] == (":", "keep-alive") and events[-1][0] == "result"
+
+    assert missing.status_code == 400  # failed before the first event: a plain error response
+    assert "code" in missing.json()["detail"]
@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.mcp_client import McpClientError
+from app.services.resource_cache import ResourceCache
+from app.services.session_pool import SessionPool, close_session_pool, get_session_pool
+from conftest import FAKE_SERVER, until
+
+
+async def _fake(method, **params):
+    async with get_session_pool().session() as s:
+        return await s.request(f"fake/{method}", params)
+
+
+def test_static_resource_is_cached_until_the_server_notifies_an_update(stdio_env):
+    stdio_env(MCP_POOL_MAX_SIZE="1")  # one fake server process holds the resources
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                def read(uri):
+                    return http.get("/mcp/resources/read", params={"uri": uri})
+
+                listing = (await http.get("/mcp/resources")).json()
+                first, second = (await read("echo://static")).json(), (await read("echo://static")).json()
+                cached_reads = (await _fake("reads"))["echo://static"]
+
+                await _fake("set_resource", uri="echo://static", text="changed")
+
+                async def updated():
+                    return (await read("echo://static")).json()["contents"][0]["text"] == "changed"
+
+                await until(updated)
+                after = (await read("echo://static")).json()
+                await read("echo://hi")
+                templated = (await read("echo://hi")).json()
+                missing = await read("file://nope")
+                metrics = (await http.get("/monitoring/metrics")).json()
+                return listing, first, second, cached_reads, after, templated, await _fake("reads"), missing, metrics
+        finally:
+            await close_session_pool()
+
+    listing, first, second, cached_reads, after, templated, reads, missing, metrics = asyncio.run(scenario())
+    assert listing["resources"][0]["uri"] == "echo://static"
+    assert listing["resourceTemplates"][0]["uriTemplate"] == "echo://{text}"
+    assert first["contents"] == second["contents"] and first["contents"][0]["text"] == "Echo!"
+    assert cached_reads == 1
+    assert after["contents"][0]["text"] == "changed"
+    assert templated["contents"][0]["text"] == "Echo: hi" and reads["echo://hi"] == 2  # never cached
+    assert missing.status_code == 404 and missing.json()["detail"]["code"] == "resource_not_found"
+    counters = next(t for t in metrics["cache"]["tools"] if t["name"] == "resources/read")
+    assert counters["hits"] >= 1
+
+
+def test_without_subscribe_resources_are_cached_for_the_ttl(stdio_env):
+    stdio_env(exec_path=f"{FAKE_SERVER} --no-subscribe", MCP_RESOURCE_CACHE_TTL="0.3", MCP_POOL_MAX_SIZE="1")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                for _ in range(3):
+                    await http.get("/mcp/resources/read", params={"uri": "echo://static"})
+                cached = (await _fake("reads"))["echo://static"]
+                await asyncio.sleep(0.4)
+                await http.get("/mcp/resources/read", params={"uri": "echo://static"})
+                return cached, (await _fake("reads"))["echo://static"]
+        finally:
+            await close_session_pool()
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_concurrent_first_reads_subscribe_once(monkeypatch):
+    subscribers = []
+    subscribe = AsyncStdioSession.subscribe_resource
+
+    async def slow_subscribe(self, uri):
+        subscribers.append(self)
+        await asyncio.sleep(0.1)  # the other reads arrive meanwhile
+        await subscribe(self, uri)
+
+    monkeypatch.setattr(AsyncStdioSession, "subscribe_resource", slow_subscribe)
+
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=2, max_size=2)
+        try:
+            await pool.start()
+            results = await asyncio.gather(*(pool.read_resource("echo://static") for _ in range(4)))
+            return results, dict(pool._subscriptions), pool.resource_cache.stats()["entries"]
+        finally:
+            await pool.close()
+
+    results, subscriptions, entries = asyncio.run(scenario())
+    assert all(r["contents"][0]["text"] == "Echo!" for r in results)
+    assert len(subscribers) == 1 and subscriptions == {"echo://static": subscribers[0]}
+    assert entries == 1
+
+
+
+def test_failed_subscribe_reads_through_with_the_ttl(monkeypatch):
+    async def rejecting_subscribe(self, uri):
+        raise McpClientError("-32602", f"Cannot subscribe to {uri}")
+
+    monkeypatch.setattr(AsyncStdioSession, "subscribe_resource", rejecting_subscribe)
+
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=1, max_size=1,
+                           resource_cache=ResourceCache(ttl=30))
+        try:
+            await pool.start()
+            results = [await pool.read_resource("echo://static") for _ in range(2)]
+            return results, dict(pool._subscriptions), pool.resource_cache.stats()["entries"]
+        finally:
+            await pool.close()
+
+    results, subscriptions, entries = asyncio.run(scenario())
+    assert all(r["contents"][0]["text"] == "Echo!" for r in results)
+    assert subscriptions == {} and entries == 1
+
+def test_prompts_are_listed_and_rendered(stdio_env):
+    stdio_env(MCP_POOL_MAX_SIZE="1")
+    with TestClient(create_app()) as client:
+        prompts = client.get("/mcp/prompts").json()["prompts"]
+        rendered = client.post("/mcp/prompts/echo", json={"arguments": {"text": "hello"}})
+        unknown = client.post("/mcp/prompts/missing", json={"arguments": {}})
+
+    assert [p["name"] for p in prompts] == ["echo"]
+    body = rendered.json()
+    assert body["name"] == "echo" and body["messages"][0]["content"]["text"] == "hello"
+    assert "latency_ms" in body
+    assert unknown.status_code == 404 and unknown.json()["detail"]["code"] == "prompt_not_found"
@@ -0,0 +1,146 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.async_mcp_client import AsyncMcpClient
+from app.services.mcp_client import McpClient, McpClientConfig, McpClientError
+from app.services.metrics_collector import MetricsCollector
+from app.services.result_cache import ResultCache
+
+
+class CountingAdapter:
+    """Async adapter that reads files locally and counts round trips."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, params, timeout=None):
+        self.calls.append(name)
+        if name == "read_file":
+            with open(params["path"], encoding="utf-8") as f:
+                return {"text": f.read()}
+        if name == "echo":
+            return {"echo": params}
+        raise McpClientError("tool_not_found", f"Unknown tool: {name}")
+
+
+def _client(cache_tools, max_bytes=1024 * 1024):
+    metrics = MetricsCollector()
+    config = McpClientConfig(cache_tools=cache_tools)
+    adapter = CountingAdapter()
+    client = AsyncMcpClient(config, pool=adapter, cache=ResultCache(max_bytes, metrics=metrics))
+    return client, adapter, metrics
+
+
+def test_file_results_are_validated_by_mtime_and_size(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    target = tmp_path / "hot.txt"
+    target.write_text("v1", encoding="utf-8")
+    client, adapter, metrics = _client({"read_file": 60})
+
+    async def read(path):
+        data, _ = await client.call_tool("read_file", {"path": path})
+        return data["text"]
+
+    async def scenario():
+        assert await read("hot.txt") == "v1"
+        assert await read("./hot.txt") == "v1"  # same canonical path
+        assert await read(str(target)) == "v1"
+        assert len(adapter.calls) == 1
+
+        target.write_text("v2 longer", encoding="utf-8")
+        assert await read("hot.txt") == "v2 longer"
+
+        # Same size, new mtime
+        target.write_text("v3 longer", encoding="utf-8")
+        stat = target.stat()
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert await read("hot.txt") == "v3 longer"
+        assert len(adapter.calls) == 3
+
+    asyncio.run(scenario())
+    stats = metrics.get_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+    assert stats["tools"] == [{"name": "read_file", "hits": 2, "misses": 3, "evictions": 0}]
+
+
+def test_caching_is_opt_in_and_skips_errors_and_missing_files(tmp_path):
+    client, adapter, _ = _client({"echo": 60, "read_file": 60, "missing": 60})
+
+    async def scenario():
+        for _ in range(2):
+            await client.call_tool("echo", {"b": 1, "a": [1, 2]})
+        await client.call_tool("echo", {"a": [1, 2], "b": 1})  # key order does not matter
+        assert adapter.calls == ["echo"]
+
+        for _ in range(2):
+            with pytest.raises(McpClientError):
+                await client.call_tool("missing", {})
+            with pytest.raises(FileNotFoundError):
+                await client.call_tool("read_file", {"path": str(tmp_path / "nope.txt")})
+        assert adapter.calls.count("missing") == 2
+        assert adapter.calls.count("read_file") == 2
+
+    asyncio.run(scenario())
+
+    uncached, adapter, metrics = _client({})
+
+    async def again():
+        for _ in range(2):
+            await uncached.call_tool("echo", {})
+
+    asyncio.run(again())
+    assert adapter.calls == ["echo", "echo"]
+    assert metrics.get_cache_stats()["tools"] == []
+
+
+def test_entries_expire_after_ttl():
+    client, adapter, _ = _client({"echo": 0.1})
+
+    async def scenario():
+        await client.call_tool("echo", {})
+        await client.call_tool("echo", {})
+        await asyncio.sleep(0.15)
+        await client.call_tool("echo", {})
+
+    asyncio.run(scenario())
+    assert len(adapter.calls) == 2
+
+
+def test_lru_eviction_by_total_bytes():
+    metrics = MetricsCollector()
+    cache = ResultCache(max_bytes=300, metrics=metrics)
+    blob = "x" * 80
+
+    keys = [cache.key("echo", {"n": i}) for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, {"text": blob}, ttl=60)
+    assert cache.stats()["entries"] == 3
+
+    assert cache.get(keys[0]) is not None  # keys[1] is now least recently used
+    cache.put(keys[3], {"text": blob}, ttl=60)
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(k) is not None for k in (keys[0], keys[2], keys[3]))
+    assert cache.stats()["bytes"] <= 300
+
+    cache.put(cache.key("echo", {"big": True}), {"text": "y" * 400}, ttl=60)  # never fits
+    assert cache.stats()["entries"] == 3
+    assert metrics.get_cache_stats()["evictions"] == 1
+
+
+def test_config_and_sync_client(monkeypatch):
+    monkeypatch.setenv("MCP_CACHE_TOOLS", "read_file:15, list_files ,echo:0.5")
+    monkeypatch.setenv("MCP_CACHE_MAX_BYTES", "4096")
+    config = McpClientConfig.from_env()
+    assert config.cache_tools == {"read_file": 15.0, "list_files": 30.0, "echo": 0.5}
+    assert config.cache_max_bytes == 4096
+
+    client = McpClient(McpClientConfig(cache_tools={"echo": 60}), cache=ResultCache())
+    calls = []
+    call_tool = client._adapter.call_tool
+    monkeypatch.setattr(client._adapter, "call_tool", lambda *a, **kw: calls.append(a) or call_tool(*a, **kw))
+    assert client.call_tool("echo", {"x": 1})[0] == {"echo": {"x": 1}}
+    assert client.call_tool("echo", {"x": 1})[0] == {"echo": {"x": 1}}
+    assert client.call_tool("sum", {"numbers": [1]})[0] == {"sum": 1.0}
+    assert len(calls) == 2
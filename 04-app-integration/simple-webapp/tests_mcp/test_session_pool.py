@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.main import create_app
+from app.services.async_mcp_client import AsyncMcpClient, AsyncStdioSession
+from app.services.mcp_client import McpClientError
+from app.services.session_pool import SessionPool, close_session_pool
+from conftest import FAKE_SERVER
+
+
+def _pool(**kwargs) -> SessionPool:
+    options = dict(min_size=1, max_size=2, acquire_timeout=2, max_inflight=2)
+    options.update(kwargs)
+    return SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), **options)
+
+
+def run_with_pool(coro_fn, **kwargs):
+    async def runner():
+        pool = _pool(**kwargs)
+        await pool.start()
+        try:
+            return await coro_fn(pool)
+        finally:
+            await pool.close()
+    return asyncio.run(runner())
+
+
+async def _pid(pool) -> str:
+    return (await pool.call_tool("pid", {}))["text"]
+
+
+def test_start_prespawns_min_size():
+    async def scenario(pool):
+        stats = pool.stats()
+        assert stats["size"] == 1 and stats["idle"] == 1 and stats["spawned"] == 1
+    run_with_pool(scenario)
+
+
+def test_sessions_are_reused_across_calls():
+    async def scenario(pool):
+        client = AsyncMcpClient(pool=pool)
+        first, _ = await client.call_tool("pid", {})
+        second, _ = await client.call_tool("pid", {})
+        assert first == second
+        assert pool.stats()["spawned"] == 1
+    run_with_pool(scenario)
+
+
+def test_dead_session_is_replaced_on_checkout():
+    async def scenario(pool):
+        before = await _pid(pool)
+        with pytest.raises(McpClientError):
+            await pool.call_tool("crash", {})
+        assert pool.stats()["discarded"] == 1
+        assert await _pid(pool) != before
+    run_with_pool(scenario)
+
+
+def test_acquire_times_out_when_exhausted():
+    async def scenario(pool):
+        held = [await pool.acquire() for _ in range(4)]
+        try:
+            with pytest.raises(McpClientError) as exc:
+                await pool.acquire()
+            assert exc.value.code == "pool_exhausted"
+        finally:
+            for s in held:
+                await pool.release(s)
+    run_with_pool(scenario, acquire_timeout=0.2)
+
+
+def test_session_spawned_only_when_saturated():
+    async def scenario(pool):
+        first = await pool.acquire()
+        second = await pool.acquire()
+        third = await pool.acquire()
+        try:
+            assert first is second  # pipelined over one process
+            assert third is not first
+            assert pool.stats()["size"] == 2
+        finally:
+            for s in (first, second, third):
+                await pool.release(s)
+    run_with_pool(scenario)
+
+
+def test_concurrent_calls_overlap_on_the_event_loop():
+    async def scenario(pool):
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            pool.call_tool("sleep", {"seconds": 0.5, "text": str(i)}) for i in range(4)
+        ])
+        assert [r["text"] for r in results] == ["0", "1", "2", "3"]
+        assert time.perf_counter() - start < 1.5
+        assert pool.stats()["size"] <= 2
+    run_with_pool(scenario)
+
+
+def test_closed_pool_rejects_calls():
+    async def scenario(pool):
+        await pool.close()
+        with pytest.raises(McpClientError) as exc:
+            await _pid(pool)
+        assert exc.value.code == "pool_closed"
+    run_with_pool(scenario)
+
+
+def test_router_requests_overlap_and_share_the_pool(stdio_env):
+    stdio_env(MCP_POOL_MAX_SIZE="1")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                start = time.perf_counter()
+                responses = await asyncio.gather(*[
+                    http.post("/mcp/actions/sleep", json={"params": {"seconds": 0.5}}) for _ in range(4)
+                ])
+                assert all(r.status_code == 200 for r in responses)
+                assert time.perf_counter() - start < 1.5  # blocking calls would take 2s
+                pids = {(await http.post("/mcp/actions/pid", json={"params": {}})).json()["data"]["text"] for _ in range(3)}
+                assert len(pids) == 1
+                assert (await http.get("/mcp/health")).json()["status"] == "ok"
+        finally:
+            await close_session_pool()
+
+    asyncio.run(scenario())
+
+
+def test_timeout_keeps_pooled_session_usable():
+    async def scenario(pool):
+        before = await _pid(pool)
+        with pytest.raises(McpClientError) as exc:
+            await pool.call_tool("sleep", {"seconds": 0.6}, timeout=0.2)
+        assert exc.value.code == "timeout"
+        assert await _pid(pool) == before
+        await asyncio.sleep(0.6)
+        assert pool.stats()["discarded"] == 0
+        assert len(json.loads((await pool.call_tool("cancelled", {}))["text"])) == 1
+    run_with_pool(scenario)
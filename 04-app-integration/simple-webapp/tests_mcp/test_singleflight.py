@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.async_mcp_client import AsyncMcpClient
+from app.services.mcp_client import McpClient, McpClientConfig, McpClientError
+from app.services.metrics_collector import MetricsCollector
+from app.services.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class SlowAdapter:
+    """Async adapter counting upstream calls; each takes `delay` seconds."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+
+    async def call_tool(self, name, params, timeout=None):
+        self.calls.append((name, params))
+        await asyncio.sleep(self.delay)
+        if name == "fail":
+            raise McpClientError("tool_error", "boom")
+        return {"listing": sorted(params.items())}
+
+
+def _client(**config):
+    metrics = MetricsCollector()
+    adapter = SlowAdapter()
+    client = AsyncMcpClient(McpClientConfig(**config), pool=adapter, flights=AsyncSingleFlight(metrics))
+    return client, adapter, metrics
+
+
+def test_identical_concurrent_calls_share_one_upstream_request():
+    client, adapter, metrics = _client()
+
+    async def scenario():
+        same = [client.call_tool("list_files", {"directory": ".", "pattern": "*"}) for _ in range(10)]
+        reordered = client.call_tool("list_files", {"pattern": "*", "directory": "./"})
+        other = client.call_tool("list_files", {"directory": "/tmp"})
+        return await asyncio.gather(*same, reordered, other)
+
+    start = time.perf_counter()
+    results = asyncio.run(scenario())
+    assert time.perf_counter() - start < 0.4
+    assert len(adapter.calls) == 2
+    assert all(data == results[0][0] for data, _ in results[:11])
+    assert metrics.get_coalescing_stats() == {"coalesced": 10, "tools": [{"name": "list_files", "coalesced": 10}]}
+
+    # Nothing left in flight: the next call goes upstream again
+    asyncio.run(client.call_tool("list_files", {"directory": "."}))
+    assert len(adapter.calls) == 3
+
+
+def test_errors_fan_out_and_cancelled_waiters_do_not_cancel_the_call():
+    client, adapter, _ = _client()
+
+    async def scenario():
+        calls = [asyncio.ensure_future(client.call_tool("fail", {})) for _ in range(3)]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        assert all(isinstance(r, McpClientError) and r.code == "tool_error" for r in results)
+
+        leader = asyncio.ensure_future(client.call_tool("slow", {"x": 1}))
+        follower = asyncio.ensure_future(client.call_tool("slow", {"x": 1}))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        data, _ = await follower
+        assert data == {"listing": [("x", 1)]}
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(scenario())
+    assert len(adapter.calls) == 2
+
+
+@pytest.mark.parametrize("exclude", [("list_files",), ("*",)])
+def test_excluded_tools_are_not_coalesced(exclude):
+    client, adapter, metrics = _client(coalesce_exclude=exclude)
+
+    async def scenario():
+        await asyncio.gather(*[client.call_tool("list_files", {"directory": "."}) for _ in range(3)])
+
+    asyncio.run(scenario())
+    assert len(adapter.calls) == 3
+    assert metrics.get_coalescing_stats()["coalesced"] == 0
+
+
+def test_thread_group_and_sync_client(monkeypatch):
+    metrics = MetricsCollector()
+    flights = SingleFlight(metrics)
+    upstream = []
+    release = threading.Event()
+
+    def slow_call(*args, **kwargs):
+        upstream.append(args)
+        release.wait(2)
+        return {"echo": args[1]}
+
+    client = McpClient(McpClientConfig(), flights=flights)
+    monkeypatch.setattr(client._adapter, "call_tool", slow_call)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.call_tool("echo", {"a": 1})[0]))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    while metrics.get_coalescing_stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(upstream) == 1
+    assert results == [{"echo": {"a": 1}}] * 5
+    assert flights.in_flight == 0
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.mcp_client import McpClientError, _StdioAdapter
+from conftest import FAKE_SERVER
+
+
+@pytest.fixture
+def adapter():
+    a = _StdioAdapter(FAKE_SERVER, timeout=5)
+    yield a
+    a.close()
+
+
+def test_requests_are_pipelined_over_one_process(adapter):
+    results = {}
+
+    def worker(i):
+        results[i] = adapter.call_tool("sleep", {"seconds": 0.5, "text": str(i)})["text"]
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert results == {i: str(i) for i in range(6)}
+    assert elapsed < 1.5  # serialized this would take 3 seconds
+
+
+def test_notifications_are_routed_to_handlers(adapter):
+    seen = []
+    adapter.add_notification_handler(seen.append)
+    assert adapter.call_tool("notify", {"text": "hi"}) == {"text": "notified"}
+    assert seen and seen[0]["method"] == "notifications/message"
+    assert seen[0]["params"]["data"] == "hi"
+
+
+def test_per_call_timeout_cancels_and_drops_late_reply(adapter):
+    with pytest.raises(McpClientError) as exc:
+        adapter.call_tool("sleep", {"seconds": 0.6, "text": "late"}, timeout=0.2)
+    assert exc.value.code == "timeout"
+
+    # The next caller gets its own reply, never the stale one
+    assert adapter.call_tool("echo", {"text": "fresh"}) == {"text": "fresh"}
+    time.sleep(0.6)
+    assert adapter.dropped_responses == 1
+    assert json.loads(adapter.call_tool("cancelled", {})["text"]) == [2]  # id 1 was initialize
+    assert adapter.is_alive()
+
+
+def test_oversized_reply_fails_only_its_request():
+    adapter = _StdioAdapter(FAKE_SERVER, timeout=5, max_message_bytes=1024 * 1024)
+    try:
+        assert len(adapter.call_tool("blob", {"size": 512 * 1024})["text"]) == 512 * 1024
+        with pytest.raises(McpClientError) as exc:
+            adapter.call_tool("blob", {"size": 3 * 1024 * 1024})
+        assert exc.value.code == "message_too_large"
+        assert exc.value.detail["request_id"] == 3
+        # The framer resynchronizes on the next newline; the process stays usable
+        assert adapter.call_tool("echo", {"text": "after"}) == {"text": "after"}
+        assert adapter.is_alive()
+    finally:
+        adapter.close()
+
+
+def test_async_session_large_and_oversized_replies():
+    async def scenario():
+        session = await AsyncStdioSession.open(FAKE_SERVER, 5, max_message_bytes=4 * 1024 * 1024)
+        try:
+            data = await session.call_tool("blob", {"size": 3 * 1024 * 1024})
+            assert len(data["text"]) == 3 * 1024 * 1024
+            with pytest.raises(McpClientError) as exc:
+                await session.call_tool("blob", {"size": 5 * 1024 * 1024})
+            assert exc.value.code == "message_too_large"
+            assert (await session.call_tool("echo", {"text": "after"})) == {"text": "after"}
+        finally:
+            await session.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import math
+import random
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, create_app
+from app.routers.mcp import STREAM_CHUNK_CHARS
+from app.services.admission import get_admission_controller, reset_admission_controller
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.mcp_client import McpClientError
+from app.services.result_stream import FrameStream, tool_text
+from app.services.session_pool import SessionPool, close_session_pool
+from conftest import FAKE_SERVER
+
+
+def _lines(body):
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_large_text_is_streamed_in_chunks(stdio_env):
+    stdio_env()
+    size = 3 * STREAM_CHUNK_CHARS + 100
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                ok = await http.post("/mcp/actions/blob:stream", json={"params": {"size": size}})
+                missing = await http.post("/mcp/actions/missing:stream", json={"params": {}})
+                buffered = await http.post("/mcp/actions/missing", json={"params": {}})
+                return ok, missing, buffered
+        finally:
+            await close_session_pool()
+
+    ok, missing, buffered = asyncio.run(scenario())
+    assert ok.status_code == 200
+    assert ok.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(ok.content)
+    assert lines[0] == {"type": "start", "tool": "blob"}
+    texts = [line["text"] for line in lines[1:-1] if line["type"] == "text"]
+    assert len(texts) == math.ceil(size / STREAM_CHUNK_CHARS) and "".join(texts) == "x" * size
+    assert lines[-1]["type"] == "end" and lines[-1]["chunks"] == len(texts)
+    assert isinstance(lines[-1]["latency_ms"], int)
+
+    # errors surface before the first line, exactly as on the buffered endpoint
+    assert missing.status_code == buffered.status_code >= 400
+    assert missing.json()["detail"]["code"] == buffered.json()["detail"]["code"]
+
+
+def test_non_text_result_is_one_data_line():
+    r = TestClient(app).post("/mcp/actions/echo:stream", json={"params": {"message": "hi"}})
+    assert r.status_code == 200
+    lines = _lines(r.content)
+    assert [line["type"] for line in lines] == ["start", "data", "end"]
+    assert lines[1]["data"]["echo"] == {"message": "hi"}
+    assert lines[2]["chunks"] == 0
+
+
+def _pieces(frame, chunk_size, split):
+    async def scenario():
+        stream = FrameStream(max_bytes=64)
+        pieces = []
+
+        async def feed():
+            rng = random.Random(split)
+            offset = 0
+            while offset < len(frame):
+                step = rng.randint(1, 40)
+                await stream.write(frame[offset:offset + step])
+                offset += step
+            stream.finish()
+
+        feeding = asyncio.ensure_future(feed())
+        async for piece in tool_text(stream, chunk_size, 1 << 20):
+            pieces.append(piece)
+        await feeding
+        return pieces
+
+    return asyncio.run(scenario())
+
+
+def test_text_pieces_never_split_escapes_or_characters():
+    text = 'a"b\\c\n\u00e9 é 한글 😀 ' * 20 + "\\"
+    result = {"content": [{"type": "text", "text": text}], "structuredContent": {"result": text}}
+    frame = json.dumps({"jsonrpc": "2.0", "id": 7, "result": result}, ensure_ascii=False).encode()
+    escaped = json.dumps({"jsonrpc": "2.0", "id": 8, "result": result}).encode()  # \uXXXX, surrogate pairs
+    for data in (frame, escaped):
+        for chunk_size, split in ((16, 1), (17, 2), (23, 3), (64, 4)):
+            pieces = _pieces(data, chunk_size, split)
+            assert all(len(p) <= chunk_size for p in pieces[:-1])
+            assert "".join(json.loads(b'"' + p + b'"') for p in pieces) == text
+
+    # Other layouts and errors are decoded whole
+    other = json.dumps({"jsonrpc": "2.0", "id": 9, "result": {"content": [{"type": "image", "data": "x"}]}}).encode()
+    assert _pieces(other, 16, 5) == [{"content": [{"type": "image", "data": "x"}]}]
+    error = json.dumps({"jsonrpc": "2.0", "id": 10, "error": {"code": -32602, "message": "Unknown tool"}}).encode()
+    with pytest.raises(McpClientError) as e:
+        _pieces(error, 16, 6)
+    assert e.value.code == "-32602"
+
+
+def test_reply_is_forwarded_without_being_assembled(stdio_env):
+    stdio_env(MCP_MAX_MESSAGE_BYTES=str(1024 * 1024))
+    size = 3 * 1024 * 1024
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                streamed = await http.post("/mcp/actions/blob:stream", json={"params": {"size": size}})
+                buffered = await http.post("/mcp/actions/blob", json={"params": {"size": size}})
+                return streamed, buffered
+        finally:
+            await close_session_pool()
+
+    streamed, buffered = asyncio.run(scenario())
+    lines = _lines(streamed.content)
+    assert lines[-1]["type"] == "end" and lines[-1]["chunks"] == size // STREAM_CHUNK_CHARS
+    assert sum(len(line.get("text", "")) for line in lines) == size
+    # the same reply is over MCP_MAX_MESSAGE_BYTES for a regular call
+    assert buffered.json()["detail"]["code"] == "message_too_large"
+
+
+def test_abandoned_stream_leaves_the_session_usable():
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=1, max_size=1)
+        try:
+            await pool.start()
+            pieces = pool.stream_tool("blob", {"size": 8 * 1024 * 1024}, STREAM_CHUNK_CHARS)
+            first = await anext(pieces)
+            await pieces.aclose()  # the client went away after one line
+            data = await pool.call_tool("echo", {"text": "after"}, timeout=10)
+            return first, data, pool.stats()
+        finally:
+            await pool.close()
+
+    first, data, stats = asyncio.run(scenario())
+    assert first == b"x" * STREAM_CHUNK_CHARS
+    assert data == {"text": "after"}
+    assert stats["spawned"] == 1 and stats["in_flight"] == 0
+
+
+def test_stalled_stream_does_not_hold_up_other_calls():
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=1, max_size=4)
+        try:
+            await pool.start()
+            size = 32 * 1024 * 1024
+            pieces = pool.stream_tool("blob", {"size": size}, STREAM_CHUNK_CHARS)
+            received = len(await anext(pieces))
+            await asyncio.sleep(0.2)  # the client stops reading; the stream's buffer fills
+            data = await pool.call_tool("echo", {"text": "meanwhile"}, timeout=2)
+            spawned = pool.stats()["spawned"]
+            async for piece in pieces:
+                received += len(piece)
+            return data, spawned, received, size, pool.stats()
+        finally:
+            await pool.close()
+
+    data, spawned, received, size, stats = asyncio.run(scenario())
+    assert data == {"text": "meanwhile"}
+    assert spawned == 2  # the stream's session was not lent to the call
+    assert received == size and stats["in_flight"] == 0
+
+
+def test_stream_holds_its_admission_slot_while_the_reply_is_sent(stdio_env):
+    stdio_env(MCP_ADMISSION_MAX_CONCURRENT="4")
+    reset_admission_controller()
+    body = json.dumps({"params": {"size": 3 * STREAM_CHUNK_CHARS}}).encode()
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": "/mcp/actions/blob:stream", "raw_path": b"/mcp/actions/blob:stream",
+             "query_string": b"", "headers": [(b"content-type", b"application/json")],
+             "client": ("127.0.0.1", 0), "server": ("test", 80)}
+    in_flight = []  # admitted requests as each body chunk goes out
+
+    async def scenario():
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                in_flight.append(get_admission_controller().stats()["in_flight"])
+
+        try:
+            await create_app()(scope, receive, send)
+            return get_admission_controller().stats()["in_flight"]
+        finally:
+            await close_session_pool()
+            reset_admission_controller()
+
+    after = asyncio.run(scenario())
+    assert in_flight[:4] == [1, 1, 1, 1]  # start and 3 text lines; released before the end line
+    assert after == 0
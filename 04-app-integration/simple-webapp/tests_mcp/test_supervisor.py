@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.mcp_client import McpClientError
+from app.services.session_pool import SessionPool
+from conftest import FAKE_SERVER, until
+
+
+def _pool(factory=None, **kwargs) -> SessionPool:
+    options = dict(min_size=1, max_size=1, acquire_timeout=5, backoff_initial=0.05, backoff_max=0.2)
+    options.update(kwargs)
+    return SessionPool(factory or (lambda: AsyncStdioSession.open(FAKE_SERVER, 5)), **options)
+
+
+def test_crashed_server_is_respawned_without_waiting_for_a_caller():
+    async def scenario():
+        pool = _pool()
+        await pool.start()
+        try:
+            before = (await pool.call_tool("pid", {}))["text"]
+            with pytest.raises(McpClientError) as exc:
+                await pool.call_tool("crash", {})
+            assert exc.value.code == "connection_closed"
+
+            await until(lambda: pool.stats()["restarts"] == 1 and pool.stats()["idle"] == 1)
+            stats = pool.stats()
+            assert stats["crashes"] == 1 and stats["size"] == 1
+            assert (await pool.call_tool("pid", {}))["text"] != before
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_inflight_idempotent_calls_are_replayed():
+    async def scenario():
+        pool = _pool(idempotent_tools={"sleep"}, replay_max=1, max_inflight=4)
+        await pool.start()
+        try:
+            # Both calls share the one process that is about to crash
+            pending = asyncio.ensure_future(pool.call_tool("sleep", {"seconds": 0.5, "text": "replayed"}))
+            await asyncio.sleep(0.05)
+            with pytest.raises(McpClientError):
+                await pool.call_tool("crash", {})
+
+            assert (await pending)["text"] == "replayed"
+            stats = pool.stats()
+            assert stats["replayed"] == 1 and stats["crashes"] == 1
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_non_idempotent_call_is_not_replayed():
+    async def scenario():
+        pool = _pool(idempotent_tools={"read_file"}, replay_max=3, max_inflight=4)
+        await pool.start()
+        try:
+            pending = asyncio.ensure_future(pool.call_tool("sleep", {"seconds": 0.5}))
+            await asyncio.sleep(0.05)
+            with pytest.raises(McpClientError):
+                await pool.call_tool("crash", {})
+            with pytest.raises(McpClientError) as exc:
+                await pending
+            assert exc.value.code == "connection_closed"
+            assert pool.stats()["replayed"] == 0
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_respawn_backs_off_while_server_fails_to_start():
+    attempts = []
+
+    async def factory():
+        attempts.append(time.monotonic())
+        if 2 <= len(attempts) <= 4:
+            raise McpClientError("connection_error", "server down")
+        return await AsyncStdioSession.open(FAKE_SERVER, 5)
+
+    async def scenario():
+        pool = _pool(factory)
+        await pool.start()
+        try:
+            with pytest.raises(McpClientError):
+                await pool.call_tool("crash", {})
+            await until(lambda: pool.stats()["restarts"] == 1)
+            assert len(attempts) == 5
+            gaps = [b - a for a, b in zip(attempts[1:], attempts[2:])]
+            assert gaps[0] >= 0.04 and gaps[1] >= 0.09  # 0.05s, then 0.1s
+            assert pool.stats()["connect_failures"] == 0
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
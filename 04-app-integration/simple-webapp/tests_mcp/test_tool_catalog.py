@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app, create_app
+from app.services.async_mcp_client import AsyncMcpClient, AsyncStdioSession
+from app.services.mcp_client import McpClientError, _StdioAdapter
+from app.services.session_pool import SessionPool, close_session_pool
+from conftest import FAKE_SERVER
+
+
+def _counting_pool(monkeypatch):
+    fetches = []
+    list_tools = AsyncStdioSession.list_tools
+
+    async def counting(self):
+        fetches.append(self)
+        return await list_tools(self)
+
+    monkeypatch.setattr(AsyncStdioSession, "list_tools", counting)
+    pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=1, max_size=1,
+                       backoff_initial=0.05)
+    return pool, fetches
+
+
+def test_mock_catalog_has_schemas_and_etag():
+    client = TestClient(app)
+    r = client.get("/mcp/tools")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert etag.startswith('"') and r.headers["cache-control"] == "no-cache"
+    tools = {t["name"]: t for t in r.json()["tools"]}
+    assert tools["sum"]["inputSchema"]["required"] == ["numbers"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        r = client.get("/mcp/tools", headers={"If-None-Match": header})
+        assert r.status_code == 304 and r.content == b""
+        assert r.headers["etag"] == etag
+    assert client.get("/mcp/tools", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_pool_catalog_is_cached_until_list_changed(monkeypatch):
+    async def scenario():
+        pool, fetches = _counting_pool(monkeypatch)
+        await pool.start()
+        try:
+            tools, etag = await pool.tool_catalog()
+            assert len(tools) == 8  # two pages of the fake server
+            assert all("inputSchema" in t for t in tools)
+            await asyncio.gather(*[pool.tool_catalog() for _ in range(10)])
+            assert (await pool.tool_catalog())[1] == etag
+            assert len(fetches) == 1
+
+            await pool.call_tool("add_tool", {"name": "fresh"})
+            assert pool.stats()["tools_cached"] is False
+            tools, new_etag = await pool.tool_catalog()
+            assert "fresh" in {t["name"] for t in tools}
+            assert new_etag != etag and len(fetches) == 2
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_lost_session_invalidates_catalog(monkeypatch):
+    async def scenario():
+        pool, fetches = _counting_pool(monkeypatch)
+        await pool.start()
+        try:
+            await pool.call_tool("add_tool", {"name": "transient"})
+            tools, _ = await pool.tool_catalog()
+            assert "transient" in {t["name"] for t in tools}
+            try:
+                await pool.call_tool("crash", {})
+            except McpClientError:
+                pass
+            while pool.stats()["tools_invalidations"] < 2:
+                await asyncio.sleep(0.01)
+            # The respawned server never registered the runtime tool
+            tools, _ = await pool.tool_catalog()
+            assert "transient" not in {t["name"] for t in tools}
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_stdio_adapter_keeps_schemas_and_caches():
+    adapter = _StdioAdapter(FAKE_SERVER, timeout=5)
+    try:
+        tools = adapter.list_tools()
+        assert len(tools) == 8
+        echo = next(t for t in tools if t["name"] == "echo")
+        assert echo["inputSchema"]["properties"] == {"text": {"type": "string"}}
+        assert adapter._tools is not None
+
+        adapter.call_tool("add_tool", {"name": "later"})
+        assert adapter._tools is None
+        assert "later" in {t["name"] for t in adapter.list_tools()}
+    finally:
+        adapter.close()
+
+
+def test_tools_endpoint_revalidates_against_pool(stdio_env):
+    stdio_env()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app())
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                r = await http.get("/mcp/tools")
+                assert r.status_code == 200 and len(r.json()["tools"]) == 8
+                etag = r.headers["etag"]
+                r = await http.get("/mcp/tools", headers={"If-None-Match": etag})
+                assert r.status_code == 304
+
+                await http.post("/mcp/actions/add_tool", json={"params": {"name": "new"}})
+                r = await http.get("/mcp/tools", headers={"If-None-Match": etag})
+                assert r.status_code == 200 and r.headers["etag"] != etag
+        finally:
+            await close_session_pool()
+
+    asyncio.run(scenario())
+
+
+def test_tools_endpoint_answers_503_when_catalog_unavailable(monkeypatch):
+    async def open_circuit(self):
+        raise McpClientError("circuit_open", "Circuit open", {"retry_after": 7})
+
+    monkeypatch.setattr(AsyncMcpClient, "tool_catalog", open_circuit)
+    r = TestClient(app).get("/mcp/tools")
+    assert r.status_code == 503 and r.headers["retry-after"] == "7"
+    assert r.json()["detail"]["code"] == "circuit_open"
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.async_mcp_client import AsyncStdioSession
+from app.services.mcp_client import McpClientError
+from app.services.session_pool import SessionPool, get_session_pool
+from conftest import FAKE_SERVER
+
+
+def _wait_ready(client, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        r = client.get("/ready")
+        if r.status_code == 200:
+            return r.json()
+        time.sleep(0.05)
+    raise AssertionError(f"not ready: {r.json()}")
+
+
+def test_mock_mode_is_ready_immediately():
+    with TestClient(create_app()) as client:
+        body = _wait_ready(client, timeout=1)
+        assert body["status"] == "ready" and "pool" not in body
+
+
+def test_ready_only_after_pool_is_warm(stdio_env):
+    stdio_env(f"{FAKE_SERVER} --delay-start 0.5", MCP_POOL_MIN_SIZE="2")
+    with TestClient(create_app()) as client:
+        r = client.get("/ready")
+        assert r.status_code == 503
+        assert r.json()["status"] == "starting"
+        assert client.get("/health").status_code == 200  # liveness is unaffected
+
+        body = _wait_ready(client)
+        assert body["warmup_ms"] >= 500
+        # Both sessions were started concurrently, not one after the other
+        assert body["warmup_ms"] < 1500
+        assert body["pool"]["size"] == 2 and body["pool"]["tools_cached"]
+
+        spawned = get_session_pool().stats()["spawned"]
+        tools = client.get("/mcp/tools").json()["tools"]
+        assert "echo" in {t["name"] for t in tools}
+        assert get_session_pool().stats()["spawned"] == spawned
+    assert client.get("/ready").status_code == 503  # stopping after shutdown
+
+
+def test_not_ready_while_server_cannot_start(stdio_env):
+    stdio_env("/nonexistent/mcp-server", MCP_RECONNECT_BACKOFF_INITIAL="0.05")
+    with TestClient(create_app()) as client:
+        time.sleep(0.3)
+        r = client.get("/ready")
+        assert r.status_code == 503
+        body = r.json()
+        assert body["status"] == "starting"
+        assert body["attempts"] >= 2
+        assert body["detail"].startswith("connection_error")
+
+
+def test_close_with_grace_lets_inflight_calls_finish():
+    async def scenario():
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=1, max_size=1)
+        await pool.start()
+        call = asyncio.ensure_future(pool.call_tool("sleep", {"seconds": 0.3, "text": "finished"}))
+        await asyncio.sleep(0.05)
+        await pool.close(grace=2)
+        assert (await call)["text"] == "finished"
+        try:
+            await pool.call_tool("echo", {})
+        except McpClientError as e:
+            assert e.code == "pool_closed"
+        else:
+            raise AssertionError("closed pool lent a session")
+
+        # Past the grace period stragglers are closed under their callers
+        pool = SessionPool(lambda: AsyncStdioSession.open(FAKE_SERVER, 5), min_size=1, max_size=1)
+        await pool.start()
+        call = asyncio.ensure_future(pool.call_tool("sleep", {"seconds": 2}))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await pool.close(grace=0.2)
+        assert time.perf_counter() - start < 1
+        try:
+            await call
+        except McpClientError as e:
+            assert e.code == "connection_closed"
+        else:
+            raise AssertionError("straggler was not closed")
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.routers.mcp import WS_INVALID_REQUEST, WS_METHOD_NOT_FOUND, WS_PARSE_ERROR, WS_TOOL_ERROR
+
+
+def _call(request_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": name, "arguments": arguments}}
+
+
+def test_calls_are_multiplexed_and_answered_out_of_order(stdio_env):
+    stdio_env()
+    with TestClient(create_app()) as client, client.websocket_connect("/mcp/ws") as ws:
+        ws.send_json(_call("slow", "sleep", seconds=0.4))
+        ws.send_json(_call(2, "echo", text="hi"))
+        ws.send_json({"jsonrpc": "2.0", "id": 3, "method": "tools/list"})
+        ws.send_json(_call(4, "missing"))
+        ws.send_json(_call(4, "echo"))  # id 4 may still be in flight
+        ws.send_text("{not json")
+        ws.send_json({"jsonrpc": "2.0", "id": 5, "method": "resources/list"})
+        responses = {}
+        while "slow" not in responses:
+            message = ws.receive_json()
+            responses.setdefault(message["id"], []).append(message)
+            order = list(responses)
+
+    assert order[-1] == "slow" and responses["slow"][0]["result"]["data"] == {"text": "done"}
+    assert responses[2][0]["result"]["tool"] == "echo" and "latency_ms" in responses[2][0]["result"]
+    assert "sleep" in [tool["name"] for tool in responses[3][0]["result"]["tools"]]
+    assert [m["error"]["code"] for m in responses[None]] == [WS_PARSE_ERROR]
+    assert responses[5][0]["error"]["code"] == WS_METHOD_NOT_FOUND
+    tool_error = next(m["error"] for m in responses[4] if "error" in m and m["error"]["code"] == WS_TOOL_ERROR)
+    assert tool_error["data"]["code"]  # the REST error code, e.g. tool_not_found
+
+
+def test_connection_stops_reading_at_max_inflight(stdio_env):
+    stdio_env(MCP_WS_MAX_INFLIGHT="2")
+    with TestClient(create_app()) as client, client.websocket_connect("/mcp/ws") as ws:
+        ws.send_json(_call(1, "sleep", seconds=0.3))
+        ws.send_json(_call(2, "sleep", seconds=0.3))
+        ws.send_json(_call(3, "echo", text="fast"))  # only read once 1 or 2 finished
+        ws.send_json({"jsonrpc": "2.0", "method": "notifications/cancelled"})  # ignored, no reply
+        ws.send_json({"jsonrpc": "2.0", "id": None, "method": "tools/call"})
+        order = [ws.receive_json() for _ in range(4)]
+
+    ids = [message.get("id") for message in order]
+    assert set(ids[:2]) <= {1, 2} and 3 in ids[2:]
+    assert order[ids.index(None)]["error"]["code"] == WS_INVALID_REQUEST
+
+
+def test_cancelled_call_gets_no_response(stdio_env):
+    stdio_env()
+    with TestClient(create_app()) as client, client.websocket_connect("/mcp/ws") as ws:
+        ws.send_json(_call("long", "sleep", seconds=1))
+        ws.send_text(json.dumps({"jsonrpc": "2.0", "method": "notifications/cancelled",
+                                 "params": {"requestId": "long"}}))
+        ws.send_json(_call("next", "echo"))
+        assert ws.receive_json()["id"] == "next"  # even when queued behind "long" upstream
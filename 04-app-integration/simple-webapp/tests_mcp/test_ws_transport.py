@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+import ws_mcp_stub_server  # noqa: E402
+from app.services.mcp_client import McpClient, McpClientConfig, McpClientError  # noqa: E402
+from app.services.session_pool import SessionPool  # noqa: E402
+
+
+def _config(port: int, **kwargs) -> McpClientConfig:
+    options = dict(mode="ws", server_uri=f"ws://127.0.0.1:{port}", timeout_default=5,
+                   pool_min_size=1, pool_max_size=1, pool_acquire_timeout=2,
+                   reconnect_backoff_initial=0.1, reconnect_backoff_max=0.5)
+    options.update(kwargs)
+    return McpClientConfig(**options)
+
+
+def _port(server) -> int:
+    return server.sockets[0].getsockname()[1]
+
+
+def test_ids_are_multiplexed_over_one_connection():
+    async def scenario():
+        async with ws_mcp_stub_server.serve("127.0.0.1", 0) as server:
+            pool = SessionPool.from_config(_config(_port(server)))
+            await pool.start()
+            try:
+                start = time.perf_counter()
+                results = await asyncio.gather(*[
+                    pool.call_tool("sleep", {"seconds": 0.5, "text": str(i)}) for i in range(5)
+                ])
+                assert [r["text"] for r in results] == [str(i) for i in range(5)]
+                assert time.perf_counter() - start < 1.5
+                assert pool.stats()["spawned"] == 1
+                tools = await pool.list_tools()
+                assert {t["name"] for t in tools} == {"echo", "conn", "sleep"}
+            finally:
+                await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_reconnects_with_backoff_after_server_restart():
+    async def scenario():
+        server = await ws_mcp_stub_server.serve("127.0.0.1", 0)
+        port = _port(server)
+        pool = SessionPool.from_config(_config(port, pool_acquire_timeout=0.2))
+        await pool.start()
+        try:
+            first = (await pool.call_tool("conn", {}))["text"]
+
+            server.close()
+            await server.wait_closed()
+            await asyncio.sleep(0.1)
+            with pytest.raises(McpClientError) as exc:
+                await pool.call_tool("conn", {})
+            assert exc.value.code == "connection_error"
+            assert pool.stats()["connect_failures"] >= 1
+
+            server = await ws_mcp_stub_server.serve("127.0.0.1", port)
+            pool.acquire_timeout = 2
+            second = (await pool.call_tool("conn", {}))["text"]
+            assert second != first
+            assert pool.stats()["connect_failures"] == 0
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_sync_client_ws_mode():
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def run_server():
+        holder["server"] = await ws_mcp_stub_server.serve("127.0.0.1", 0)
+        ready.set()
+        await holder["server"].wait_closed()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run_server(),), daemon=True)
+    thread.start()
+    ready.wait(5)
+    client = McpClient(_config(_port(holder["server"])))
+    try:
+        data, _ = client.call_tool("echo", {"text": "over ws"})
+        assert data == {"text": "over ws"}
+        assert client.health()["status"] == "ok"
+    finally:
+        client.close()
+        loop.call_soon_threadsafe(holder["server"].close)
+        thread.join(5)
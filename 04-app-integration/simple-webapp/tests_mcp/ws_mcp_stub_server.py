@@ -0,0 +1,93 @@
+"""
+WebSocket MCP stand-in for the ws transport tests.
+
+Derived from 03-discover-servers/clients/python/ws_echo_server.py: instead of
+echoing frames back, it answers MCP JSON-RPC requests (initialize,
+tools/list, tools/call) and handles each request concurrently so ids can be
+multiplexed over one connection.
+
+Tools
+- echo: { text } -> text
+- conn: returns an id for the connection (lets tests tell connections apart)
+- sleep: { seconds, text? } -> text after a delay
+"""
+import argparse
+import asyncio
+import itertools
+import json
+
+try:
+    import websockets  # type: ignore
+except Exception:
+    websockets = None
+
+_conn_ids = itertools.count(1)
+
+
+def _text(value):
+    return {"content": [{"type": "text", "text": str(value)}], "isError": False}
+
+
+async def _answer(ws, conn_id, message):
+    msg_id, method = message.get("id"), message.get("method")
+    params = message.get("params") or {}
+    if msg_id is None:
+        return
+    if method == "initialize":
+        result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                  "serverInfo": {"name": "ws-mcp-stub", "version": "0.1.0"}}
+    elif method == "tools/list":
+        result = {"tools": [{"name": n, "description": n, "inputSchema": {"type": "object"}}
+                            for n in ("echo", "conn", "sleep")]}
+    elif method == "tools/call":
+        name, args = params.get("name"), params.get("arguments") or {}
+        if name == "echo":
+            result = _text(args.get("text", ""))
+        elif name == "conn":
+            result = _text(conn_id)
+        elif name == "sleep":
+            await asyncio.sleep(float(args.get("seconds", 0)))
+            result = _text(args.get("text", "done"))
+        else:
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": msg_id,
+                                      "error": {"code": -32602, "message": f"Unknown tool: {name}"}}))
+            return
+    else:
+        await ws.send(json.dumps({"jsonrpc": "2.0", "id": msg_id,
+                                  "error": {"code": -32601, "message": f"Method not found: {method}"}}))
+        return
+    await ws.send(json.dumps({"jsonrpc": "2.0", "id": msg_id, "result": result}))
+
+
+async def handler(ws):
+    conn_id = next(_conn_ids)
+    tasks = set()
+    try:
+        async for msg in ws:
+            task = asyncio.create_task(_answer(ws, conn_id, json.loads(msg)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except Exception:
+        pass
+
+
+def serve(host: str, port: int):
+    """Return the websockets server (use as an async context manager)."""
+    return websockets.serve(handler, host, port, subprotocols=["mcp"])
+
+
+async def main(host: str, port: int):
+    async with serve(host, port):
+        print(f"[OK] MCP stub listening on ws://{host}:{port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    if websockets is None:
+        print("[ERROR] websockets not installed")
+        raise SystemExit(2)
+    asyncio.run(main(args.host, args.port))